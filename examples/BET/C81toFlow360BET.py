@@ -25,6 +25,7 @@ import json
 import os
 
 from BETDisk.BETTranslatorInterface import generateC81BETJSON
+from BETDisk.flow360JSONWriter import writeFlow360JSON
 
 here = os.path.dirname(os.path.realpath(__file__))
 
@@ -92,9 +93,8 @@ def main():
 
     # dump the completed Flow360 dictionary to a json file
     outputFilename = 'xv15_c81_translated_BET.json'
-    with open('xv15_c81_translated_BET.json', 'w') as fh:
-        json.dump(flow360Dict, fh, indent=4)
-        print('File saved:', outputFilename)
+    writeFlow360JSON(outputFilename, flow360Dict)
+    print('File saved:', outputFilename)
 
 ########################################################################################################################
 if __name__ == '__main__':
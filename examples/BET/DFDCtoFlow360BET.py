@@ -17,7 +17,8 @@ Example
 import json
 import os
 
-from BETDisk.BETTranslatorInterface import generateXrotorBETJSON
+from BETDisk.multiDiskBuilder import MultiDiskBuilder
+from BETDisk.flow360JSONWriter import writeFlow360JSON
 
 here = os.path.dirname(os.path.realpath(__file__))
 
@@ -72,9 +73,9 @@ def main():
     # activated.
     flow360BaseJsonFile = os.path.join(here, 'flow360_XV15_BET_Template.json')
 
-    dfdcInputDicts = [{} for i in range(numBetDisks)]  # This is where we will store the BET disk information once we have it.
-
-    # for loop to create each BET disk in turn
+    # the disks are built together so that the aero sections they have in common are only computed once and disks
+    # with identical polars share them in memory.
+    disks = []
     for diskIdx in range(numBetDisks):
 
         # we need extra information to define a BET disk that is not in the above dfdc file.
@@ -85,8 +86,9 @@ def main():
         # DFDC and Xrotor come from the same family of CFD codes. They are both written by Mark Drela over at MIT.
         # we can use the same translator for both DFDC and Xrotor.
         # BEWARE: There is however a difference in the way the chord or each span wise location is defined.
+        disks.append({'type': 'dfdc', 'input': dfdcFilePath, 'betDisk': betdiskParams})
 
-        dfdcInputDicts[diskIdx] = generateXrotorBETJSON(dfdcFilePath, betdiskParams,)
+    dfdcInputDicts = MultiDiskBuilder().buildDisks(disks)
 
     # now we read in the Flow360 input JSON file we will append the BET information to. This will add  numBetDisks
     # to this Flow360 JSON file.
@@ -100,9 +102,8 @@ def main():
 
     # dump the completed Flow360 dictionary to a json file
     outputFilename = 'xv15_dfdc_translated_BET.json'
-    with open(outputFilename, 'w') as fh:
-        json.dump(flow360Dict, fh, indent=4)
-        print('File saved:', outputFilename)
+    writeFlow360JSON(outputFilename, flow360Dict)
+    print('File saved:', outputFilename)
 
 ########################################################################################################################
 if __name__ == '__main__':
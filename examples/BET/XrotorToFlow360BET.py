@@ -18,6 +18,7 @@ import json
 import os
 
 from BETDisk.BETTranslatorInterface import generateXrotorBETJSON
+from BETDisk.flow360JSONWriter import writeFlow360JSON
 
 here = os.path.dirname(os.path.realpath(__file__))
 
@@ -94,9 +95,8 @@ def main():
 
     # dump the completed Flow360 dictionary to a json file
     outputFilename = 'xv15_xrotor_translated_BET.json'
-    with open(outputFilename, 'w') as fh:
-        json.dump(flow360Dict, fh, indent=4)
-        print('File saved:', outputFilename)
+    writeFlow360JSON(outputFilename, flow360Dict)
+    print('File saved:', outputFilename)
 
 
 ########################################################################################################################
@@ -12,146 +12,448 @@ EXAMPLE codes
 
 
 # import sys
+import concurrent.futures
 import os
-from scipy.interpolate import interp1d
+import re
+from scipy.interpolate import RegularGridInterpolator
 import numpy as np
 from math import *
 import json
 from os import path
 
 from .utils import *
+from .rotorFileReader import readXROTORLayout, readDFDCLayout
+from .betDiskModel import BETDisk, PolarTable
 
 ########################################################################################################################
-def  readInXfoilPolar(polarFile):
+def readXfoilRun(polarFile, lines, begin):
     '''
+    Read one run of an xfoil polar file starting at lines[begin]: a header holding the Mach and Reynolds numbers, the
+    column names, a dashed line and the table. The table goes on until an empty line, the header of the next run or the
+    end of the file. The whole table is converted to floats in one go and all its columns are kept, the XXXXXXX
+    placeholders some tools write instead of the values they do not compute become NaNs.
+
+    Parameters
+    ----------
+    polarFile: path to the xfoil polar file, only used in the error messages.
+    lines: list of the lines of the file
+    begin: index of the first line of the run
+
+    Returns
+    -------
+    dictionary with:
+    mach - float, Mach number read from the header
+    reynolds - float, Reynolds number read from the header
+    columns - list of the column names, e.g. alpha, CL, CD, CDp, CM, Top_Xtr, Bot_Xtr
+    data - array of shape (number of alphas, number of columns)
+    and the index of the line after the table
+    '''
+    mach = reynolds = None
+    for lineIdx in range(begin, len(lines)):
+        line = lines[lineIdx]
+        machMatch = re.search(r'Mach\s*=\s*([-+0-9.eE]+)', line)
+        if machMatch:
+            mach = float(machMatch.group(1))
+            reMatch = re.search(r'Re\s*=\s*([-+0-9.]+)(?:\s*e\s*([-+]?[0-9]+))?', line)  # Re is written as 1.000 e 6
+            if reMatch:
+                reynolds = float(reMatch.group(1)) * 10 ** int(reMatch.group(2) or 0)
+        if line.strip() and not line.strip().strip('- '):  # dashed line under the column names
+            break
+    else:
+        raise ValueError(f'ERROR: could not find the dashed line above the polar table starting on line #{begin + 1} '
+                         f'in xfoil file {polarFile}')
+    if mach is None:
+        raise ValueError(f'ERROR: could not find the Mach number in the header above line #{lineIdx + 1} of xfoil file '
+                         f'{polarFile}')
+
+    dashes = lines[lineIdx]
+    numColumns = len(dashes.split())
+    columns = lines[lineIdx - 1].split()
+    if len(columns) != numColumns:  # names with spaces like Top Xtr, take the names above each group of dashes
+        spans = [match.span() for match in re.finditer(r'-+', dashes)]
+        columns = [lines[lineIdx - 1][spanBegin:spanEnd].strip().replace(' ', '_') for spanBegin, spanEnd in spans]
+
+    tableBegin = lineIdx + 1
+    end = tableBegin
+    while end < len(lines) and lines[end].strip() and lines[end].split(None, 1)[0][0] in '-+.0123456789':
+        end += 1
+    tokens = ' '.join(lines[tableBegin:end]).split()
+    if len(tokens) != (end - tableBegin) * numColumns:
+        for rowIdx, line in enumerate(lines[tableBegin:end]):  # slow path, only to point at the faulty line
+            if len(line.split()) != numColumns:
+                raise ValueError(f'ERROR: in xfoil file {polarFile}, line #{tableBegin + rowIdx + 1} should have '
+                                 f'{numColumns} values: {line}')
+
+    tokens = np.array(tokens).reshape(end - tableBegin, numColumns)
+    tokens[np.char.strip(tokens, 'X') == ''] = 'nan'  # XXXXXXX placeholders
+    try:
+        data = tokens.astype(float)
+    except ValueError as error:
+        raise ValueError(f'ERROR: could not read the polar table starting on line #{tableBegin + 1} of xfoil file '
+                         f'{polarFile}: {error}') from None
+
+    return {'mach': mach, 'reynolds': reynolds, 'columns': columns, 'data': data}, end
+
+########################################################################################################################
+def readXfoilPolarRuns(polarFile):
+    '''
+    Read in an xfoil polar file holding one or several runs, e.g. a PACC accumulation file to which several Mach or
+    Reynolds numbers were written one after the other. The file is read in a single pass and split into one table per
+    run, see readXfoilRun.
+
     Parameters
     ----------
     polarFile: path to the xfoil polar file.
 
     Returns
     -------
-    alphaList, machList, clList, cdList
+    list of dictionaries, one per run, with the mach, reynolds, columns and data of the run
     '''
-    clAlphas = []
-    clValues = {}  # dictionary of list with the machs as keys
-    cdValues = {}  # dictionary of list with the machs as keys
-
-    xfoilFid = open(polarFile, 'r')
-    xfoilFid.readline()  # skip the header
-    for i in range (8): # skip the first 9 lines
-        line = xfoilFid.readline()
-
-    machNum = line.strip().split(' ')[4]
-    clValues[machNum] = []
-    cdValues[machNum] = []
-    for i in range (4): # skip the next 4 lines
-        line = xfoilFid.readline()
-    while True:
-        linecontents=line.strip().split(' ')
+    with open(polarFile, 'r') as xfoilFid:
+        lines = xfoilFid.read().splitlines()
 
-        c = linecontents.count('') # remove all instances of '' because that number varies form file to file.
-        for i in range(c):
-            linecontents.remove('')
+    runs = []
+    lineIdx = 0
+    while not runs or any(line.strip() for line in lines[lineIdx:]):  # until only empty lines are left
+        run, lineIdx = readXfoilRun(polarFile, lines, lineIdx)
+        runs.append(run)
+    return runs
+
+########################################################################################################################
+def readXfoilPolarTable(polarFile):
+    '''
+    Read in an xfoil polar file holding a single run, see readXfoilRun.
+
+    Parameters
+    ----------
+    polarFile: path to the xfoil polar file.
+
+    Returns
+    -------
+    dictionary with the mach, reynolds, columns and data of the run
+    '''
+    runs = readXfoilPolarRuns(polarFile)
+    if len(runs) != 1:
+        raise ValueError(f'ERROR: xfoil file {polarFile} holds {len(runs)} runs, use readXfoilPolarRuns to read them')
+    return runs[0]
+
+########################################################################################################################
+def xfoilRunPolar(polarFile, table, alphaStep=10, blendWindow=0.5):
+    '''
+    Complete the polar of one xfoil run with the flat plate values and interpolate it onto the alphas used for all the
+    xfoil polars. alphaStep and blendWindow are passed on to extendPolarsToFlatPlate.
+
+    Returns
+    -------
+    alphaList, machNum, clList, cdList
+    '''
+    for column in ['alpha', 'CL', 'CD']:
+        if column not in table['columns']:
+            raise ValueError(f'ERROR: xfoil file {polarFile} has no {column} column, we have {table["columns"]}')
+    clAlphas, cl, cd = [table['data'][:, table['columns'].index(column)] for column in ['alpha', 'CL', 'CD']]
 
-        clAlphas.append(float(linecontents[0]))
-        clValues[machNum].append(float(linecontents[1]))
-        cdValues[machNum].append(float(linecontents[2]))
-        line = xfoilFid.readline()
-        if len(line) == 0:#If we did all the alphas and we are done
-            break
     # extrapolate alphas to +-180 deg and Use the flat plate Cl and CD outside of where we have values from Xfoil
-    clAlphas, clMachNums, clValues, cdValues=blendPolarstoFlatplate(clAlphas, [machNum], clValues, cdValues)
+    clAlphas, cl, cd = extendPolarsToFlatPlate(clAlphas, cl[None, :], cd[None, :], alphaStep, blendWindow)
 
     #Now we interpolate the polar data to a constant set of alphas to make sure we have all the smae alphas across all mach and section
     # 10 deg steps from -180 ->-30 and from 30 to 180. 1 deg steps from -29 to 29
-    degIncrementAng = list(np.arange(-30, 30, 1).astype(float))
+    alphas = np.concatenate([np.arange(-180, -30, 10), np.arange(-30, 30, 1), np.arange(30, 190, 10)]).astype(float)
+    # linear interpolation to make sure we still have 0 at the +- 180 values
+    cls = np.interp(alphas, clAlphas, cl[0])
+    cds = np.interp(alphas, clAlphas, cd[0])
 
-    alphas = list(np.arange(-180, -30, 10).astype(float)) +degIncrementAng + list(np.arange(30, 190, 10).astype(float))  # json doesn't like the numpy default int64 type so I make it a float
+    return alphas.tolist(), table['mach'], cls.tolist(), cds.tolist()
+
+########################################################################################################################
+def  readInXfoilPolar(polarFile, alphaStep=10, blendWindow=0.5):
+    '''
+    Parameters
+    ----------
+    polarFile: path to the xfoil polar file.
+    alphaStep: float, step in degrees of the flat plate points added to the polar, see extendPolarsToFlatPlate
+    blendWindow: float, size in radians of the window over which we blend to the flat plate values
 
-    clInterp=interp1d(clAlphas,clValues[clMachNums[0]],kind='linear') # method should be linear to make sure we still have 0 at the +- 180 values
-    cdInterp = interp1d(clAlphas, cdValues[clMachNums[0]],kind='linear')  # method should be linear to make sure we still have 0 at the +- 180 values
-    cls = [0 for i in range(len(alphas))]
-    cds = [0 for i in range(len(alphas))]
-    for i,alpha in enumerate(alphas): # interpolate the cl and cd over the new set of alphas
-        cls[i]=float(clInterp(alpha))
-        cds[i] =float(cdInterp(alpha))
+    Returns
+    -------
+    alphaList, machList, clList, cdList
+    '''
+    return xfoilRunPolar(polarFile, readXfoilPolarTable(polarFile), alphaStep, blendWindow)
 
-    xfoilFid.close()
+########################################################################################################################
+def readInXfoilPolars(polarFile, alphaStep=10, blendWindow=0.5):
+    '''
+    Same as readInXfoilPolar for a file that can hold several runs, e.g. a PACC accumulation file.
+    Use functools.partial(readInXfoilPolars, alphaStep=..., blendWindow=...) as the readPolar of readInXfoilData to
+    change the flat plate extension.
 
-    return alphas, clMachNums[0], cls, cds
+    Returns
+    -------
+    list of (alphaList, machNum, clList, cdList), one per run
+    '''
+    return [xfoilRunPolar(polarFile, table, alphaStep, blendWindow) for table in readXfoilPolarRuns(polarFile)]
 ########################################################################################################################
-def blendPolarstoFlatplate(clAlphas, clMachNums, clValues, cdValues):
+def blendPolarstoFlatplate(clAlphas, clMachNums, clValues, cdValues, alphaStep=10, blendWindow=0.5):
     '''
     This function blends a given arbitrary set of CL and CD polars that are missing values to cover the whole -180 to 180
     range of angles. The resulting polars will have the missing values be replaced by the flat plate CL and CD.
+    The lists and dicts passed in are also updated in place.
     Parameters
     ----------
     clAlphas: list of alpha angles
     clMachNums: list of mach numbers
     clValues: dict with dimensions nMach*nAlphas
     cdValues: dict with dimensions nMach*nAlphas
+    alphaStep: float, add a polar point every alphaStep degrees
+    blendWindow: float, size in radians of the window over which we blend to the flat plate values
 
     Returns
     -------
     clAlphas, clMachNums, clValues, cdValues with polars completed to +- 180
     '''
 
-    polarAlphaStepBlend=10 # add a polar point every N alpha
+    alphas, cl, cd = extendPolarsToFlatPlate(clAlphas, [clValues[mach] for mach in clMachNums],
+                                             [cdValues[mach] for mach in clMachNums], alphaStep, blendWindow)
+
+    clAlphas[:] = alphas.tolist()
+    for mach, clMach, cdMach in zip(clMachNums, cl.tolist(), cd.tolist()):
+        clValues[mach][:] = clMach
+        cdValues[mach][:] = cdMach
+
+    return clAlphas, clMachNums, clValues, cdValues
+
+########################################################################################################################
+def extendPolarsToFlatPlate(alphas, cl, cd, alphaStep=10, blendWindow=0.5):
+    '''
+    Array version of blendPolarstoFlatplate. Extends (nMachs, nAlphas) CL and CD tables to cover the whole -180 to 180
+    range of angles, adding a point every alphaStep degrees that is blended to the flat plate CL and CD.
+    The extended tables are preallocated and filled one added alpha at a time for all the Mach numbers at once.
+    Parameters
+    ----------
+    alphas: list of alpha angles in degrees
+    cl: array of floats with dimensions nMach*nAlphas
+    cd: array of floats with dimensions nMach*nAlphas
+    alphaStep: float, add a polar point every alphaStep degrees
+    blendWindow: float, size in radians of the window over which we blend to the flat plate values
+
+    Returns
+    -------
+    alphas, cl, cd arrays with polars completed to +- 180
+    '''
+
+    alphas = np.asarray(alphas, dtype=float)
+    cl = np.asarray(cl, dtype=float)
+    cd = np.asarray(cd, dtype=float)
 
-    alphaMin = clAlphas[0]
-    alphaMax = clAlphas[-1]
+    alphaMin = alphas[0]
+    alphaMax = alphas[-1]
     if alphaMin < -180:
         raise ValueError(f'ERROR: alphaMin is smaller then -180: {alphaMin}')
     if alphaMax > 180:
-        raise ValueError(f'ERROR: alphaMax is greater then 180: {alphaMin}')
-
-    blendWindow = 0.5  # 0.5 radians
-
-    # create a point every 10 deg, how many points do we need.
-    numMissingAlphasMin = round(( alphaMin + 180)/polarAlphaStepBlend)
-    numMissingAlphasMax = round((180 - alphaMax) /polarAlphaStepBlend)
-
-    for i in range (numMissingAlphasMin - 1): # add alphas at beginning of clAlphas list
-        clAlphas.insert(0,clAlphas[0]-polarAlphaStepBlend)
-        a = clAlphas[0] * pi / 180  # smallest alpha in radians
-        for i, mach in enumerate (clMachNums):
-            blendVal = blendFuncValue(blendWindow, a, alphaMin * pi / 180, 'belowCLmin')  # we are on the alphaCLmin side going up in CL
-            # this follows the flat plate lift and drag equations times the blend val coefficient
-
-            cLift = clValues[mach][0] * blendVal + (1 - blendVal) * cos(a) * 2 * pi * sin(a) / sqrt(1 + (2 * pi * sin(a)) ** 2)
-            cd = cdValues[mach][0] * blendVal + (1 - blendVal) * sin(a) * (2 * pi * sin(a)) ** 3 / sqrt(1 + (2 * pi * sin(a)) ** 6) + 0.05
-            mach = str(mach)
-            clValues[mach].insert(0,cLift) # add a new cl value at the beginning
-            cdValues[mach].insert(0, cd)  # add a new cl value at the beginning
-
-
-    for i in range (numMissingAlphasMax - 1): # add alphas at end of clAlphas list
-        clAlphas.append(clAlphas[-1]+polarAlphaStepBlend)
-        a = clAlphas[-1] * pi / 180  # smallest alpha in radians
-        for i, mach in enumerate(clMachNums):
-            blendVal = blendFuncValue(blendWindow, a, alphaMax* pi / 180,'aboveCLmax')  # we are on the alphaCLmin side going up in CL
-            # this follows the flat plate lift and drag equations times the blend val coefficient
-
-            cLift = clValues[mach][-1] * blendVal + (1 - blendVal) * cos(a) * 2 * pi * sin(a) / sqrt(
-                1 + (2 * pi * sin(a)) ** 2)
-            cd = cdValues[mach][-1] * blendVal + (1 - blendVal) * sin(a) * (2 * pi * sin(a)) ** 3 / sqrt(
-                1 + (2 * pi * sin(a)) ** 6) + 0.05
-            mach = str(mach)
-            clValues[mach].append(cLift)  # add a new cl value at the beginning
-            cdValues[mach].append(cd)  # add a new cl value at the beginning
-
-    clAlphas.insert(0,-180) # make sure that the last value in the list is 180
-    clAlphas.append(180)  # make sure that the last value in the list is 180
-    for i, mach in enumerate(clMachNums):
-        clValues[mach].insert(0, 0)  # make sure Cl=0 at alpha -180
-        cdValues[mach].insert(0, 0.05)  # Cd=0.05 is flat plate Cd at 180
-        clValues[mach].append(0)  # make sure Cl=0 at alpha -180
-        cdValues[mach].append(0.05)  # Cd=0.05 is flat plate Cd at 180
+        raise ValueError(f'ERROR: alphaMax is greater then 180: {alphaMax}')
+
+    # create a point every alphaStep deg, how many points do we need.
+    numAddedMin = max(round((alphaMin + 180) / alphaStep) - 1, 0)
+    numAddedMax = max(round((180 - alphaMax) / alphaStep) - 1, 0)
+    addMinus180 = alphaMin - numAddedMin * alphaStep > -180 or numAddedMin == 0 and alphaMin != -180
+    addPlus180 = alphaMax + numAddedMax * alphaStep < 180 or numAddedMax == 0 and alphaMax != 180
+
+    # preallocate the extended tables and put the given polars in the middle
+    begin = numAddedMin + addMinus180
+    end = begin + len(alphas)
+    nAlphas = end + numAddedMax + addPlus180
+    newAlphas = np.empty(nAlphas)
+    newCl = np.empty((cl.shape[0], nAlphas))
+    newCd = np.empty((cd.shape[0], nAlphas))
+    newAlphas[begin:end] = alphas
+    newCl[:, begin:end] = cl
+    newCd[:, begin:end] = cd
+
+    # each added point is blended from its neighbour closer to the given polar
+    for i in range(begin - 1, begin - 1 - numAddedMin, -1):  # add alphas at beginning of the alphas list
+        newAlphas[i] = newAlphas[i + 1] - alphaStep
+        a = newAlphas[i] * pi / 180  # alpha in radians
+        blendVal = blendFuncValues(blendWindow, a, alphaMin * pi / 180, 'belowCLmin')
+        newCl[:, i], newCd[:, i] = blendToFlatPlate(newCl[:, i + 1], newCd[:, i + 1], a, blendVal)
+
+    for i in range(end, end + numAddedMax):  # add alphas at end of the alphas list
+        newAlphas[i] = newAlphas[i - 1] + alphaStep
+        a = newAlphas[i] * pi / 180  # alpha in radians
+        blendVal = blendFuncValues(blendWindow, a, alphaMax * pi / 180, 'aboveCLmax')
+        newCl[:, i], newCd[:, i] = blendToFlatPlate(newCl[:, i - 1], newCd[:, i - 1], a, blendVal)
+
+    if addMinus180:
+        newAlphas[0] = -180
+        newCl[:, 0] = 0  # make sure Cl=0 at alpha -180
+        newCd[:, 0] = 0.05  # Cd=0.05 is flat plate Cd at 180
+    if addPlus180:
+        newAlphas[-1] = 180
+        newCl[:, -1] = 0  # make sure Cl=0 at alpha 180
+        newCd[:, -1] = 0.05  # Cd=0.05 is flat plate Cd at 180
+
+    return newAlphas, newCl, newCd
 
-    return clAlphas, clMachNums, clValues, cdValues
+###############################################################################################################
+C81_FIELD_WIDTH = 7  # every value of a c81 table is in a 7 character wide column
+C81_VALUES_PER_LINE = 9  # at most 9 values after the first 7 columns, the others go on continuation lines
 
 ###############################################################################################################
-def readInC81Polarc81Format(polarFile):
+def readC81Header(line):
+    '''
+    Read the title line of a c81 file. Columns 31 to 42 hold the ML NL MD ND MM NM counts in I2 format, i.e. the number
+    of Machs and alphas of the CL, CD and CM tables. Some files only have a title, then we get None for the counts.
+
+    Returns
+    -------
+    title, list of 6 ints or None
+    '''
+    counts = line[30:42]
+    if len(counts) == 12 and all(counts[i:i + 2].strip().isdigit() for i in range(0, 12, 2)):
+        return line[:30].strip(), [int(counts[i:i + 2]) for i in range(0, 12, 2)]
+    return line.strip(), None
+
+###############################################################################################################
+def readC81Fields(polarFile, tableName, rowLines, numFields, firstLineNum):
+    '''
+    Convert the fixed width rows of a c81 table into a float array in one go.
+
+    Parameters
+    ----------
+    polarFile - only used in the error messages
+    tableName - CL, CD or CM, only used in the error messages
+    rowLines - list of rows, each row being the list of its lines: the first line then its continuation lines.
+    numFields - number of values in each row, including the alpha or the leading blank of the Mach row.
+    firstLineNum - line number of the first line of rowLines in the file
+
+    Returns
+    -------
+    array of shape (len(rowLines), numFields)
+    '''
+    width = C81_FIELD_WIDTH
+    rows = []
+    lineNum = firstLineNum
+    for lines in rowLines:
+        row = []
+        numLeft = numFields
+        for lineIdx, line in enumerate(lines):
+            begin = 0 if lineIdx == 0 else width  # continuation lines start with 7 blanks
+            numOnLine = min(numLeft, C81_VALUES_PER_LINE + 1 if lineIdx == 0 else C81_VALUES_PER_LINE)
+            end = begin + numOnLine * width
+            if line[end:].strip():
+                raise ValueError(f'ERROR: in file {polarFile}, line #{lineNum} of the {tableName} table has more '
+                                 f'values than the {numFields - 1} Mach numbers: {line}')
+            if lineIdx > 0 and line[:width].strip():
+                raise ValueError(f'ERROR: in file {polarFile}, line #{lineNum} of the {tableName} table should be a '
+                                 f'continuation line starting with {width} blanks: {line}')
+            row.append(line[begin:end].ljust(end - begin))
+            numLeft -= numOnLine
+            lineNum += 1
+        rows.append(''.join(row))
+
+    text = ''.join(rows).encode('ascii', errors='replace')
+    fields = np.frombuffer(text, dtype=f'S{width}').reshape(len(rowLines), numFields)
+    try:
+        return fields.astype(float)
+    except ValueError:
+        pass
+    # slow path, only to point at the faulty value.
+    lineNum = firstLineNum
+    for rowIdx, lines in enumerate(rowLines):
+        for colIdx, field in enumerate(fields[rowIdx]):
+            try:
+                float(field)
+            except ValueError:
+                lineOffset = max(colIdx - 1, 0) // C81_VALUES_PER_LINE
+                raise ValueError(f'ERROR: in file {polarFile}, could not read the {tableName} value '
+                                 f'"{field.decode(errors="replace")}" in column {colIdx + 1} of line '
+                                 f'#{lineNum + lineOffset}') from None
+        lineNum += len(lines)
+
+###############################################################################################################
+def readC81Table(polarFile, tableName, lines, lineIdx):
+    '''
+    Read one table (CL, CD or CM) of a c81 file starting at lines[lineIdx]: the Mach numbers line(s) then one row per
+    alpha with the alpha followed by one value per Mach, with continuation lines when we have more than 9 Machs.
+    The number of Machs and alphas come from the layout of the table: the Mach lines and continuation lines start with
+    7 blanks while the rows start with their alpha.
+
+    Returns
+    -------
+    alphas, machs, values array of shape (numMachs, numAlphas), index of the line after the table
+    '''
+    width = C81_FIELD_WIDTH
+    if lineIdx >= len(lines):
+        raise ValueError(f'ERROR: in file {polarFile}, the file ends before the {tableName} table')
+    if lines[lineIdx][:width].strip():
+        raise ValueError(f'ERROR: in file {polarFile}, line #{lineIdx + 1} should be the Mach numbers line of the '
+                         f'{tableName} table, starting with {width} blanks: {lines[lineIdx]}')
+
+    numMachs = 0  # count the Machs on the Mach line and its continuation lines
+    nextIdx = lineIdx
+    while True:
+        numMachs += -(-len(lines[nextIdx][width:].rstrip()) // width)
+        nextIdx += 1
+        if numMachs % C81_VALUES_PER_LINE or nextIdx >= len(lines) or not lines[nextIdx].strip() \
+                or lines[nextIdx][:width].strip():
+            break
+    if numMachs <= 0:
+        raise ValueError(f'ERROR: in file {polarFile}, the {tableName} table on line #{lineIdx + 1} has no Mach numbers')
+    linesPerRow = (numMachs - 1) // C81_VALUES_PER_LINE + 1
+
+    machLines = lines[lineIdx:lineIdx + linesPerRow]
+    machRow = ['0'.rjust(width) + machLines[0][width:]] + machLines[1:]  # placeholder where the rows have the alpha
+    machs = readC81Fields(polarFile, tableName, [machRow], numMachs + 1, lineIdx + 1)[0, 1:]
+    lineIdx += linesPerRow
+
+    numAlphas = 0  # rows go on until the next Mach line, an empty line or the end of the file
+    while lineIdx + numAlphas * linesPerRow < len(lines) and lines[lineIdx + numAlphas * linesPerRow][:width].strip():
+        numAlphas += 1
+    if lineIdx + numAlphas * linesPerRow > len(lines):
+        raise ValueError(f'ERROR: in file {polarFile}, the last row of the {tableName} table is missing '
+                         f'continuation lines, the file ends on line #{len(lines)}')
+
+    rowLines = [lines[lineIdx + i * linesPerRow:lineIdx + (i + 1) * linesPerRow] for i in range(numAlphas)]
+    table = readC81Fields(polarFile, tableName, rowLines, numMachs + 1, lineIdx + 1)
+    return table[:, 0], machs, np.ascontiguousarray(table[:, 1:].T), lineIdx + numAlphas * linesPerRow
+
+###############################################################################################################
+def readC81Tables(polarFile):
+    '''
+    Read in a c81 format polar file, as per this document https://cibinjoseph.github.io/C81-Interface/page/index.html
+    The CL, CD and CM tables are converted to float arrays in bulk. Tables with more than 9 Mach numbers use
+    continuation lines. The CM table is optional.
+
+    Returns
+    -------
+    dictionary with CL, CD and (if present) CM entries, each one being a dictionary with:
+    alphas - array of floats
+    machs - array of floats
+    values - array of shape (number of machs, number of alphas)
+    '''
+    with open(polarFile, 'r') as c81fid:
+        lines = c81fid.read().splitlines()
+    if not lines:
+        raise ValueError(f'ERROR: c81 file {polarFile} is empty')
+
+    title, counts = readC81Header(lines[0])
+    tables = {}
+    lineIdx = 1
+    for tableIdx, tableName in enumerate(['CL', 'CD', 'CM']):
+        if tableName == 'CM' and not any(line.strip() for line in lines[lineIdx:]):
+            break  # no moment table
+        alphas, machs, values, lineIdx = readC81Table(polarFile, tableName, lines, lineIdx)
+        tables[tableName] = {'alphas': alphas, 'machs': machs, 'values': values}
+
+    if counts is not None:  # check the tables against the counts of the header
+        for tableIdx, tableName in enumerate(['CL', 'CD', 'CM']):
+            numMachs, numAlphas = counts[2 * tableIdx:2 * tableIdx + 2]
+            shape = tables[tableName]['values'].shape if tableName in tables else (0, 0)
+            if shape != (numMachs, numAlphas):
+                raise ValueError(f'ERROR: in file {polarFile}, the header says the {tableName} table has {numMachs} '
+                                 f'Machs and {numAlphas} alphas but we read {shape[0]} Machs and {shape[1]} alphas')
+    return tables
+
+###############################################################################################################
+def readInC81Polarc81FormatArrays(polarFile):
     '''
     Read in the c81 format polar file
     This function checks that the list of Alphas is consistent across CL and CD and that the number of Machs is also consistent across Cl and CD.
@@ -159,145 +461,235 @@ def readInC81Polarc81Format(polarFile):
     ----------
     polarFile
 
+    Returns
+    -------
+    alphas, machs, cl and cd arrays of shape (number of machs, number of alphas)
+    '''
+    tables = readC81Tables(polarFile)
+    clAlphas, cdAlphas = tables['CL']['alphas'], tables['CD']['alphas']
+    clMachNums, cdMachNums = tables['CL']['machs'], tables['CD']['machs']
+    if not np.array_equal(clMachNums, cdMachNums): # if we have different lists of  machs
+        raise ValueError(f'ERROR: in file {polarFile}, The machs in the Cl polar do not match the machs in the CD polar, we have {clMachNums.tolist()} Cl mach values and {cdMachNums.tolist()} CD mach values:')
+    if not np.array_equal(clAlphas, cdAlphas):  # if we have different  lists of alphas
+        raise ValueError(
+            f'ERROR: in file {polarFile}, The alphas in the Cl polar do not match the alphas in the CD polar. We have {clAlphas.tolist()} Cls and {cdAlphas.tolist()} Cds')
+
+    # We also have the moment information in a c81 file but we ignore that for our purposes.
+    return clAlphas, clMachNums, tables['CL']['values'], tables['CD']['values']
+
+###############################################################################################################
+def readInC81Polarc81Format(polarFile):
+    '''
+    Read in the c81 format polar file, see readInC81Polarc81FormatArrays.
+
     Returns
     -------
     4 lists of floats: clAlphas, clMachNums, clValues, cdValues
     '''
-    clAlphas=[]
-    cdAlphas = []
-    clValues = {}#dictionary of list with the machs as keys
-    cdValues={}#dictionary of list with the machs as keys
-
-
-    c81fid=open(polarFile,'r')
-    c81fid.readline()# skip the header
-    line=c81fid.readline()
-    clMachNums=line.strip().split(' ')
-    clMachNums = [float(i) for i in clMachNums if i] # remove empty items and trailing \n in clMachNums
-    for mach in clMachNums:
-        clValues[mach]=[]
-    line=c81fid.readline()
-    while True:
-        # c81 format is as per this document https://cibinjoseph.github.io/C81-Interface/page/index.html
-        # first 7 chars in string is A0A then 7 chars per cl value
-        if line[:7]=='       ': #If we did all the alphas and now that line starts with a bunch of spaces.
-            break
-        clAlphas.append(float(line[:7]))
-
-        for i,mach in enumerate(clMachNums):
-            indexBeg=i*7+7
-            indexEnd = (i+1) * 7 + 7
-            clValues[mach].append(float(line[indexBeg:indexEnd]))
-        line = c81fid.readline()
-
-    # Now do the CDs
-    cdMachNums = line.strip().split(' ')
-    # we already read the mach numbers line in the while loop above. so just split it.
-    cdMachNums = [float(i) for i in cdMachNums if i]  # remove empty items and trailing \n in clMachNums
-    if clMachNums != cdMachNums: # if we have different lists of  machs
-        raise ValueError(f'ERROR: in file {polarFile}, The machs in the Cl polar do not match the machs in the CD polar, we have {clMachNums} Cl mach values and {cdMachNums} CD mach values:')
-
-    for mach in cdMachNums:
-        cdValues[mach] = []
-    line = c81fid.readline()
-    while True:
-        # c81 format is as per this document https://cibinjoseph.github.io/C81-Interface/page/index.html
-        # first 7 chars in string is A0A then 7 chars per cl value
-        if line[:7] == '       ':  # If we did all the alphas and now that line starts with a bunch of spaces.
-            break
-        cdAlphas.append(float(line[:7]))
+    alphas, machs, cl, cd = readInC81Polarc81FormatArrays(polarFile)
+    clMachNums = machs.tolist()
+    clValues = dict(zip(clMachNums, cl.tolist()))  # dictionary of list with the machs as keys
+    cdValues = dict(zip(clMachNums, cd.tolist()))  # dictionary of list with the machs as keys
+    return alphas.tolist(), clMachNums, clValues, cdValues
+
+###############################################################################################################
+def readC81csvTable(polarFile, tableName, lines, lineIdx):
+    '''
+    Read one table (CL or CD) of a csv c81 file starting at lines[lineIdx]: the ,mach1,mach2,... line then one
+    alpha,value1,value2,... row per alpha. The table ends at the next line starting with a comma, an empty line or the
+    end of the file. All the rows are converted to a float array in one call.
 
-        for i, mach in enumerate(cdMachNums):
-            indexBeg = i * 7 + 7
-            indexEnd = (i + 1) * 7 + 7
-            cdValues[mach].append(float(line[indexBeg:indexEnd]))
-        line = c81fid.readline()
+    Returns
+    -------
+    alphas, machs, values array of shape (number of machs, number of alphas), index of the line after the table
+    '''
+    if lineIdx >= len(lines):
+        raise ValueError(f'ERROR: in file {polarFile}, the file ends before the {tableName} table')
+    try:
+        machs = np.array([float(i.strip()) for i in lines[lineIdx].split(',') if i.strip()])
+    except ValueError:
+        raise ValueError(f'ERROR: in file {polarFile}, could not read the {tableName} mach numbers on line '
+                         f'#{lineIdx + 1}: {lines[lineIdx]}') from None
+
+    end = lineIdx + 1
+    while end < len(lines) and lines[end].strip() and not lines[end].startswith(','):
+        end += 1
+    if end == lineIdx + 1:
+        raise ValueError(f'ERROR: in file {polarFile}, the {tableName} table on line #{lineIdx + 1} has no alphas')
+
+    rows = [line.rstrip().rstrip(',') for line in lines[lineIdx + 1:end]]  # trailing commas are allowed
+    try:
+        table = np.loadtxt(rows, delimiter=',', ndmin=2)
+    except ValueError as error:
+        raise ValueError(f'ERROR: in file {polarFile}, could not read the {tableName} table starting on line '
+                         f'#{lineIdx + 2}: {error}') from None
+    if table.shape[1] != len(machs) + 1:
+        raise ValueError(f'ERROR: in file {polarFile}, the {tableName} table starting on line #{lineIdx + 2} has '
+                         f'{table.shape[1] - 1} values per alpha for {len(machs)} mach numbers')
+    return table[:, 0], machs, np.ascontiguousarray(table[:, 1:].T), end
 
+###############################################################################################################
+def readInC81PolarcsvArrays(polarFile, alphaStep=10, blendWindow=0.5):
+    '''
+    Read in the c81 format polar file as a csv file
+    This function checks that the list of Alphas is consistent across CL and CD and that the number of Machs is also
+    consistent across Cl and CD. The polars are completed with the flat plate values if they do not cover -180 to 180.
+    Parameters
+    ----------
+    polarFile
+    alphaStep: float, step in degrees of the flat plate points added to the polars, see extendPolarsToFlatPlate
+    blendWindow: float, size in radians of the window over which we blend to the flat plate values
 
-    if clAlphas != cdAlphas:  # if we have different  lists of alphas
-        raise ValueError(
-            f'ERROR: in file {polarFile}, The alphas in the Cl polar do not match the alphas in the CD polar. We have {clAlphas} Cls and {cdAlphas} Cds')
+    Returns
+    -------
+    alphas, machs, cl and cd arrays of shape (number of machs, number of alphas)
+    '''
+    with open(polarFile, 'r') as c81fid:
+        lines = c81fid.read().splitlines()
 
-    # We also have the moment informatiomn in a c81 file but we ignore that for our purposes.
+    # skip the header
+    clAlphas, clMachNums, cl, lineIdx = readC81csvTable(polarFile, 'CL', lines, 1)
+    cdAlphas, cdMachNums, cd, lineIdx = readC81csvTable(polarFile, 'CD', lines, lineIdx)
 
-    return clAlphas, clMachNums, clValues, cdValues
+    if not np.array_equal(clMachNums, cdMachNums): # if we have different lists of  machs
+        raise ValueError(
+            f'ERROR: in file {polarFile}, The machs in the Cl polar do not match the machs in the CD polar, we have {clMachNums.tolist()} Cl mach values and {cdMachNums.tolist()} CD mach values:')
+    if not np.array_equal(clAlphas, cdAlphas):  # if we have different  lists of alphas
+        raise ValueError(
+            f'ERROR: in file {polarFile}, The alphas in the Cl polar do not match the alphas in the CD polar. We have {len(clAlphas)} Cls and {len(cdAlphas)} Cds')
+
+    # We also have the moment information in a c81 file but we ignore that for our purposes.
+    if clAlphas[0] != -180 and clAlphas[-1] != 180:  # if we don't have polars for the full circle of alpha angles.
+        clAlphas, cl, cd = extendPolarsToFlatPlate(clAlphas, cl, cd, alphaStep, blendWindow)
+    return clAlphas, clMachNums, cl, cd
 
 ###############################################################################################################
-def readInC81Polarcsv(polarFile):
+def readInC81Polarcsv(polarFile, alphaStep=10, blendWindow=0.5):
     '''
     # read in the c81 format polar file as a csv file
     # the script checks that the list of Alphas is consistent across CL and CD and that the number of Machs is also consistent across Cl and CD.
     Parameters
     ----------
     polarFile
+    alphaStep, blendWindow: flat plate extension of the polars, see readInC81PolarcsvArrays
 
     Returns
     -------
      4 lists of floats: clAlphas, clMachNums, clValues, cdValues
     '''
+    alphas, machs, cl, cd = readInC81PolarcsvArrays(polarFile, alphaStep, blendWindow)
+    clMachNums = machs.tolist()
+    clValues = dict(zip(clMachNums, cl.tolist()))  # dictionary of list with the machs as keys
+    cdValues = dict(zip(clMachNums, cd.tolist()))  # dictionary of list with the machs as keys
+    return alphas.tolist(), clMachNums, clValues, cdValues
 
-    clAlphas=[]
-    cdAlphas = []
-    clValues = {}#dictionary of list with the machs as keys
-    cdValues={}#dictionary of list with the machs as keys
-
-
-    c81fid=open(polarFile,'r')
-    c81fid.readline()# skip the header
-    line=c81fid.readline()
-    clMachNums=line.split(',')
-    clMachNums = [float(i.strip()) for i in clMachNums if i] # remove empty items and trailing \n in clMachNums
-    #numClMachs=len(clMachNums) #number of machs we have
-    for mach in clMachNums:
-        clValues[mach]=[]
-    line=c81fid.readline()
-    while True:
-        values=line.split(',')
-        if values[0]=='': #If we did all the alphas
-            break
-        clAlphas.append(float(values[0]))
-        for i,mach in enumerate(clMachNums):
-            clValues[mach].append(float(values[i+1].strip()))
-        line = c81fid.readline()
-
-    # Now do the CDs
-    cdMachNums = line.split(',')# we already read the mach numbers line in the while loop above. so just split it.
-    cdMachNums = [float(i.strip()) for i in cdMachNums if i]  # remove empty items and trailing \n in clMachNums
-    if clMachNums != cdMachNums: # if we have different lists of  machs
-        raise ValueError(
-            f'ERROR: in file {polarFile}, The machs in the Cl polar do not match the machs in the CD polar, we have {clMachNums} Cl mach values and {cdMachNums} CD mach values:')
-
-    for mach in cdMachNums:
-        cdValues[mach] = []
-    line = c81fid.readline()
-    while True:
-        values = line.split(',')
-        if values[0] == '':  # If we did all the alphas
-            break
-        cdAlphas.append(float(values[0]))
-        for i, mach in enumerate(cdMachNums):
-            cdValues[mach].append(float(values[i + 1].strip()))
-        line = c81fid.readline()
+###############################################################################################################
+def readPolarFiles(polarFiles, readPolar, polarFormat, maxWorkers=None):
+    '''
+    Read polar files on a bounded pool of threads. The files are opened and parsed concurrently, which hides the I/O
+    latency of network file systems, and every file is read even if some of them fail.
+    Parameters
+    ----------
+    polarFiles - list of polar files
+    readPolar - function reading one polar file
+    polarFormat - c81 or xfoil, only used in the messages
+    maxWorkers - maximum number of files read at the same time, None for the ThreadPoolExecutor default
 
+    Returns
+    -------
+    list of what readPolar returned for each file, in the same order as polarFiles.
+    A ValueError listing every file we could not read is raised once all the files have been tried.
+    '''
+    def readOne(polarFile):
+        if not path.isfile(polarFile):
+            raise ValueError(f'Error: {polarFormat} format polar file {polarFile} does not exist.')
+        return readPolar(polarFile)
+
+    polars = []
+    errors = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        for polarFile, future in zip(polarFiles, [executor.submit(readOne, polarFile) for polarFile in polarFiles]):
+            try:
+                polars.append(future.result())
+            except Exception as error:
+                errors.append(f'{polarFile}: {error}')
+
+    if errors:
+        raise ValueError(f'Error: could not read {len(errors)} of the {len(polarFiles)} {polarFormat} polar files:\n'
+                         + '\n'.join(errors))
+    print(f'read {len(polarFiles)} {polarFormat} polar files')
+    return polars
 
-    if clAlphas != cdAlphas:  # if we have different  lists of alphas
-        raise ValueError(
-            f'ERROR: in file {polarFile}, The alphas in the Cl polar do not match the alphas in the CD polar. We have {len(clAlphas)} Cls and {len(cdAlphas)} Cds')
+###############################################################################################################
+def resamplePolars(sectionPolars, alphas=None, machs=None, kind='linear'):
+    '''
+    Interpolate the CL and CD tables of sections that do not share the same alphas and Mach numbers onto a common
+    alpha x Mach grid. The sections using the same grid are interpolated together in a single vectorized call.
+    Outside of the Mach range of a section its polars are held constant.
+    Parameters
+    ----------
+    sectionPolars - list with the (alphas, machs, cl, cd) of each section, cl and cd of shape (nMachs, nAlphas)
+    alphas - alphas of the common grid, by default all the alphas used by the sections
+    machs - Mach numbers of the common grid, by default all the Mach numbers used by the sections
+    kind - interpolation scheme: linear or nearest, see scipy's RegularGridInterpolator. The higher order schemes
+           need a newer scipy than the one we support.
 
-    # We also have the moment information in a c81 file but we ignore that for our purposes.
-    if clAlphas[0] != -180 and clAlphas[-1] != 180:  # if we don't have polars for the full circle of alpha angles.
-        blendPolarstoFlatplate(clAlphas, clMachNums, clValues, cdValues)
-    c81fid.close()
-    return clAlphas, clMachNums, clValues, cdValues
+    Returns
+    -------
+    alphas, machs, cl and cd arrays of shape (nSections, nMachs, nAlphas)
+    '''
+    if kind not in ['linear', 'nearest']:
+        raise ValueError(f'ERROR: unknown resampling scheme {kind}, it must be linear or nearest')
+    sectionPolars = [[np.asarray(values, dtype=float) for values in polar] for polar in sectionPolars]
+    if alphas is None:
+        alphas = np.unique(np.concatenate([polar[0] for polar in sectionPolars]))
+    if machs is None:
+        machs = np.unique(np.concatenate([polar[1] for polar in sectionPolars]))
+    alphas = np.asarray(alphas, dtype=float)
+    machs = np.asarray(machs, dtype=float)
+
+    groups = {}  # sections sharing the same grid, they are interpolated together
+    for secIdx, (secAlphas, secMachs, secCl, secCd) in enumerate(sectionPolars):
+        groups.setdefault((secAlphas.tobytes(), secMachs.tobytes()), []).append(secIdx)
+
+    cl = np.empty((len(sectionPolars), len(machs), len(alphas)))
+    cd = np.empty_like(cl)
+    for secIdxs in groups.values():
+        secAlphas, secMachs = sectionPolars[secIdxs[0]][:2]
+        # (nMachs, nAlphas, 2*nSections) values: the CLs then the CDs of all the sections of the group
+        values = np.stack([sectionPolars[i][2] for i in secIdxs] + [sectionPolars[i][3] for i in secIdxs], axis=-1)
+        queryAlphas = np.clip(alphas, secAlphas.min(), secAlphas.max())
+        queryMachs = np.clip(machs, secMachs.min(), secMachs.max())
+        try:
+            if len(secMachs) == 1:  # only interpolate in alpha
+                interpolator = RegularGridInterpolator((secAlphas,), values[0], method=kind)
+                result = np.broadcast_to(interpolator(queryAlphas[:, None]), (len(machs), len(alphas), values.shape[-1]))
+            else:
+                interpolator = RegularGridInterpolator((secMachs, secAlphas), values, method=kind)
+                result = interpolator(np.stack(np.meshgrid(queryMachs, queryAlphas, indexing='ij'), axis=-1))
+        except ValueError as error:
+            raise ValueError(f'ERROR: could not resample the polars of sections {secIdxs} with the {kind} scheme: '
+                             f'{error}') from None
+        cl[secIdxs] = np.moveaxis(result[..., :len(secIdxs)], -1, 0)
+        cd[secIdxs] = np.moveaxis(result[..., len(secIdxs):], -1, 0)
+
+    return alphas, machs, cl, cd
 
 ###############################################################################################################
-def readInXfoilData(betDisk, xfoilPolarfiles):
+def readInXfoilData(betDisk, xfoilPolarfiles, readPolar=None, maxWorkers=None, resample=None):
     '''
     This function reads in the Xfoil polars and assigns the resulting values correctly into the BET disk dictionary
     Parameters
     ----------
     betDisk - Dictionary of values needed for the BET disk implementation
     xfoilPolarfiles - list of xfoil polar files
+    readPolar - function reading one polar file into a list of runs, readInXfoilPolars by default. This is how the
+                incremental builds reuse the polars of the files that did not change.
+    maxWorkers - maximum number of polar files read at the same time, see readPolarFiles
+    resample - optional dictionary of resamplePolars arguments (alphas, machs, kind). The polars of all the sections are
+               then interpolated onto a common alpha x Mach grid instead of having to use the same alphas and machs.
+
+    Each section can use one file per Mach number or files holding several runs, like the PACC accumulation files.
 
     Returns
     -------
@@ -306,23 +698,51 @@ def readInXfoilData(betDisk, xfoilPolarfiles):
     if len(xfoilPolarfiles) != len(betDisk['sectionalRadiuses']):
         raise ValueError(f'Error: There is an error in the number of polar files ({len(xfoilPolarfiles)}) vs the number of sectional Radiuses ({len(betDisk["sectionalRadiuses"])})')
 
+    if readPolar is None:
+        readPolar = readInXfoilPolars
+
+    # read all the files first, then assign their runs to the sections in order
+    polarFiles = [polarFile for sectionFiles in xfoilPolarfiles for polarFile in sectionFiles]
+    polars = iter(readPolarFiles(polarFiles, readPolar, 'xfoil', maxWorkers))
+    sectionRuns = [[run for polarFile in sectionFiles for run in next(polars)] for sectionFiles in xfoilPolarfiles]
+
+    return assignXfoilPolars(betDisk, sectionRuns, resample)
+
+###############################################################################################################
+def assignXfoilPolars(betDisk, sectionRuns, resample=None):
+    '''
+    This function assigns the Xfoil polars of each section correctly into the BET disk dictionary
+    Parameters
+    ----------
+    betDisk - Dictionary of values needed for the BET disk implementation
+    sectionRuns - list with, for each section, the list of its (alphaList, machNum, clList, cdList) runs
+    resample - optional dictionary of resamplePolars arguments (alphas, machs, kind). The polars of all the sections are
+               then interpolated onto a common alpha x Mach grid instead of having to use the same alphas and machs.
+
+    Returns
+    -------
+    betDisk - same dictionary as was passed to function but with all the polar information added.
+    '''
+    if resample is not None:
+        alphas, machs, cl, cd = resamplePolars([(runs[0][0], [run[1] for run in runs], [run[2] for run in runs],
+                                                 [run[3] for run in runs]) for runs in sectionRuns], **resample)
+        sectionRuns = [list(zip([alphas.tolist()] * len(machs), machs.tolist(), secCl.tolist(), secCd.tolist()))
+                       for secCl, secCd in zip(cl, cd)]
+
     betDisk['sectionalPolars'] = []
     betDisk['MachNumbers']=[]
 
     machNumbers = []
 
-    for secIdx, section in enumerate(betDisk['sectionalRadiuses']):
+    for secIdx, runs in enumerate(sectionRuns):
         secpol = {}  # temporary dict to store all the section polars before assigning it to the right location.
         secpol['liftCoeffs'] = []
         secpol['dragCoeffs'] = []
 
-        polarFiles=xfoilPolarfiles[secIdx]
         machNumbersforsection = []
-        for polarFile in polarFiles:
-            print(f'doing sectionalRadius {section} with polar file {polarFile}')
-            if not path.isfile(polarFile):
-                raise ValueError(f'Error: xfoil format polar file {polarFile} does not exist.')
-            alphaList, machNum, clValues, cdValues = readInXfoilPolar(polarFile) # read in xfoil data and use flat plate values outside of given polar range
+        for alphaList, machNum, clValues, cdValues in runs: # xfoil data with flat plate values outside of given polar range
+            if float(machNum) in machNumbersforsection:
+                raise ValueError(f'ERROR: section {secIdx} has several xfoil polars for mach {machNum}')
             machNumbersforsection.append(float(machNum))
             secpol['liftCoeffs'].append([clValues])
             secpol['dragCoeffs'].append([cdValues])
@@ -331,22 +751,56 @@ def readInXfoilData(betDisk, xfoilPolarfiles):
     for i in range (len(machNumbers)-1): # check to make sure all N cross sections have the same list of mach numbers
         if machNumbers[i] != machNumbers[i+1]:
             raise ValueError(f'ERROR: the mach numbers from the Xfoil polars need to be the same set for each cross section. Here sections {i} \
-                    and {i+1} have the following sets of mach numbers:{secpol["machNumbers"][i]} and {secpol["machNumbers"][i+1]}')
+                    and {i+1} have the following sets of mach numbers:{machNumbers[i]} and {machNumbers[i+1]}')
     betDisk['alphas'] = alphaList
     betDisk['MachNumbers']=machNumbers[0] # they should all be the same set so just pick the first one.
-#    betDisk['sectionalPolars'].append(secpol)
 
     return betDisk
 
 
 ###############################################################################################################
-def readInC81Polars (betDisk, c81Polarfiles):
+def readInC81Polar(polarFile, alphaStep=10, blendWindow=0.5):
+    '''
+    Read in one C81 polar file, either as a csv file or in the genuine c81 format.
+    The csv polars that do not cover -180 to 180 deg are extended to the flat plate values with alphaStep and
+    blendWindow, see extendPolarsToFlatPlate. Use functools.partial(readInC81Polar, alphaStep=..., blendWindow=...) as
+    the readPolar of readInC81Polars to change them.
+
+    Returns
+    -------
+    4 lists of floats: clAlphas, clMachNums, clValues, cdValues
+    '''
+    if 'csv' in polarFile: # if we are dealing with a csv file
+        return readInC81Polarcsv(polarFile, alphaStep, blendWindow)
+    # we are dealing with a genuine c81 file, then I need to handle it by splitting the list into certain sizes
+    return readInC81Polarc81Format(polarFile)
+
+###############################################################################################################
+def readInC81PolarArrays(polarFile, alphaStep=10, blendWindow=0.5):
+    '''
+    Array version of readInC81Polar, this is the default reader of readInC81Polars.
+
+    Returns
+    -------
+    alphas, machs, cl and cd arrays of shape (number of machs, number of alphas)
+    '''
+    if 'csv' in polarFile: # if we are dealing with a csv file
+        return readInC81PolarcsvArrays(polarFile, alphaStep, blendWindow)
+    return readInC81Polarc81FormatArrays(polarFile)
+
+###############################################################################################################
+def readInC81Polars (betDisk, c81Polarfiles, readPolar=None, maxWorkers=None, resample=None):
     '''
     This function reads in the C81 polars and assigns the resulting values correctly into the BET disk dictionary
     Parameters
     ----------
     betDisk - Dictionary of values needed for the BET disk implementation
     c81Polarfiles - list of C81 polar files
+    readPolar - function reading one polar file, readInC81PolarArrays by default. It can also return the lists of
+                readInC81Polar. This is how the incremental builds reuse the polars of the files that did not change.
+    maxWorkers - maximum number of polar files read at the same time, see readPolarFiles
+    resample - optional dictionary of resamplePolars arguments (alphas, machs, kind). The polars of all the sections are
+               then interpolated onto a common alpha x Mach grid instead of having to use the same alphas and machs.
 
     Returns
     -------
@@ -355,43 +809,60 @@ def readInC81Polars (betDisk, c81Polarfiles):
     if len(c81Polarfiles) != len(betDisk['sectionalRadiuses']):
         raise ValueError(f'Error: There is an error in the number of polar files ({len(c81Polarfiles)}) vs the number of sectional Radiuses ({len(betDisk["sectionalRadiuses"])})')
 
-    betDisk['sectionalPolars'] = []
-    for secIdx, section in enumerate(betDisk['sectionalRadiuses']):
-        polarFile=c81Polarfiles[secIdx][0]# Take the first element of that list.
-        print (f'doing sectionalRadius {section} with polar file {polarFile}')
-        if not path.isfile(polarFile):
-            raise ValueError(f'Error: c81 format polar file {polarFile} does not exist.')
-
-        if 'csv' in polarFile: # if we are dealing with a csv file
-            alphaList,machList,clList,cdList=readInC81Polarcsv(polarFile)
-
-        else:
-            # we are dealing with a genuine c81 file, then I need to handle it by splitting the list into certain sizes
-            alphaList,machList,clList,cdList=readInC81Polarc81Format(polarFile)
-        if  'MachNumbers' in betDisk.keys() and betDisk['MachNumbers'] != machList:
-            raise ValueError('ERROR: The mach Numbers do not match across the various sectional radi polar c81 files. All the sectional radi need to have the same mach Numbers across all c81 polar files')
-        if 'alphas' in betDisk.keys() and betDisk['alphas'] != alphaList:
-            raise ValueError( 'ERROR: The alphas do not match across the various sectional radi polar c81 files. All the sectional radi need to have the same alphas across all c81 polar files')
+    if readPolar is None:
+        readPolar = readInC81PolarArrays
 
-        betDisk['MachNumbers']=machList
-        betDisk['alphas']=alphaList
+    polarFiles = [sectionFiles[0] for sectionFiles in c81Polarfiles]  # Take the first element of each list.
+    polars = readPolarFiles(polarFiles, readPolar, 'c81', maxWorkers)
 
+    return assignC81Polars(betDisk, polars, polarFiles, resample)
 
-        # since the order of brackets is Mach#, Rey#, Values then we need to return:
-        # [[[array for MAch #1]],[[array for MAch #2]],[[array for MAch #3]],[[array for MAch #4]],......]
+###############################################################################################################
+def assignC81Polars(betDisk, polars, sources, resample=None):
+    '''
+    This function checks that the C81 polars of all the sections use the same machs and alphas and assigns them
+    correctly into the BET disk dictionary
+    Parameters
+    ----------
+    betDisk - Dictionary of values needed for the BET disk implementation
+    polars - list with the (alphaList, machList, clList, cdList) of each section, either as returned by
+             readInC81PolarArrays or by readInC81Polar
+    sources - list with the polar file (or name) of each section, only used in the error messages
+    resample - optional dictionary of resamplePolars arguments (alphas, machs, kind). The polars of all the sections are
+               then interpolated onto a common alpha x Mach grid instead of having to use the same alphas and machs.
 
-        secpol = {}
-        secpol['liftCoeffs'] = []
-        secpol['dragCoeffs'] = []
-        for mach in betDisk['MachNumbers']:
-            secpol['liftCoeffs'].append([clList[mach]])
-            secpol['dragCoeffs'].append([cdList[mach]])
-        betDisk['sectionalPolars'].append(secpol)
+    Returns
+    -------
+    betDisk - same dictionary as was passed to function but with all the polar information added.
+    '''
+    # the (alphas, machs, cl, cd) arrays of each section, cl and cd of shape (nMachs, nAlphas)
+    polars = [(np.asarray(alphaList, dtype=float), np.asarray(machList, dtype=float),
+               np.asarray([clList[mach] for mach in machList] if isinstance(clList, dict) else clList, dtype=float),
+               np.asarray([cdList[mach] for mach in machList] if isinstance(cdList, dict) else cdList, dtype=float))
+              for alphaList, machList, clList, cdList in polars]
+    if resample is not None:
+        alphas, machs, cl, cd = resamplePolars(polars, **resample)
+        polars = [(alphas, machs, secCl, secCd) for secCl, secCd in zip(cl, cd)]
+
+    # now that all the files are loaded check they all use the same machs and alphas
+    for secIdx, (alphas, machs, cl, cd) in enumerate(polars):
+        if 'MachNumbers' in betDisk.keys() and not np.array_equal(betDisk['MachNumbers'], machs):
+            raise ValueError(f'ERROR: The mach Numbers do not match across the various sectional radi polar c81 files. All the sectional radi need to have the same mach Numbers across all c81 polar files, {sources[secIdx]} has {machs.tolist()} instead of {betDisk["MachNumbers"]}')
+        if 'alphas' in betDisk.keys() and not np.array_equal(betDisk['alphas'], alphas):
+            raise ValueError(f'ERROR: The alphas do not match across the various sectional radi polar c81 files. All the sectional radi need to have the same alphas across all c81 polar files, see {sources[secIdx]}')
+        betDisk['MachNumbers'] = machs.tolist()
+        betDisk['alphas'] = alphas.tolist()
+
+    # since the order of brackets is Mach#, Rey#, Values then we need to return:
+    # [[[array for MAch #1]],[[array for MAch #2]],[[array for MAch #3]],[[array for MAch #4]],......]
+    betDisk['sectionalPolars'] = [{'liftCoeffs': cl[:, None, :].tolist(), 'dragCoeffs': cd[:, None, :].tolist()}
+                                  for alphas, machs, cl, cd in polars]
 
     return betDisk
 
 ########################################################################################################################
-def generateXfoilBETJSON(geometryFileName,betDisk):
+def generateXfoilBETJSON(geometryFileName, betDisk, readPolar=None, parseGeometry=None, maxWorkers=None,
+                         polarDatabase=None, resample=None, asModel=False):
 
     """
     This function takes in a geometry input files along with the remaining required information and creates a flow360 BET input dictionary
@@ -400,6 +871,13 @@ def generateXfoilBETJSON(geometryFileName,betDisk):
     ----------
     geometryFileName: string, filepath to the geometry files we want to translate into a BET disk
     betDisk: dictionary of the required betdisk data that we can't get form the geometry file.
+    readPolar: optional function reading one polar file, see IncrementalBuild.
+    parseGeometry: optional function reading the geometry file, parseGeometryfile by default.
+    maxWorkers: maximum number of polar files read at the same time, see readPolarFiles.
+    polarDatabase: optional PolarDatabase, then the geometry file gives the airfoil name of each section instead of its
+                   polar files and the polars are looked up in the database.
+    resample: optional dictionary of resamplePolars arguments to translate sections with different alphas or machs.
+    asModel: bool, return a betDiskModel.BETDisk holding the disk in arrays instead of the dictionary.
     return: dictionary that we should append to the Flow360.json file we want to run with.
     """
 
@@ -410,15 +888,23 @@ def generateXfoilBETJSON(geometryFileName,betDisk):
     if len(betDisk['centerOfRotation']) != 3:
         raise ValueError('centerOfRotation must be a list of size 3. Exiting')
 
-    twistVec, chordVec, sectionalRadiuses, xfoilPolarfileList = parseGeometryfile(geometryFileName)
+    if parseGeometry is None:
+        parseGeometry = parseGeometryfile
+
+    twistVec, chordVec, sectionalRadiuses, xfoilPolarfileList = parseGeometry(geometryFileName)
     betDisk['radius'] = sectionalRadiuses[-1]
     betDisk['sectionalRadiuses'] = sectionalRadiuses
     betDisk['twists'] = twistVec
     betDisk['chords'] = chordVec
-    betDisk = readInXfoilData(betDisk, xfoilPolarfileList)  # add the mach values along with the polars from the xfoil files.
+    if polarDatabase is not None:  # the geometry file names the airfoils instead of giving their polar files
+        geometryDir = os.path.dirname(os.path.realpath(geometryFileName))
+        sectionNames = [[os.path.relpath(entry, geometryDir) for entry in entries] for entries in xfoilPolarfileList]
+        betDisk = assignXfoilPolars(betDisk, polarDatabase.xfoilSectionRuns(sectionNames), resample)
+    else:
+        betDisk = readInXfoilData(betDisk, xfoilPolarfileList, readPolar, maxWorkers, resample)  # add the mach values along with the polars from the xfoil files.
     betDisk['ReynoldsNumbers'] = generateReys()
 
-    return betDisk
+    return BETDisk.fromDict(betDisk) if asModel else betDisk
 ########################################################################################################################
 def parseGeometryfile(geometryFileName):
     '''
@@ -427,7 +913,8 @@ def parseGeometryfile(geometryFileName):
 
     #Radial station Sectional Radius (grid Units), polar definition file.
     If it is a C81 polar format, all the mach numbers are in the same file, hence 1 file per section.
-    If it is a Xfoil polar format, we need multiple file per section if we want to cover multiple machs
+    If it is a Xfoil polar format, we need multiple file per section if we want to cover multiple machs, unless they are
+    accumulation files holding several runs one after the other.
     number,filenameM1.csv,filenameM2.csv...
     number2,filename2M1.csv,filename2M2.csv,...
     number3,filename3M1.csv,filename3M2.csv,...
@@ -502,7 +989,8 @@ def parseGeometryfile(geometryFileName):
     return twistVec, chordVec, sectionalRadiuses, polarFiles
 
 ################################################################################################################
-def generateC81BETJSON(geometryFileName,betDisk):
+def generateC81BETJSON(geometryFileName, betDisk, readPolar=None, parseGeometry=None, maxWorkers=None,
+                       polarDatabase=None, resample=None, asModel=False):
 
     """
     This function takes in a geometry input files along with the remaining required information and creates a flow360 BET input dictionary
@@ -511,6 +999,13 @@ def generateC81BETJSON(geometryFileName,betDisk):
     ----------
     geometryFileName: string, filepath to the geometry files we want to translate into a BET disk
     betDisk: dictionary of the required betdisk data that we can't get form the geometry file.
+    readPolar: optional function reading one polar file, see IncrementalBuild.
+    parseGeometry: optional function reading the geometry file, parseGeometryfile by default.
+    maxWorkers: maximum number of polar files read at the same time, see readPolarFiles.
+    polarDatabase: optional PolarDatabase, then the geometry file gives the airfoil name of each section instead of its
+                   polar files and the polars are looked up in the database.
+    resample: optional dictionary of resamplePolars arguments to translate sections with different alphas or machs.
+    asModel: bool, return a betDiskModel.BETDisk holding the disk in arrays instead of the dictionary.
     return: dictionary that we should append to the Flow360.json file we want to run with.
     """
 
@@ -521,51 +1016,26 @@ def generateC81BETJSON(geometryFileName,betDisk):
     if len(betDisk['centerOfRotation']) != 3:
         raise ValueError('centerOfRotation must be a list of size 3. Exiting')
 
-    twistVec, chordVec, sectionalRadiuses, c81PolarfileList = parseGeometryfile(geometryFileName)
+    if parseGeometry is None:
+        parseGeometry = parseGeometryfile
+
+    twistVec, chordVec, sectionalRadiuses, c81PolarfileList = parseGeometry(geometryFileName)
     betDisk['radius'] = sectionalRadiuses[-1]
     betDisk['sectionalRadiuses'] = sectionalRadiuses
     betDisk['twists'] = twistVec
     betDisk['chords'] = chordVec
-    betDisk = readInC81Polars(betDisk, c81PolarfileList)  # add the mach values along with the polars from the c81 files.
+    if polarDatabase is not None:  # the geometry file names the airfoils instead of giving their polar files
+        geometryDir = os.path.dirname(os.path.realpath(geometryFileName))
+        names = [os.path.relpath(entries[0], geometryDir) for entries in c81PolarfileList]
+        betDisk = assignC81Polars(betDisk, polarDatabase.c81Polars(names), names, resample)
+    else:
+        betDisk = readInC81Polars(betDisk, c81PolarfileList, readPolar, maxWorkers, resample)  # add the mach values along with the polars from the c81 files.
     betDisk['ReynoldsNumbers'] = generateReys()
 
-    return betDisk
-
-########################################################################################################################
-def check_comment(comment_line, linenum,  numelts):
-    """
-    This function is used when reading an XROTOR input file to make sure that what should be comments really are
-
-    Attributes
-    ----------
-    comment_line: string
-    numelts: int
-    """
-    if not comment_line: # if the comment_line is empty.
-        return
-
-    # otherwise make sure that we are on a comment line
-    if not comment_line[0] == '!' and not (len(comment_line) == numelts):
-        raise ValueError(f'wrong format for line #%i: {comment_line}'%(linenum))
-
-
-########################################################################################################################
-def check_num_values(values_list, linenum,  numelts):
-    """
-    This function is used to make sure we have the expected number of inputs in a given line
-
-    Attributes
-    ----------
-    values: list
-    numelts:  int
-    return: None, it raises an exception if the error condition is met.
-    """
-    # make sure that we have the expected number of values.
-    if not (len(values_list) == numelts):
-        raise ValueError(f'wrong number of items for line #%i: {values_list}. We were expecting %i numbers and got %i'%(linenum, len(values_list), numelts))
+    return BETDisk.fromDict(betDisk) if asModel else betDisk
 
 ########################################################################################################################
-def readDFDCFile(dfdcFileName):
+def readDFDCFile(dfdcFileName, rotorIdx=0):
     """
     This functions read in the dfdc filename provided.
     it does rudimentary checks to make sure the file is truly in the dfdc format.
@@ -574,6 +1044,7 @@ def readDFDCFile(dfdcFileName):
     Attributes
     ----------
     dfdcFileName: string
+    rotorIdx: int, which disk to read when the dfdc case defines several of them.
     return: a dictionary with all the required values. That dictionary will be used to create BETdisks section of the
             Flow360 input JSON file.
 
@@ -622,133 +1093,32 @@ def readDFDCFile(dfdcFileName):
 
 
     """
-    with open(dfdcFileName, 'r') as fid:
+    dfdcInputDicts = readDFDCRotors(dfdcFileName)
+    if not 0 <= rotorIdx < len(dfdcInputDicts):
+        raise ValueError(f'rotorIdx {rotorIdx} is out of range, the dfdc file {dfdcFileName} defines {len(dfdcInputDicts)} disk(s)')
+    return dfdcInputDicts[rotorIdx]
+
+
+########################################################################################################################
+def readDFDCRotors(dfdcFileName):
+    """
+    Read in all the disks defined in the dfdc file provided, see readDFDCFile for the description of the file.
+    A DFDC case can define several disks, each with its own AERO and ROTOR blocks, they all share the OPER block.
 
-        # read in lines 5->8 which contains the run case information
-        dfdcInputDict = {}
-        linenum=0 # counter needed to report which line the error is on.
-        for i in range (4):
-            fid.readline()  # we have 4 blank lines
-            linenum+=1
-        comment_line = fid.readline().upper().split()
-        linenum += 1
-        check_comment(comment_line, linenum,  4)
-        values = fid.readline().split()
-        linenum += 1
-        # we don't want ot apply the check to this line b/c we could have a varying number of RPMs
-
-        dfdcInputDict['vel'] = float(values[1])
-        dfdcInputDict['RPM'] = float(values[2])
-
-        comment_line = fid.readline().upper().split()
-        linenum += 1
-        check_comment(comment_line, linenum,  5)
-        values = fid.readline().split()
-        linenum += 1
-        check_num_values(values, linenum, 4)
-        dfdcInputDict['rho'] = float(values[0])
-
-        for i in range(7):
-            fid.readline()  # skip next 8 lines.
-            linenum += 1
-
-        comment_line = fid.readline().upper().split()  # convert all to upper case
-        linenum += 1
-        check_comment(comment_line, linenum,  2)  # 2 because line should have 2 components
-        values = fid.readline().split()
-        linenum += 1
-        check_num_values(values, linenum, 1)  # we should have 1 value.
-        dfdcInputDict['nAeroSections'] = int(values[0])
-        # define the lists with the right number of elements
-        dfdcInputDict['rRstations'] = [0] * dfdcInputDict['nAeroSections']
-        dfdcInputDict['a0deg'] = [0] * dfdcInputDict['nAeroSections']  # WARNING, ao is in deg
-        dfdcInputDict['dclda'] = [0] * dfdcInputDict['nAeroSections']  # but dclda is in cl per radians
-        dfdcInputDict['clmax'] = [0] * dfdcInputDict['nAeroSections']
-        dfdcInputDict['clmin'] = [0] * dfdcInputDict['nAeroSections']
-        dfdcInputDict['dcldastall'] = [0] * dfdcInputDict['nAeroSections']
-        dfdcInputDict['dclstall'] = [0] * dfdcInputDict['nAeroSections']
-        dfdcInputDict['mcrit'] = [0] * dfdcInputDict['nAeroSections']
-        dfdcInputDict['cdmin'] = [0] * dfdcInputDict['nAeroSections']
-        dfdcInputDict['clcdmin'] = [0] * dfdcInputDict['nAeroSections']
-        dfdcInputDict['dcddcl2'] = [0] * dfdcInputDict['nAeroSections']
-
-        comment_line = fid.readline().upper().split()  # convert all to upper case
-        linenum += 1
-        check_comment(comment_line, linenum,  2)  # 2 because line should have 2 components
-        for i in range(dfdcInputDict['nAeroSections']):  # iterate over all the sections
-
-            values = fid.readline().split()
-            linenum += 1
-            check_num_values(values, linenum, 1)  # we should have 1 value.
-            dfdcInputDict['rRstations'][i] = float(values[0])  # aka xisection
-
-            comment_line = fid.readline().upper().split()  # convert all to upper case
-            linenum += 1
-            check_comment(comment_line, linenum,  5)  # 5 because line should have 5 components
-            values = fid.readline().split()
-            linenum += 1
-            check_num_values(values, linenum, 4)  # we should have 4 value.
-            dfdcInputDict['a0deg'][i] = float(values[0])  # WARNING, ao is in deg
-            dfdcInputDict['dclda'][i] = float(values[1])  # but dclda is in cl per radians
-            dfdcInputDict['clmax'][i] = float(values[2])
-            dfdcInputDict['clmin'][i] = float(values[3])
-
-            comment_line = fid.readline().upper().split()  # convert all to upper case
-            linenum += 1
-            check_comment(comment_line, linenum,  5)  # 5 because line should have 5 components
-            values = fid.readline().split()
-            linenum += 1
-            check_num_values(values, linenum, 4)  # we should have 4 value.
-            dfdcInputDict['dcldastall'][i] = float(values[0])
-            dfdcInputDict['dclstall'][i] = float(values[1])
-            dfdcInputDict['mcrit'][i] = float(values[3])
-
-            comment_line = fid.readline().upper().split()  # convert all to upper case
-            linenum += 1
-            check_comment(comment_line, linenum,  4)  # 4 because line should have 4 components
-            values = fid.readline().split()
-            linenum += 1
-            check_num_values(values, linenum, 3)  # we should have 3 value.
-            dfdcInputDict['cdmin'][i] = float(values[0])
-            dfdcInputDict['clcdmin'][i] = float(values[1])
-            dfdcInputDict['dcddcl2'][i] = float(values[2])
-
-            for i in range(2):
-                fid.readline()  # skip next 3 lines.
-                linenum += 1
-
-        for i in range(3):
-            fid.readline()  # skip next 3 lines.
-            linenum += 1
-        # Now we are done with the various aero sections and we start looking at blade geometry definitions
-        comment_line = fid.readline().upper().split()  # convert all to upper case
-        linenum += 1
-        check_comment(comment_line, linenum,  3)  # 3 because line should have 3 components
-        values = fid.readline().split()
-        linenum += 1
-        check_num_values(values, linenum, 3)  # we should have 3 values.
-        dfdcInputDict['nBlades'] = int(values[1])
-        comment_line = fid.readline().upper().split()  # convert all to upper case
-        linenum += 1
-        check_comment(comment_line, linenum,  2)
-        values = fid.readline().split()
-        linenum += 1
-        check_num_values(values, linenum, 1)
-        dfdcInputDict['nGeomStations'] = int(values[0])
-        # 2nd value on that  line is the number of blades
-        dfdcInputDict['rRGeom'] = [0] * dfdcInputDict['nGeomStations']
-        dfdcInputDict['cRGeom'] = [0] * dfdcInputDict['nGeomStations']
-        dfdcInputDict['beta0Deg'] = [0] * dfdcInputDict['nGeomStations']
-        comment_line = fid.readline().upper().split()  # convert all to upper case
-        linenum += 1
-        check_comment(comment_line, linenum,  4)  # 4 because line should have 4 components
-        for i in range(dfdcInputDict['nGeomStations']):  # iterate over all the geometry stations
-            values = fid.readline().split()
-            linenum += 1
-            check_num_values(values, linenum, 3)  # we should have 3 values.
-            dfdcInputDict['rRGeom'][i] = float(values[0])  # key string is not quite true b/c it is the dimensional radius  but I need a place to store the r locations that matches the Xrotor format
-            dfdcInputDict['cRGeom'][i] = float(values[1])  # key string is not quite true b/c it is the dimensional chord but I need a place to store the chord dimensions that matches the Xrotor format
-            dfdcInputDict['beta0Deg'][i] = float(values[2])  # twist values
+    Attributes
+    ----------
+    dfdcFileName: string
+    return: list of dictionaries, one per disk, with all the required values.
+    """
+    with open(dfdcFileName, 'r') as fid:
+        topLine = fid.readline()
+        if topLine.find('DFDC') != 0:
+            raise ValueError(f'The input file {dfdcFileName} does not seem to be a valid DFDC input file')
+        dfdcInputDicts = readDFDCLayout(fid, dfdcFileName)
+
+    for dfdcInputDict in dfdcInputDicts:
+        # key strings rRGeom and cRGeom are not quite true b/c they are the dimensional radius and chord but I need a
+        # place to store them that matches the Xrotor format
         if dfdcInputDict['rRGeom'][0] != 0:  # As per discussion in
             # https://enreal.slack.com/archives/C01PFAJ76FL/p1643652853237749?thread_ts=1643413462.002919&cid=C01PFAJ76FL
             # i need to ensure that the blade coordinates go all the way to r/R=0 and have a 0 chord  90deg twist at r/R=0
@@ -757,24 +1127,18 @@ def readDFDCFile(dfdcFileName):
             dfdcInputDict['beta0Deg'].insert(0, 90.0)
             dfdcInputDict['nGeomStations'] += 1  # we have added one station.
 
-
-
-    # for i in range(dfdcInputDict['nGeomStations']):  # iterate over all the geometry stations to nondimensionalize by radius.
-    #     dfdcInputDict['rRGeom'][i] = dfdcInputDict['rRGeom'][i] * dfdcInputDict['rad']  # aka r/R location
-    #     dfdcInputDict['cRGeom'][i] = dfdcInputDict['cRGeom'][i] * dfdcInputDict['rad']  # aka r/R location
-
-    dfdcInputDict['rad'] = dfdcInputDict['rRGeom'][-1] # radius in m is the last value in the r list
-    # calculate Extra values and add them  to the dict
-    dfdcInputDict['omegaDim'] = dfdcInputDict['RPM'] * pi / 30
-    dfdcInputDict['inputType'] = 'dfdc' # we need to store which file format we are using to handle the r vs r/R situation correctly.
+        dfdcInputDict['rad'] = dfdcInputDict['rRGeom'][-1] # radius in m is the last value in the r list
+        # calculate Extra values and add them  to the dict
+        dfdcInputDict['omegaDim'] = dfdcInputDict['RPM'] * pi / 30
+        dfdcInputDict['inputType'] = 'dfdc' # we need to store which file format we are using to handle the r vs r/R situation correctly.
     # Now we are done, we have all the data we need.
-    return dfdcInputDict
+    return dfdcInputDicts
 
 
 ########################################################################################################################
 
 ########################################################################################################################
-def readXROTORFile(xrotorFileName):
+def readXROTORFile(xrotorFileName, rotorIdx=0):
     """
     This functions read in the Xrotor filename provided.
     it does rudimentary checks to make sure the file is truly in the Xrotor format.
@@ -783,6 +1147,7 @@ def readXROTORFile(xrotorFileName):
     Attributes
     ----------
     input: xrotorFileName: string
+    rotorIdx: int, which disk to read when we are given a DFDC file that defines several of them.
     returns: a dictionary with all the required values. That dictionary will be used to create BETdisks section of the
             Flow360 input JSON file.
 
@@ -834,151 +1199,18 @@ def readXROTORFile(xrotorFileName):
 
     """
 
-    try:
-        fid = open(xrotorFileName, 'r')
-        linenum=0 # counter needed to know which line we are on for error reporting
+    with open(xrotorFileName, 'r') as fid:
         # Top line in the file should start with the XROTOR keywords.
-        topLine=fid.readline()
-        linenum+=1
+        topLine = fid.readline()
         if topLine.find('DFDC') == 0:  # If we are actually doing a DFDC file instead of Xrotor
             fid.close()  # close the file b/c we will reopen it in readDFDCFile
-            return readDFDCFile(xrotorFileName)
+            return readDFDCFile(xrotorFileName, rotorIdx)
 
         elif topLine.find('XROTOR') == -1:
             raise ValueError('This input Xrotor file does not seem to be a valid Xrotor input file')
 
-        # read in lines 2->8 which contains the run case information
-        xrotorInputDict = {}
-
-        fid.readline()
-        linenum += 1
-        comment_line = fid.readline().upper().split()
-        linenum += 1
-        check_comment(comment_line, linenum,  5)
-
-        values = fid.readline().split()
-        linenum += 1
-        check_num_values(values, linenum, 4)
-
-        comment_line = fid.readline().upper().split()
-        linenum += 1
-        check_comment(comment_line, linenum,  5)
-        values = fid.readline().split()
-        linenum += 1
-        check_num_values(values, linenum, 4)
-        xrotorInputDict['rad'] = float(values[0])
-        xrotorInputDict['vel'] = float(values[1])
-        xrotorInputDict['adv'] = float(values[2])
-
-        fid.readline()
-        linenum += 1
-        fid.readline()
-        linenum += 1
-        comment_line = fid.readline().upper().split()
-        linenum += 1
-        check_comment(comment_line, linenum,  2)
-        values = fid.readline().split()
-        linenum += 1
-        check_num_values(values, linenum, 1)
-
-        nAeroSections = int(values[0])
-        # Initialize the dictionary with all the information to re-create the polars at each defining aero section.
-        xrotorInputDict['nAeroSections'] = nAeroSections
-        xrotorInputDict['rRstations'] = [0] * nAeroSections
-        xrotorInputDict['a0deg'] = [0] * nAeroSections
-        xrotorInputDict['dclda'] = [0] * nAeroSections
-        xrotorInputDict['clmax'] = [0] * nAeroSections
-        xrotorInputDict['clmin'] = [0] * nAeroSections
-        xrotorInputDict['dcldastall'] = [0] * nAeroSections
-        xrotorInputDict['dclstall'] = [0] * nAeroSections
-        xrotorInputDict['mcrit'] = [0] * nAeroSections
-        xrotorInputDict['cdmin'] = [0] * nAeroSections
-        xrotorInputDict['clcdmin'] = [0] * nAeroSections
-        xrotorInputDict['dcddcl2'] = [0] * nAeroSections
-
-        for i in range(nAeroSections):  # loop ever each aero section and populate the required variables.
-            comment_line = fid.readline().upper().split()
-            linenum += 1
-            check_comment(comment_line, linenum,  2)
-            values = fid.readline().split()
-            linenum += 1
-            check_num_values(values, linenum, 1)
-            xrotorInputDict['rRstations'][i] = float(values[0])
-
-            comment_line = fid.readline().upper().split()
-            linenum += 1
-            check_comment(comment_line, linenum,  5)
-            values = fid.readline().split()
-            linenum += 1
-            check_num_values(values, linenum, 4)
-            xrotorInputDict['a0deg'][i] = float(values[0])
-            xrotorInputDict['dclda'][i] = float(values[1])
-            xrotorInputDict['clmax'][i] = float(values[2])
-            xrotorInputDict['clmin'][i] = float(values[3])
-
-            comment_line = fid.readline().upper().split()
-            linenum += 1
-            check_comment(comment_line, linenum,  5)
-            values = fid.readline().split()
-            linenum += 1
-            check_num_values(values, linenum, 4)
-            xrotorInputDict['dcldastall'][i] = float(values[0])
-            xrotorInputDict['dclstall'][i] = float(values[1])
-            xrotorInputDict['mcrit'][i] = float(values[3])
-
-            comment_line = fid.readline().upper().split()
-            linenum += 1
-            check_comment(comment_line, linenum,  4)
-            values = fid.readline().split()
-            linenum += 1
-            check_num_values(values, linenum, 3)
-            xrotorInputDict['cdmin'][i] = float(values[0])
-            xrotorInputDict['clcdmin'][i] = float(values[1])
-            xrotorInputDict['dcddcl2'][i] = float(values[2])
-
-            comment_line = fid.readline().upper().split()
-            linenum += 1
-            check_comment(comment_line, linenum,  3)
-            values = fid.readline().split()
-            linenum += 1
-        # skip the duct information
-        fid.readline()
-        linenum += 1
-        fid.readline()
-        linenum += 1
-
-        # Now we are done with the various aero sections and we start
-        # looking at blade geometry definitions
-        comment_line = fid.readline().upper().split()
-        linenum += 1
-        check_comment(comment_line, linenum,  3)
-        values = fid.readline().split()
-        linenum += 1
-        check_num_values(values, linenum, 2)
-
-        nGeomStations = int(values[0])
-        xrotorInputDict['nGeomStations'] = nGeomStations
-        xrotorInputDict['nBlades'] = int(values[1])
-        xrotorInputDict['rRGeom'] = [0] * nGeomStations
-        xrotorInputDict['cRGeom'] = [0] * nGeomStations
-        xrotorInputDict['beta0Deg'] = [0] * nGeomStations
-
-        comment_line = fid.readline().upper().split()
-        linenum += 1
-        check_comment(comment_line, linenum,  5)
-
-        # iterate over all the geometry stations
-        for i in range(nGeomStations):
-
-            values = fid.readline().split()
-            linenum += 1
-            check_num_values(values, linenum, 4)
-            xrotorInputDict['rRGeom'][i] = float(values[0])
-            xrotorInputDict['cRGeom'][i] = float(values[1])
-            xrotorInputDict['beta0Deg'][i] = float(values[2])
-
-    finally: # We are done reading
-            fid.close()
+        # the rest of the file is read in one pass following the XROTOR_LAYOUT definition.
+        xrotorInputDict = readXROTORLayout(fid, xrotorFileName)
 
     # Set the twist at the root to be 90 so that it is continuous on
     # either side of the origin. I.e Across blades' root. Also set
@@ -1006,7 +1238,7 @@ def generateTwists(xrotorDict, meshUnit):
 
     Attributes
     ----------
-    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName):
+    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName, rotorIdx=0):
     meshUnit: float,  Grid unit length in the mesh.
     return:  list of dictionaries containing the radius ( in grid units) and twist in degrees.
     """
@@ -1033,7 +1265,7 @@ def generateChords(xrotorDict, meshUnit):
 
     Attributes
     ----------
-    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName):
+    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName, rotorIdx=0):
     meshUnit: float,  Grid unit length per meter in the mesh. if your grid is in mm then meshUnit = 0.001 meter per mm;
     If your grid is in inches then meshUnit = 0.0254 meter per in etc...
     return:  list of dictionaries containing the radius ( in grid units) and chords in grid units.
@@ -1070,6 +1302,45 @@ def generateMachs():
     return machVec
 
 
+########################################################################################################################
+def generateAdaptiveMachs(xrotorDict, alphas, tolerance, machMax=sqrt(0.9), resolution=0.005):
+    """
+    Generate a list of Mach numbers from 0 to machMax adapted to the Xrotor polars of the disk, instead of the fixed
+    4 Mach numbers of generateMachs. The polars are evaluated on a fine grid of Mach numbers that also contains the
+    critical Mach number of each aero section, and we only keep the Mach numbers needed for linear interpolation
+    between them to reproduce the CL and CD values within tolerance, outside of the flat plate blended alphas. This
+    puts the points where the Prandtl-Glauert and compressibility drag terms of calcClCdArrays change fastest and drops
+    them where the polars vary linearly.
+
+    Attributes
+    ----------
+    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName, rotorIdx=0):
+    alphas: list of floats, alphas the polars will be generated at.
+    tolerance: float, maximum absolute error on CL and CD of the linear interpolation between the returned Mach
+    numbers.
+    machMax: float, largest Mach number of the table.
+    resolution: float, spacing of the fine grid of Mach numbers we select from.
+    return: list of floats
+    """
+
+    nSteps = max(1, int(ceil(machMax / resolution)))
+    mcrits = np.asarray(xrotorDict['mcrit'], dtype=float)
+    fineMachs = np.unique(np.concatenate([np.linspace(0, machMax, nSteps + 1),
+                                          mcrits[(mcrits > 0) & (mcrits < machMax)]]))
+    cl, cd, alphaMinIdx, alphaMaxIdx = calcClCdArrays(xrotorDict, alphas, fineMachs, returnBlendIdxs=True)
+
+    # The alpha where the flat plate blending starts moves in discrete steps with the Mach number, which makes the
+    # blended part of the polars jump in the Mach direction. Linear interpolation can't follow those jumps so we only
+    # control the error on the (section, alpha) pairs that are outside of the blending at every Mach number.
+    alphaIdx = np.arange(len(alphas))
+    unblended = ((alphaIdx >= alphaMinIdx.max(axis=1)[:, None]) & (alphaIdx < alphaMaxIdx.min(axis=1)[:, None]))
+
+    # put the Mach numbers on the last axis, the selection treats every (section, alpha) pair as a curve
+    curves = np.concatenate([cl.swapaxes(1, 2)[unblended], cd.swapaxes(1, 2)[unblended]])
+    keptIdx = selectGridPoints(fineMachs, curves, tolerance)
+    return fineMachs[keptIdx].tolist()
+
+
 ########################################################################################################################
 def generateReys():
     """
@@ -1103,6 +1374,99 @@ def generateAlphas():
     #return floatRange(-180, 181)
 
 
+########################################################################################################################
+def selectGridPoints(x, values, tolerance, requiredIdxs=()):
+    """
+    Select the smallest subset of the points x we need so that piecewise linear interpolation through the kept points
+    reproduces every curve in values within tolerance at all the points of x.
+    The first and last points are always kept. Each pass adds the worst point of every interval still above the
+    tolerance, all the curves being checked at once.
+
+    Attributes
+    ----------
+    x: 1D array of strictly increasing floats
+    values: array of floats with the x points on the last axis, i.e. any number of curves sampled at x
+    tolerance: float, maximum absolute interpolation error allowed
+    requiredIdxs: list of ints, indices of points that must be kept
+    return: sorted int array of the indices of x to keep
+    """
+
+    x = np.asarray(x, dtype=float)
+    nPoints = len(x)
+    values = np.asarray(values, dtype=float).reshape(-1, nPoints)
+    if not np.isfinite(values).all():  # the error would be NaN, never above the tolerance, and we would never stop
+        raise ValueError('the curves have NaN or infinite values, we can not select the points to interpolate them')
+    pointIdx = np.arange(nPoints)
+
+    keep = np.zeros(nPoints, dtype=bool)
+    keep[[0, -1]] = True
+    keep[np.asarray(requiredIdxs, dtype=int)] = True
+
+    while True:
+        keptIdx = np.flatnonzero(keep)
+        # interval of the kept points each point falls into
+        right = np.clip(np.searchsorted(keptIdx, pointIdx), 1, len(keptIdx) - 1)
+        interval = right - 1
+        idx0 = keptIdx[interval]
+        idx1 = keptIdx[right]
+        weight = (x - x[idx0]) / (x[idx1] - x[idx0])
+        error = np.abs(values[:, idx0] * (1 - weight) + values[:, idx1] * weight - values).max(axis=0)
+        error[keep] = 0
+        if error.max() <= tolerance:
+            return keptIdx
+
+        # worst point of each interval, sorted by interval then by decreasing error
+        order = np.lexsort((-error, interval))
+        worst = order[np.r_[True, interval[order][1:] != interval[order][:-1]]]
+        keep[worst[error[worst] > tolerance]] = True
+
+
+########################################################################################################################
+def generateFineAlphas(resolution=0.25):
+    """
+    Fine grid of alphas from -180 to 180 deg that generateAdaptiveAlphas selects its alphas from.
+
+    Attributes
+    ----------
+    resolution: float, spacing in degrees of the grid
+    return: array of floats
+    """
+    return np.linspace(-180, 180, int(round(360 / resolution)) + 1)
+
+
+########################################################################################################################
+def generateAdaptiveAlphas(xrotorDict, machs, tolerance, resolution=0.25):
+    """
+    Generate a list of Alphas from -180 to 180 adapted to the Xrotor polars of the disk, instead of the fixed table of
+    generateAlphas. The polars are evaluated on a fine grid of alphas and we only keep the alphas needed for linear
+    interpolation between them to reproduce every CL and CD polar, at every aero section and Mach number, within
+    tolerance. This refines around stall, the CL limiter knees and the flat plate blend windows and coarsens the
+    linear and flat plate ranges.
+
+    The alphas on either side of the CLmin and CLmax crossings are always kept so that the flat plate blending done by
+    calcClCdArrays starts at the same alphas on the adapted grid as on the fine one.
+
+    Attributes
+    ----------
+    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName, rotorIdx=0):
+    machs: list of floats, mach numbers the polars will be generated at.
+    tolerance: float, maximum absolute error on CL and CD of the linear interpolation between the returned alphas.
+    resolution: float, spacing in degrees of the fine grid of alphas we select from.
+    return: list of floats
+    """
+
+    fineAlphas = generateFineAlphas(resolution)
+    cl, cd, alphaMinIdx, alphaMaxIdx = calcClCdArrays(xrotorDict, fineAlphas, machs, returnBlendIdxs=True)
+
+    # alphaMinIdx is the index before the last CL below CLmin and alphaMaxIdx the one after the first CL above CLmax
+    requiredIdxs = np.concatenate([(alphaMinIdx[..., None] + np.arange(3)).ravel(),
+                                   (alphaMaxIdx[..., None] - np.arange(3)).ravel()])
+    requiredIdxs = requiredIdxs[(requiredIdxs >= 0) & (requiredIdxs < len(fineAlphas))]
+
+    keptIdx = selectGridPoints(fineAlphas, np.stack([cl, cd]), tolerance, requiredIdxs)
+    return fineAlphas[keptIdx].tolist()  # json doesn't like the numpy float64 type so we return python floats
+
+
 ########################################################################################################################
 def findClMinMaxAlphas(CLIFT, CLMIN, CLMAX):
     """
@@ -1151,67 +1515,154 @@ def blendFuncValue(blendWindow, alpha, alphaMinMax, alphaRange):
         return: float (blend value for that alpha
     """
 
+    return float(blendFuncValues(blendWindow, alpha, alphaMinMax, alphaRange))
+
+
+########################################################################################################################
+def blendFuncValues(blendWindow, alpha, alphaMinMax, alphaRange):
+    """
+    Vectorized version of blendFuncValue, alpha and alphaMinMax can be any arrays that broadcast together.
+
+    Attributes
+    ----------
+
+        blendWindow: float size of the window we want to blend from the given 2D polar
+        alpha: array of alphas we are at in radians
+        alphaMinMax: array of alpha min or alpha max for the 2D polars in radians.
+        alphaRange: string, used to figure out whether we are doing before CLmin or beyond CLmax
+        return: array of blend values
+    """
+
+    cosBlend = np.cos((alpha - alphaMinMax) / blendWindow * pi / 2) ** 2
     if 'aboveCLmax' in alphaRange:
         # we are on the CLMAX side:
-        if alpha < alphaMinMax:
-            return 1
-        if alpha > alphaMinMax + blendWindow:
-            return 0
-        return cos((alpha - alphaMinMax) / blendWindow * pi / 2) ** 2
+        return np.where(alpha < alphaMinMax, 1.0, np.where(alpha > alphaMinMax + blendWindow, 0.0, cosBlend))
     if 'belowCLmin' in alphaRange:
         # we are on the CLMIN side:
-        if alpha > alphaMinMax:
-            return 1
-        if alpha < alphaMinMax - blendWindow:
-            return 0
-        return cos((alpha - alphaMinMax) / blendWindow * pi / 2) ** 2
-    else:
-        raise ValueError(f'alphaRange must be either aboveCLmax or belowCLmin, it is: {alphaRange}')
+        return np.where(alpha > alphaMinMax, 1.0, np.where(alpha < alphaMinMax - blendWindow, 0.0, cosBlend))
+    raise ValueError(f'alphaRange must be either aboveCLmax or belowCLmin, it is: {alphaRange}')
+
+
+########################################################################################################################
+def blendToFlatPlate(CLIFT, CDRAG, alpha, blendVal):
+    """
+    Blending kernel shared by the C81, Xfoil and Xrotor polars. Returns blendVal times the given CL and CD plus
+    (1 - blendVal) times the flat plate CL and CD. All the arguments are arrays that broadcast together.
+
+    Attributes
+    ----------
+    CLIFT: array of floats
+    CDRAG: array of floats
+    alpha: array of alphas in radians
+    blendVal: array of blend values as returned by blendFuncValues
+
+    return: 2 arrays representing the blended CL and CD
+    """
+
+    # this follows the flat plate lift and drag equations times the blend val coefficient
+    sinA = np.sin(alpha)
+    CLIFT = CLIFT * blendVal + (1 - blendVal) * np.cos(alpha) * 2 * pi * sinA / np.sqrt(1 + (2 * pi * sinA) ** 2)
+    CDRAG = CDRAG * blendVal + (1 - blendVal) * sinA * (2 * pi * sinA) ** 3 / np.sqrt(1 + (2 * pi * sinA) ** 6) + 0.05
+    return CLIFT, CDRAG
 
 
 ########################################################################################################################
-def xrotorBlend2flatPlate(CLIFT, CDRAG, alphas, alphaMinIdx, alphaMaxIdx):
+def xrotorBlend2flatPlate(CLIFT, CDRAG, alphas, alphaMinIdx, alphaMaxIdx, blendWindow=0.5):
     """
      Blend the Clift and Cdrag values outside of the normal working range of alphas to the flat plate CL and CD values.
 
     Attributes
     ----------
-    CLIFT: float
-    CDRAG: float
+    CLIFT: list of floats
+    CDRAG: list of floats
     alphas: list of floats
     alphaMinIdx: int, index within the above list of alphas
     alphaMaxIdx: int, index within the above list of alphas
+    blendWindow: float, size in radians of the window over which we blend to the flat plate values
 
-    return: 2 Floats representing the blended CL and CD at that alpha
+    return: 2 lists of floats representing the blended CL and CD
     """
 
-    blendWindow = 0.5  # 0.5 radians
-    alphaMin = alphas[alphaMinIdx] * pi / 180
-    alphaMax = alphas[alphaMaxIdx] * pi / 180
+    CLIFT, CDRAG = xrotorBlend2flatPlateArrays(np.asarray(CLIFT, dtype=float), np.asarray(CDRAG, dtype=float),
+                                               np.asarray(alphas, dtype=float), np.asarray(alphaMinIdx),
+                                               np.asarray(alphaMaxIdx), blendWindow)
+    return CLIFT.tolist(), CDRAG.tolist()
 
-    for i in range(alphaMinIdx):  # from -pi to alphaMin in the CLIFT array
-        a = alphas[i] * pi / 180  # alpha in radians
 
-        blendVal = blendFuncValue(blendWindow, a, alphaMin, 'belowCLmin')  # we are on the alphaCLmin side going up in CL
-        # this follows the flat plate lift and drag equations times the blend val coefficient
-        CLIFT[i] = CLIFT[i] * blendVal + (1 - blendVal) * cos(a) * 2 * pi * sin(a) / sqrt(1 + (2 * pi * sin(a)) ** 2)
-        CDRAG[i] = CDRAG[i] * blendVal + (1 - blendVal) * sin(a) * (2 * pi * sin(a)) ** 3 / sqrt(1 + (2 * pi * sin(a)) ** 6) + 0.05
+########################################################################################################################
+def findClMinMaxAlphaIdxs(CLIFT, CLMIN, CLMAX):
+    """
+    Vectorized version of findClMinMaxAlphas. Works on the last axis of CLIFT so every (section, mach) polar is
+    handled at once.
 
-    for j in range(alphaMaxIdx, len(alphas)):     # from alphaMax to Pi in the CLIFT array
-        a = alphas[j] * pi / 180  # alpha in radians
-        blendVal = blendFuncValue(blendWindow, a, alphaMax, 'aboveCLmax')  # we are on the alphaCLmax side of things going up in CL
-        # this follows the flat plate lift and drag equations times the blend val coefficient
-        CLIFT[j] = CLIFT[j] * blendVal + (1 - blendVal) * cos(a) * 2 * pi * sin(a) / sqrt(1 + (2 * pi * sin(a)) ** 2)
-        CDRAG[j] = CDRAG[j] * blendVal + (1 - blendVal) * sin(a) * (2 * pi * sin(a)) ** 3 / sqrt(1 + (2 * pi * sin(a)) ** 6) + 0.05
-    return CLIFT, CDRAG
+    Attributes
+    ----------
+
+    CLIFT: array of floats with the alphas on the last axis
+    CLMIN: array of floats broadcastable against CLIFT[..., :1]
+    CLMAX: array of floats broadcastable against CLIFT[..., :1]
+    return: 2 int arrays of indices with the shape of CLIFT[..., 0]
+    """
+
+    nAlphas = CLIFT.shape[-1]
+    idx = np.arange(nAlphas)
+
+    # first alpha where we go above CLMAX, this is where findClMinMaxAlphas breaks out of its loop
+    aboveMax = CLIFT > CLMAX
+    clMaxIdx = np.where(aboveMax.any(axis=-1), aboveMax.argmax(axis=-1), nAlphas)
+
+    # last alpha below CLMIN, only looking at the alphas traversed before the break above.
+    belowMin = (CLIFT < CLMIN) & (idx <= clMaxIdx[..., None])
+    clMinIdx = np.where(belowMin.any(axis=-1), nAlphas - 1 - belowMin[..., ::-1].argmax(axis=-1), 0)
+
+    return clMinIdx - 1, clMaxIdx + 1  # return the two indices right before and after the two found values.
 
 
 ########################################################################################################################
-def calcClCd(xrotorDict, alphas, machNum, nrRstation):
+def xrotorBlend2flatPlateArrays(CLIFT, CDRAG, alphas, alphaMinIdx, alphaMaxIdx, blendWindow=0.5):
     """
+    Vectorized version of xrotorBlend2flatPlate. Blends every (section, mach) polar at once.
 
-    This function is transcribed from the Xrotor source code. https://web.mit.edu/drela/Public/web/xrotor/
-    Use the 2D polar parameters from the Xrotor input file to get the Cl and Cd at the various Alphas and given MachNum
+    Attributes
+    ----------
+    CLIFT: array of floats with the alphas on the last axis
+    CDRAG: array of floats with the same shape as CLIFT
+    alphas: 1D array of floats, in degrees
+    alphaMinIdx: int array with the shape of CLIFT[..., 0]
+    alphaMaxIdx: int array with the shape of CLIFT[..., 0]
+    blendWindow: float, size in radians of the window over which we blend to the flat plate values
+
+    return: 2 arrays representing the blended CL and CD
+    """
+
+    nAlphas = len(alphas)
+    a = alphas * pi / 180  # alphas in radians
+    idx = np.arange(nAlphas)
+
+    # alphaMaxIdx can run past the end of the alphas when the polar never goes above CLMAX, in that case there is
+    # nothing to blend on that side.
+    alphaMin = a[np.clip(alphaMinIdx, 0, nAlphas - 1)][..., None]
+    alphaMax = a[np.clip(alphaMaxIdx, 0, nAlphas - 1)][..., None]
+    belowMin = idx < alphaMinIdx[..., None]
+    aboveMax = (idx >= alphaMaxIdx[..., None]) & (alphaMaxIdx[..., None] < nAlphas)
+
+    # COS^2 blend, 1 means we keep the given polar and 0 means we use the flat plate values.
+    blendVal = np.where(belowMin, blendFuncValues(blendWindow, a, alphaMin, 'belowCLmin'),
+                        np.where(aboveMax, blendFuncValues(blendWindow, a, alphaMax, 'aboveCLmax'), 1.0))
+
+    blendedCL, blendedCD = blendToFlatPlate(CLIFT, CDRAG, a, blendVal)
+    blended = belowMin | aboveMax  # the 0.05 flat plate Cd is added to all the alphas we blend, even if blendVal is 1
+    return np.where(blended, blendedCL, CLIFT), np.where(blended, blendedCD, CDRAG)
+
+
+########################################################################################################################
+def calcClCdArrays(xrotorDict, alphas, machs, sections=None, returnBlendIdxs=False):
+    """
+
+    Vectorized version of calcClCd. This function is transcribed from the Xrotor source code.
+    https://web.mit.edu/drela/Public/web/xrotor/
+    Use the 2D polar parameters from the Xrotor input file to get the Cl and Cd at every alpha, Mach number and
+    aero section in one go, using numpy broadcasting over a (nSections, nMachs, nAlphas) grid.
 
     Calculate compressibility factor taken from xaero.f in xrotor source code
     Factors for compressibility drag model, HHY 10/23/00
@@ -1223,11 +1674,13 @@ def calcClCd(xrotorDict, alphas, machNum, nrRstation):
 
     Attributes
     ----------
-    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName):
-    alphas: list of ints, alphas we have for the polar.
-    machNum: float, mach number we do this polar at.
-    nrRstation: int, which r/R station we have to define this polar for.
-    return: 2 list of floats representing the CL and CD for  that polar
+    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName, rotorIdx=0):
+    alphas: list of floats, alphas we have for the polar in degrees.
+    machs: list of floats, mach numbers we do the polars at.
+    sections: list of ints, which r/R stations we define the polars for. Defaults to all the aero sections.
+    returnBlendIdxs: bool, also return the alphaMinIdx and alphaMaxIdx arrays of shape (nSections, nMachs) outside of
+    which the polars are blended to the flat plate values.
+    return: 2 arrays of floats of shape (nSections, nMachs, nAlphas) representing the CL and CD polars
     """
 
     CDMFACTOR = 10.0
@@ -1236,75 +1689,75 @@ def calcClCd(xrotorDict, alphas, machNum, nrRstation):
     CDMDD = 0.0020
     CDMSTALL = 0.1000
 
-    # Prandtl-Glauert compressibility factor
-    MSQ = machNum ** 2
+    if sections is None:
+        sections = range(xrotorDict['nAeroSections'])
+    sections = list(sections)
 
-    if MSQ > 1.0:
-        print('CLFUNC: Local Mach^2 number limited to 0.99, was ', MSQ)
-        MSQ = 0.99
+    def sectionValues(key):
+        # aero section parameters on the first axis of the (nSections, nMachs, nAlphas) grid
+        return np.array([xrotorDict[key][i] for i in sections], dtype=float)[:, None, None]
 
-    PG = 1.0 / sqrt(1.0 - MSQ)
-    MACH = machNum
+    alphas = np.asarray(alphas, dtype=float)
+    MACH = np.asarray(machs, dtype=float)[None, :, None]
+
+    # Prandtl-Glauert compressibility factor
+    MSQ = MACH ** 2
+    for msq in MSQ[MSQ > 1.0]:
+        print('CLFUNC: Local Mach^2 number limited to 0.99, was ', msq)
+    MSQ = np.where(MSQ > 1.0, 0.99, MSQ)
+
+    PG = 1.0 / np.sqrt(1.0 - MSQ)
 
     # Generate CL from dCL/dAlpha and Prandtl-Glauert scaling
-    A_zero = xrotorDict['a0deg'][nrRstation] * pi / 180
-    DCLDA = xrotorDict['dclda'][nrRstation]
+    A_zero = sectionValues('a0deg') * pi / 180
+    DCLDA = sectionValues('dclda')
 
-    CLA = [0] * len(alphas)
-    for i, a in enumerate(alphas):
-        CLA[i] = DCLDA * PG * ((a * pi / 180) - A_zero)
-    CLA = array(CLA)    
+    CLA = DCLDA * PG * ((alphas * pi / 180) - A_zero)
 
     # Reduce CLmax to match the CL of onset of serious compressible drag
-    CLMAX = xrotorDict['clmax'][nrRstation]
-    CLMIN = xrotorDict['clmin'][nrRstation]
-    CLDMIN = xrotorDict['clcdmin'][nrRstation]
-    MCRIT = xrotorDict['mcrit'][nrRstation]
+    CLMAX = sectionValues('clmax')
+    CLMIN = sectionValues('clmin')
+    CLDMIN = sectionValues('clcdmin')
+    MCRIT = sectionValues('mcrit')
 
     DMSTALL = (CDMSTALL / CDMFACTOR) ** (1.0 / MEXP)
-    CLMAXM = max(0.0, (MCRIT + DMSTALL - MACH) / CLMFACTOR) + CLDMIN
-    CLMAX = min(CLMAX, CLMAXM)
-    CLMINM = min(0.0, - (MCRIT + DMSTALL - MACH) / CLMFACTOR) + CLDMIN
-    CLMIN = max(CLMIN, CLMINM)
+    CLMAXM = np.maximum(0.0, (MCRIT + DMSTALL - MACH) / CLMFACTOR) + CLDMIN
+    CLMAX = np.minimum(CLMAX, CLMAXM)
+    CLMINM = np.minimum(0.0, - (MCRIT + DMSTALL - MACH) / CLMFACTOR) + CLDMIN
+    CLMIN = np.maximum(CLMIN, CLMINM)
 
     # CL limiter function (turns on after +-stall)
-    DCL_STALL = xrotorDict['dclstall'][nrRstation]
-    ECMAX = expList(clip((CLA - CLMAX) / DCL_STALL, -inf, 200))
-    ECMIN = expList(clip((CLA * (-1) + CLMIN) / DCL_STALL, -inf, 200))
-    CLLIM = logList((ECMAX + 1.0) / (ECMIN + 1.0)) * DCL_STALL
+    DCL_STALL = sectionValues('dclstall')
+    ECMAX = np.exp(np.minimum((CLA - CLMAX) / DCL_STALL, 200))
+    ECMIN = np.exp(np.minimum((CLA * (-1) + CLMIN) / DCL_STALL, 200))
+    CLLIM = np.log((ECMAX + 1.0) / (ECMIN + 1.0)) * DCL_STALL
 
     # Subtract off a (nearly unity) fraction of the limited CL function
     # This sets the dCL/dAlpha in the stalled regions to 1-FSTALL of that
     # in the linear lift range
-    DCLDA_STALL = xrotorDict['dcldastall'][nrRstation]
+    DCLDA_STALL = sectionValues('dcldastall')
     FSTALL = DCLDA_STALL / DCLDA
     CLIFT = CLA - CLLIM * (1.0 - FSTALL)
 
     # In the basic linear lift range drag is a quadratic function of lift
     # CD = CD0 (constant) + quadratic with CL)
-    CDMIN = xrotorDict['cdmin'][nrRstation]
-    DCDCL2 = xrotorDict['dcddcl2'][nrRstation]
+    CDMIN = sectionValues('cdmin')
+    DCDCL2 = sectionValues('dcddcl2')
 
     # Don't do any reynolds number corrections b/c we know it is minimal
     RCORR = 1
-    CDRAG = (((CLIFT - CLDMIN) ** 2) * DCDCL2 + CDMIN ) * RCORR
+    CDRAG = (((CLIFT - CLDMIN) ** 2) * DCDCL2 + CDMIN) * RCORR
 
     # Post-stall drag added
-    FSTALL = DCLDA_STALL / DCLDA
-    DCDX = CLLIM * (1.0 - FSTALL)/ (PG * DCLDA) 
+    DCDX = CLLIM * (1.0 - FSTALL) / (PG * DCLDA)
     DCD = (DCDX ** 2) * 2.0
 
     # Compressibility drag (accounts for drag rise above Mcrit with CL effects
     # CDC is a function of a scaling factor*(M-Mcrit(CL))**MEXP
     # DMDD is the Mach difference corresponding to CD rise of CDMDD at MCRIT
     DMDD = (CDMDD / CDMFACTOR) ** (1.0 / MEXP)
-    CRITMACH = absList(CLIFT - CLDMIN) * CLMFACTOR * (-1) + MCRIT - DMDD
-    CDC = array([0 for i in range(len(CRITMACH))])
-    for critMachIdx in range(len(CRITMACH)):
-        if (MACH < CRITMACH[critMachIdx]):
-            continue
-        else:
-            CDC[critMachIdx] = CDMFACTOR * (MACH - CRITMACH[critMachIdx]) ** MEXP
+    CRITMACH = np.abs(CLIFT - CLDMIN) * CLMFACTOR * (-1) + MCRIT - DMDD
+    CDC = np.where(MACH < CRITMACH, 0.0, CDMFACTOR * np.maximum(MACH - CRITMACH, 0.0) ** MEXP)
 
     # you could use something like this to add increase drag by Prandtl-Glauert
     # (or any function you choose)
@@ -1312,17 +1765,133 @@ def calcClCd(xrotorDict, alphas, machNum, nrRstation):
     # --- Total drag terms
     CDRAG = CDRAG * FAC + DCD + CDC
 
-
     # Now we modify the Clift and CDrag outside of the large alpha range to smooth out
     # the Cl and CD outside of the expected operating range
 
     # Find the Alpha for ClMax and CLMin
-    alphaMinIdx, alphaMaxIdx = findClMinMaxAlphas(CLIFT, CLMIN, CLMAX)
+    alphaMinIdx, alphaMaxIdx = findClMinMaxAlphaIdxs(CLIFT, CLMIN, CLMAX)
     # Blend the CLIFt and CDRAG values from above with the flat plate formulation to
     # be used outside of the alphaCLmin to alphaCLMax window
-    CLIFT, CDRAG = xrotorBlend2flatPlate(CLIFT, CDRAG, alphas, alphaMinIdx, alphaMaxIdx)
+    CLIFT, CDRAG = xrotorBlend2flatPlateArrays(CLIFT, CDRAG, alphas, alphaMinIdx, alphaMaxIdx)
+
+    if returnBlendIdxs:
+        return CLIFT, CDRAG, alphaMinIdx, alphaMaxIdx
+    return CLIFT, CDRAG
+
+
+########################################################################################################################
+def calcClCd(xrotorDict, alphas, machNum, nrRstation):
+    """
 
-    return list(CLIFT), list(CDRAG)
+    Use the 2D polar parameters from the Xrotor input file to get the Cl and Cd at the various Alphas and given MachNum
+    for a single aero section. See calcClCdArrays for the details of the Xrotor polar model.
+
+    Attributes
+    ----------
+    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName, rotorIdx=0):
+    alphas: list of ints, alphas we have for the polar.
+    machNum: float, mach number we do this polar at.
+    nrRstation: int, which r/R station we have to define this polar for.
+    return: 2 list of floats representing the CL and CD for  that polar
+    """
+
+    CLIFT, CDRAG = calcClCdArrays(xrotorDict, alphas, [machNum], [nrRstation])
+    return CLIFT[0, 0].tolist(), CDRAG[0, 0].tolist()
+
+
+########################################################################################################################
+def getPolarArrays(xrotorDict, alphas, machs, reys=None, sections=None, polarCache=None):
+    """
+    Return the 2D Cl and CD polars of the whole disk as contiguous float arrays of shape
+    (nSections, nMachs, nReys, nAlphas). This is the same bracket order as the Flow360 sectionalPolars
+    (Section, Mach#, Rey#, Values), the conversion to nested lists is only done by sectionalPolarsFromArrays when
+    we serialize the BET disk.
+    The Xrotor polar model has no Reynolds number dependence so the same values are used for every Reynolds number.
+
+    Attributes
+    ----------
+    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName, rotorIdx=0):
+    alphas: list of floats
+    machs: list of floats
+    reys: list of floats, defaults to generateReys()
+    sections: list of station indices, defaults to all the aero sections.
+    polarCache: optional PolarCache, sections found in it are not recomputed and the new ones are added to it.
+    return: dictionary with the liftCoeffs and dragCoeffs arrays
+    """
+
+    if reys is None:
+        reys = generateReys()
+
+    if polarCache is None:
+        cl, cd = calcClCdArrays(xrotorDict, alphas, machs, sections)
+    else:
+        cl, cd = getCachedClCdArrays(xrotorDict, alphas, machs, sections, polarCache)
+    shape = (cl.shape[0], cl.shape[1], len(reys), cl.shape[2])
+    return {'liftCoeffs': np.ascontiguousarray(np.broadcast_to(cl[:, :, None, :], shape)),
+            'dragCoeffs': np.ascontiguousarray(np.broadcast_to(cd[:, :, None, :], shape))}
+
+
+########################################################################################################################
+def getCachedClCdArrays(xrotorDict, alphas, machs, sections, polarCache):
+    """
+    Same as calcClCdArrays but the polar of each aero section is looked up in polarCache first. All the sections we
+    do not have yet are computed together and stored in the cache.
+
+    Attributes
+    ----------
+    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName, rotorIdx=0):
+    alphas: list of floats
+    machs: list of floats
+    sections: list of station indices, None means all the aero sections.
+    polarCache: PolarCache
+    return: 2 arrays of floats of shape (nSections, nMachs, nAlphas) representing the CL and CD polars
+    """
+
+    if sections is None:
+        sections = range(xrotorDict['nAeroSections'])
+    sections = list(sections)
+
+    cl = np.empty((len(sections), len(machs), len(alphas)))
+    cd = np.empty((len(sections), len(machs), len(alphas)))
+    keys = [polarCache.xrotorSectionKey(xrotorDict, secId, alphas, machs) for secId in sections]
+    missing = []
+    for i, key in enumerate(keys):
+        cached = polarCache.get(key)
+        if cached is None:
+            missing.append(i)
+        else:
+            cl[i], cd[i] = cached
+
+    if missing:
+        cl[missing], cd[missing] = calcClCdArrays(xrotorDict, alphas, machs, [sections[i] for i in missing])
+        for i in missing:
+            polarCache.put(keys[i], cl[i], cd[i], evict=False)
+        polarCache.evict()  # once for the whole disk rather than after every entry
+
+    return cl, cd
+
+
+########################################################################################################################
+def sectionalPolarsFromArrays(liftCoeffs, dragCoeffs):
+    """
+    Convert (nSections, nMachs, nReys, nAlphas) lift and drag arrays into the list of sectional polars expected in the
+    Flow360 BETDisk JSON format:
+    [{'liftCoeffs': [[[Mach #1, Rey #1 values]], ...], 'dragCoeffs': [...]}, ...]
+
+    Attributes
+    ----------
+    liftCoeffs: array of floats of shape (nSections, nMachs, nReys, nAlphas)
+    dragCoeffs: array of floats of shape (nSections, nMachs, nReys, nAlphas)
+    return: list of dictionaries
+    """
+
+    liftCoeffs = np.asarray(liftCoeffs, dtype=float)
+    dragCoeffs = np.asarray(dragCoeffs, dtype=float)
+    if liftCoeffs.ndim != 4 or liftCoeffs.shape != dragCoeffs.shape:
+        raise ValueError(f'liftCoeffs and dragCoeffs must both be of shape (nSections, nMachs, nReys, nAlphas), '
+                         f'we have {liftCoeffs.shape} and {dragCoeffs.shape}')
+
+    return [{'liftCoeffs': cl, 'dragCoeffs': cd} for cl, cd in zip(liftCoeffs.tolist(), dragCoeffs.tolist())]
 
 
 ########################################################################################################################
@@ -1336,25 +1905,24 @@ def getPolar(xrotorDict, alphas, machs, rRstation):
 
     Attributes
     ----------
-    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName):
+    xrotorDict: dictionary of Xrotor data as read in by def readXROTORFile(xrotorFileName, rotorIdx=0):
     alphas: list of floats
     machs: list of float
     rRstation: station index.
     return: list of dictionaries
     """
 
-    secpol = {}
-    secpol['liftCoeffs'] = []
-    secpol['dragCoeffs'] = []
-    for machNum in machs:
-        cl, cd = calcClCd(xrotorDict, alphas, machNum, rRstation)
-        secpol['liftCoeffs'].append([cl])
-        secpol['dragCoeffs'].append([cd])
-    return secpol
+    polars = getPolarArrays(xrotorDict, alphas, machs, sections=[rRstation])
+    return sectionalPolarsFromArrays(polars['liftCoeffs'], polars['dragCoeffs'])[0]
+
+
+# options of generateXrotorBETJSON a disk definition can set, see batchTranslate and multiDiskBuilder
+XROTOR_OPTIONS = ['rotorIdx', 'alphaTolerance', 'machTolerance']
 
 
 ########################################################################################################################
-def generateXrotorBETJSON(xrotorFileName, betDisk):
+def generateXrotorBETJSON(xrotorFileName, betDisk, polarCache=None, alphaTolerance=None, machTolerance=None,
+                          rotorIdx=0, asModel=False):
     """
 
     This file takes in an Xrotor or DFDC input file and translates it into a flow360 BET input dictionary
@@ -1377,6 +1945,14 @@ def generateXrotorBETJSON(xrotorFileName, betDisk):
         ['meshUnit']:value,
         ['chordRef']:value,
         ['nLoadingNodes']
+    polarCache: optional PolarCache used to reuse the polars of aero sections we have already computed.
+    alphaTolerance: optional float, if given the alphas are generated by generateAdaptiveAlphas with this CL/CD
+    interpolation tolerance instead of using the fixed generateAlphas table.
+    machTolerance: optional float, if given the Mach numbers are generated by generateAdaptiveMachs with this CL/CD
+    interpolation tolerance instead of using the 4 fixed generateMachs values.
+    rotorIdx: int, which disk to translate when the DFDC file defines several of them.
+    asModel: bool, return a betDiskModel.BETDisk holding the disk in arrays instead of the dictionary. The polars are
+    then never converted to lists.
 
     Returns
     -------
@@ -1392,23 +1968,35 @@ def generateXrotorBETJSON(xrotorFileName, betDisk):
     if len(betDisk["centerOfRotation"]) != 3:
         raise ValueError('centerOfRotation must be a list of size 3. Exiting')
 
-    xrotorDict = readXROTORFile(xrotorFileName)
+    xrotorDict = readXROTORFile(xrotorFileName, rotorIdx)
 
     betDisk['numberOfBlades'] = xrotorDict['nBlades']
     betDisk['radius'] = xrotorDict['rad'] / betDisk["meshUnit"]
     betDisk['twists'] = generateTwists(xrotorDict, betDisk["meshUnit"])
     betDisk['chords'] = generateChords(xrotorDict, betDisk["meshUnit"])
-    betDisk['MachNumbers'] = generateMachs()
-    betDisk['alphas'] = generateAlphas()
+    if machTolerance is None:
+        betDisk['MachNumbers'] = generateMachs()
+    else:
+        # the adaptive alphas are a subset of the fine alpha grid, adapting the Machs on that grid covers every alpha
+        # we end up using
+        machAlphas = generateAlphas() if alphaTolerance is None else generateFineAlphas()
+        betDisk['MachNumbers'] = generateAdaptiveMachs(xrotorDict, machAlphas, machTolerance)
+    if alphaTolerance is None:
+        betDisk['alphas'] = generateAlphas()
+    else:
+        betDisk['alphas'] = generateAdaptiveAlphas(xrotorDict, betDisk['MachNumbers'], alphaTolerance)
     betDisk['ReynoldsNumbers'] = generateReys()
     betDisk['sectionalRadiuses'] = [betDisk['radius'] * r for r in xrotorDict['rRstations']]
-    betDisk['sectionalPolars'] = []
-
-    for secId in range(0, xrotorDict['nAeroSections']):
-        polar = getPolar(xrotorDict, betDisk['alphas'], betDisk['MachNumbers'], secId)
-        betDisk['sectionalPolars'].append(polar)
 
+    # compute the polars of all the aero sections at once and only convert them to lists for the JSON output
+    polars = getPolarArrays(xrotorDict, betDisk['alphas'], betDisk['MachNumbers'], betDisk['ReynoldsNumbers'],
+                            polarCache=polarCache)
     betDisk.pop("meshUnit",None) # grid unit is only needed to do calculations but not by the solver.
+    if asModel:
+        return BETDisk.fromDict(betDisk, PolarTable(betDisk['alphas'], betDisk['MachNumbers'],
+                                                    betDisk['ReynoldsNumbers'], polars['liftCoeffs'],
+                                                    polars['dragCoeffs']))
+    betDisk['sectionalPolars'] = sectionalPolarsFromArrays(polars['liftCoeffs'], polars['dragCoeffs'])
 
     return betDisk
 
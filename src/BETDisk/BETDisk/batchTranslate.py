@@ -0,0 +1,313 @@
+"""
+    Batch translation of many rotor definition files into Flow360 BET disks.
+
+    The disks to translate are listed in a JSON manifest:
+
+    {
+        "template": "flow360_XV15_BET_Template.json",
+        "disks": [
+            {"type": "dfdc", "input": "data/dfdc/dfdc_xv15_twist0.case", "output": "dfdcDisk.json",
+             "betDisk": {"meshUnit": 0.0254, "centerOfRotation": [0, 0, 0], ...}},
+            {"type": "c81", "input": "data/c81/Xv15_geometry.csv", "betDisk": {...}},
+            ...
+        ]
+    }
+
+    type is one of xrotor, dfdc, c81 or xfoil. betDisk holds the BET disk information that is not in the input file,
+    as in the example translator scripts. xrotor and dfdc disks can also set rotorIdx, alphaTolerance and
+    machTolerance, see generateXrotorBETJSON. Relative paths are relative to the manifest file. With --output-dir the
+    output of each disk keeps its path relative to the manifest under the output directory.
+
+    The disks are translated on a pool of processes. A disk that fails to translate is reported at the end and does
+    not stop the other ones from being written.
+
+Example
+-------
+    $ flow360-bet translate -i manifest.json --jobs 8 -o flow360_BET.json
+    $ flow360-bet translate -i manifest.json --jobs 8 --output-dir translated/
+    $ flow360-bet translate -i manifest.json --compact --significant-digits 8 -o flow360_BET.json
+    $ flow360-bet validate flow360_BET.json
+
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import traceback
+
+from .BETTranslatorInterface import generateXrotorBETJSON, generateC81BETJSON, generateXfoilBETJSON, XROTOR_OPTIONS
+from . import flow360JSONWriter
+from .polarCache import PolarCache
+from .betDiskValidation import checkBETDisk, validateFlow360JSON
+
+
+################################################################################################################
+def readManifest(manifestFile):
+    """
+    Read the manifest file and make all the paths in it absolute.
+
+    Returns
+    -------
+    dictionary with the template file (or None), the list of disk definitions and the directory of the manifest
+    """
+    with open(manifestFile) as fh:
+        manifest = json.load(fh)
+
+    manifestDir = os.path.dirname(os.path.abspath(manifestFile))
+    if 'disks' not in manifest or not isinstance(manifest['disks'], list):
+        raise ValueError(f'manifest {manifestFile} must contain a list of disks')
+
+    template = manifest.get('template')
+    if template is not None:
+        template = os.path.join(manifestDir, template)
+
+    disks = []
+    for diskIdx, disk in enumerate(manifest['disks']):
+        for key in ['type', 'input', 'betDisk']:
+            if key not in disk:
+                raise ValueError(f'disk #{diskIdx} of manifest {manifestFile} is missing the {key} field')
+        disk = dict(disk)
+        disk['input'] = os.path.join(manifestDir, disk['input'])
+        if 'output' in disk:
+            disk['output'] = os.path.join(manifestDir, disk['output'])
+        disks.append(disk)
+
+    return {'template': template, 'disks': disks, 'dir': manifestDir}
+
+
+################################################################################################################
+def translateDisk(disk, polarCacheDir=None):
+    """
+    Translate one disk of the manifest into a Flow360 BET disk dictionary and validate it.
+    This runs in the worker processes so it only takes and returns picklable values.
+
+    Returns
+    -------
+    BET disk dictionary
+    """
+    diskType = disk['type'].lower()
+    betDisk = dict(disk['betDisk'])
+    if diskType in ['xrotor', 'dfdc']:
+        options = {key: disk[key] for key in XROTOR_OPTIONS if key in disk}
+        if polarCacheDir is not None:
+            options['polarCache'] = PolarCache(polarCacheDir)
+        betDisk = generateXrotorBETJSON(disk['input'], betDisk, **options)
+    elif diskType == 'c81':
+        betDisk = generateC81BETJSON(disk['input'], betDisk)
+    elif diskType == 'xfoil':
+        betDisk = generateXfoilBETJSON(disk['input'], betDisk)
+    else:
+        raise ValueError(f'unknown disk type {disk["type"]}, it must be one of xrotor, dfdc, c81 or xfoil')
+    checkBETDisk(betDisk)  # the disk fails here rather than in the solver
+    return betDisk
+
+
+################################################################################################################
+def tryTranslateDisk(disk, polarCacheDir=None):
+    """
+    translateDisk that reports its failure instead of raising it. The traceback is formatted where the error happened,
+    in the worker process, so the serial and the parallel runs report the failures the same way.
+
+    Returns
+    -------
+    (betDisk, None) if it worked or (None, error message) if not.
+    """
+    try:
+        return translateDisk(disk, polarCacheDir), None
+    except Exception:
+        return None, traceback.format_exc()
+
+
+################################################################################################################
+def translateDisks(disks, jobs=1, polarCacheDir=None):
+    """
+    Translate all the disks, on a pool of jobs processes if jobs > 1.
+
+    Returns
+    -------
+    list with one entry per disk, in the same order: (betDisk, None) if it worked or (None, error message) if not.
+    """
+    if jobs <= 1:
+        return [tryTranslateDisk(disk, polarCacheDir) for disk in disks]
+
+    results = [None] * len(disks)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(tryTranslateDisk, disk, polarCacheDir): diskIdx
+                   for diskIdx, disk in enumerate(disks)}
+        for future in concurrent.futures.as_completed(futures):
+            diskIdx = futures[future]
+            try:
+                results[diskIdx] = future.result()
+            except Exception:  # the worker itself died, e.g. BrokenProcessPool
+                results[diskIdx] = (None, traceback.format_exc())
+    return results
+
+
+################################################################################################################
+def diskOutputFiles(disks, manifestDir, outputDir):
+    """
+    Files of the one Flow360 JSON per disk output. The output of each disk keeps its path relative to the manifest under
+    outputDir, disk<index>.json if it has none. Outputs outside of the manifest directory only keep their file name.
+
+    Returns
+    -------
+    list with the output file of each disk, raises a ValueError if several disks would be written to the same file
+    """
+    outputFiles = []
+    for diskIdx, disk in enumerate(disks):
+        outputName = f'disk{diskIdx}.json'
+        if 'output' in disk:
+            outputName = os.path.relpath(disk['output'], manifestDir)
+            if outputName.startswith(os.pardir):
+                outputName = os.path.basename(disk['output'])
+        outputFiles.append(os.path.normpath(os.path.join(outputDir, outputName)))
+
+    duplicates = sorted({outputFile for outputFile in outputFiles if outputFiles.count(outputFile) > 1})
+    if duplicates:
+        raise ValueError(f'several disks of the manifest would be written to {duplicates}, give them different outputs')
+    return outputFiles
+
+
+################################################################################################################
+def writeFlow360JSON(outputFile, template, betDisks, indent=4, significantDigits=None):
+    """
+    Stream the template Flow360 input JSON with its BETDisks field set to betDisks to outputFile.
+    indent and significantDigits are passed to flow360JSONWriter.writeFlow360JSON.
+    """
+    flow360Dict = dict(template)
+    flow360Dict['BETDisks'] = betDisks
+    outputDir = os.path.dirname(os.path.abspath(outputFile))
+    os.makedirs(outputDir, exist_ok=True)
+    flow360JSONWriter.writeFlow360JSON(outputFile, flow360Dict, indent, significantDigits)
+    print('File saved:', outputFile)
+
+
+################################################################################################################
+def translate(args):
+    """
+    Run the translate command.
+
+    Returns
+    -------
+    exit code: 0 if all the disks were translated, 1 otherwise
+    """
+    manifest = readManifest(args.input)
+    templateFile = args.template or manifest['template']
+    template = {}
+    if templateFile is not None:
+        with open(templateFile) as fh:
+            template = json.load(fh)
+
+    disks = manifest['disks']
+    if args.output_dir is not None:
+        outputFiles = diskOutputFiles(disks, manifest['dir'], args.output_dir)  # before the long translation
+    results = translateDisks(disks, args.jobs, args.polar_cache)
+    indent = None if args.compact else 4
+
+    if args.output_dir is not None:
+        # one Flow360 JSON per disk
+        for outputFile, (betDisk, error) in zip(outputFiles, results):
+            if error is None:
+                writeFlow360JSON(outputFile, template, [betDisk], indent, args.significant_digits)
+    else:
+        # all the disks merged into a single Flow360 JSON
+        betDisks = [betDisk for betDisk, error in results if error is None]
+        if betDisks:
+            writeFlow360JSON(args.output, template, betDisks, indent, args.significant_digits)
+        else:
+            print(f'WARNING: no disk was translated, {args.output} is not written', file=sys.stderr)
+
+    failures = [(disk, error) for disk, (betDisk, error) in zip(disks, results) if error is not None]
+    for disk, error in failures:
+        print(f'FAILED to translate {disk["type"]} file {disk["input"]}:\n{error}', file=sys.stderr)
+    print(f'{len(disks) - len(failures)} of {len(disks)} disks translated.')
+    return 1 if failures else 0
+
+
+################################################################################################################
+def validate(args):
+    """
+    Run the validate command.
+
+    Returns
+    -------
+    exit code: 0 if all the BET disks of all the files are valid, 1 otherwise
+    """
+    numProblems = 0
+    for inputFile in args.input:
+        with open(inputFile) as fh:
+            problems = validateFlow360JSON(json.load(fh))
+        for problem in problems:
+            print(f'{inputFile}: {problem}')
+        numProblems += len(problems)
+    print(f'{numProblems} problems found in {len(args.input)} files.')
+    return 1 if numProblems else 0
+
+
+################################################################################################################
+def main(argv=None):
+    """
+    Command line interface of the BET disk translators.
+
+    Returns
+    -------
+    exit code
+    """
+    parser = argparse.ArgumentParser(prog='flow360-bet', description="Flow360 BET disk translators.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    translateParser = subparsers.add_parser('translate', help='Translate the rotor definition files listed in a '
+                                                              'manifest into Flow360 BET disks.')
+    translateParser.add_argument('-i', '--input',
+                                 type     = str,
+                                 required = True,
+                                 help     = 'JSON manifest listing the disks to translate')
+    translateParser.add_argument('-j', '--jobs',
+                                 type     = int,
+                                 default  = os.cpu_count(),
+                                 help     = 'number of disks translated in parallel')
+    translateParser.add_argument('-t', '--template',
+                                 type     = str,
+                                 required = False,
+                                 help     = 'Flow360 input JSON the BET disks are added to, overrides the manifest '
+                                            'template')
+    outputGroup = translateParser.add_mutually_exclusive_group()
+    outputGroup.add_argument('-o', '--output',
+                             type     = str,
+                             default  = 'flow360_BET.json',
+                             help     = 'Flow360 JSON file holding all the translated BET disks')
+    outputGroup.add_argument('--output-dir',
+                             type     = str,
+                             help     = 'directory where one Flow360 JSON file per disk is written instead')
+    translateParser.add_argument('--polar-cache',
+                                 type     = str,
+                                 required = False,
+                                 help     = 'directory of the polar cache shared by the xrotor and dfdc disks')
+    translateParser.add_argument('--compact',
+                                 action   = 'store_true',
+                                 help     = 'write the JSON files without any whitespace')
+    translateParser.add_argument('--significant-digits',
+                                 type     = int,
+                                 required = False,
+                                 help     = 'number of significant digits of the floats written, all of them by '
+                                            'default')
+
+    validateParser = subparsers.add_parser('validate', help='Check the BET disks of Flow360 input JSON files.')
+    validateParser.add_argument('input',
+                                type     = str,
+                                nargs    = '+',
+                                help     = 'Flow360 input JSON files to check')
+    args = parser.parse_args(argv)
+
+    if args.command == 'translate':
+        return translate(args)
+    if args.command == 'validate':
+        return validate(args)
+
+
+################################################################################################################
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+Array backed object model of a Flow360 BET disk.
+
+The generate*BETJSON functions build the BET disk as the dictionary of the Flow360 input: the twists and chords are
+lists of {'radius':..., 'twist':...} dictionaries and every polar is a triply nested list of Python floats. A BETDisk
+holds the same data in NumPy arrays instead: one array each for the twist and chord radii and values, and one
+(nSections, nMachs, nReynolds, nAlphas) array each for all the CLs and CDs of the disk. That is 8 bytes per value
+instead of a Python float object plus its list slot, and the geometry can be changed with array arithmetic, e.g.
+betDisk.twists += 2. The Flow360 dictionary or JSON file is only rendered on request.
+
+Several disks can share one PolarTable, e.g. the identical blades of a multiDiskBuilder.MultiDiskBuilder. A shared
+table is read only: BETDisk.editablePolars gives the disk its own copy of the table before it is edited.
+
+All the classes use __slots__ so a disk with many sections does not carry one attribute dictionary per object.
+
+EXAMPLE useage:
+
+    betDisk = generateXrotorBETJSON(xrotorFileName, betDiskParams, asModel=True)
+    betDisk.chords *= 1.05
+    betDisk.toJSON('betDisk.json')
+    flow360Dict['BETDisks'] = [betDisk.toDict()]
+"""
+
+import numpy as np
+
+from .flow360JSONWriter import writeFlow360JSON
+
+
+########################################################################################################################
+class PolarTable:
+    """
+    CL and CD tables of all the sections of a BET disk on the alphas, Mach and Reynolds numbers they share.
+    The arrays can be edited in place unless the table is shared by several disks, see share.
+
+    Attributes
+    ----------
+    alphas: array of floats of shape (nAlphas,), in degrees
+    machs: array of floats of shape (nMachs,)
+    reynolds: array of floats of shape (nReynolds,)
+    liftCoeffs: array of floats of shape (nSections, nMachs, nReynolds, nAlphas)
+    dragCoeffs: array of floats of shape (nSections, nMachs, nReynolds, nAlphas)
+    """
+
+    __slots__ = ('alphas', 'machs', 'reynolds', 'liftCoeffs', 'dragCoeffs')
+
+    def __init__(self, alphas, machs, reynolds, liftCoeffs, dragCoeffs):
+        self.alphas = np.asarray(alphas, dtype=float)
+        self.machs = np.asarray(machs, dtype=float)
+        self.reynolds = np.asarray(reynolds, dtype=float)
+        # writeable so that the sections can be edited in place, broadcast polar arrays are read only
+        self.liftCoeffs = np.require(liftCoeffs, dtype=float, requirements=['C', 'W'])
+        self.dragCoeffs = np.require(dragCoeffs, dtype=float, requirements=['C', 'W'])
+        shape = (self.liftCoeffs.shape[0] if self.liftCoeffs.ndim == 4 else -1, len(self.machs), len(self.reynolds),
+                 len(self.alphas))
+        if self.liftCoeffs.shape != shape or self.dragCoeffs.shape != shape:
+            raise ValueError(f'liftCoeffs and dragCoeffs must both be of shape (nSections, {shape[1]} Machs, '
+                             f'{shape[2]} Reynolds, {shape[3]} alphas), we have {self.liftCoeffs.shape} and '
+                             f'{self.dragCoeffs.shape}')
+
+    ####################################################################################################################
+    @classmethod
+    def fromSectionalPolars(cls, alphas, machs, reynolds, sectionalPolars):
+        """
+        Build the table from the sectionalPolars list of the Flow360 BET disk dictionary.
+        """
+        return cls(alphas, machs, reynolds, [polar['liftCoeffs'] for polar in sectionalPolars],
+                   [polar['dragCoeffs'] for polar in sectionalPolars])
+
+    ####################################################################################################################
+    def sectionalPolars(self, asLists=True):
+        """
+        Render the sectionalPolars list of the Flow360 BET disk dictionary. With asLists=False the coefficients are
+        left as array views, which flow360JSONWriter writes without converting them.
+        """
+        if asLists:
+            return [{'liftCoeffs': cl, 'dragCoeffs': cd}
+                    for cl, cd in zip(self.liftCoeffs.tolist(), self.dragCoeffs.tolist())]
+        return [{'liftCoeffs': cl, 'dragCoeffs': cd} for cl, cd in zip(self.liftCoeffs, self.dragCoeffs)]
+
+    ####################################################################################################################
+    def share(self):
+        """
+        Make the arrays read only, once the table is shared by several disks, so that editing one disk can not change
+        the others. Returns the table.
+        """
+        for name in self.__slots__:
+            getattr(self, name).flags.writeable = False
+        return self
+
+    ####################################################################################################################
+    @property
+    def shared(self):
+        return not self.liftCoeffs.flags.writeable
+
+    ####################################################################################################################
+    def copy(self):
+        """
+        Writeable copy of the table.
+        """
+        return PolarTable(self.alphas.copy(), self.machs.copy(), self.reynolds.copy(), self.liftCoeffs.copy(),
+                          self.dragCoeffs.copy())
+
+    ####################################################################################################################
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+
+########################################################################################################################
+class Section:
+    """
+    One aero section of a BET disk. Its coefficients are views into the PolarTable of the disk, changing them changes
+    the disk. They are read only if the table is shared with other disks, see BETDisk.editablePolars.
+
+    Attributes
+    ----------
+    radius: float, radius of the section in grid units
+    liftCoeffs: array of floats of shape (nMachs, nReynolds, nAlphas)
+    dragCoeffs: array of floats of shape (nMachs, nReynolds, nAlphas)
+    """
+
+    __slots__ = ('radius', 'liftCoeffs', 'dragCoeffs')
+
+    def __init__(self, radius, liftCoeffs, dragCoeffs):
+        self.radius = radius
+        self.liftCoeffs = liftCoeffs
+        self.dragCoeffs = dragCoeffs
+
+
+########################################################################################################################
+class BETDisk:
+    """
+    BET disk of a Flow360 input with its geometry and polars held in NumPy arrays.
+
+    Attributes
+    ----------
+    centerOfRotation, axisOfRotation: arrays of shape (3,)
+    rotationDirectionRule: rightHand or leftHand
+    omega, thickness, chordRef, nLoadingNodes, numberOfBlades, radius: scalars, None if not set
+    twistRadiuses, twists: arrays of floats, the twists in degrees at these radii in grid units
+    chordRadiuses, chords: arrays of floats, the chords at these radii, both in grid units
+    sectionalRadiuses: array of floats, radius of each aero section
+    polars: PolarTable of the aero sections
+    options: dictionary of the other BET disk entries (initialBladeDirection, tipGap...), rendered as they are
+    """
+
+    __slots__ = ('centerOfRotation', 'rotationDirectionRule', 'axisOfRotation', 'omega', 'thickness', 'chordRef',
+                 'nLoadingNodes', 'numberOfBlades', 'radius', 'twistRadiuses', 'twists', 'chordRadiuses', 'chords',
+                 'sectionalRadiuses', 'polars', 'options')
+
+    # entries of the BET disk dictionary held in a slot of the same name, in the order they are rendered
+    SCALAR_KEYS = ('centerOfRotation', 'rotationDirectionRule', 'axisOfRotation', 'omega', 'thickness', 'chordRef',
+                   'nLoadingNodes', 'numberOfBlades', 'radius')
+    ARRAY_KEYS = ('twists', 'chords', 'MachNumbers', 'alphas', 'ReynoldsNumbers', 'sectionalRadiuses',
+                  'sectionalPolars')
+
+    def __init__(self, twistRadiuses, twists, chordRadiuses, chords, sectionalRadiuses, polars, options=None,
+                 **scalars):
+        for key in self.SCALAR_KEYS:
+            setattr(self, key, scalars.pop(key, None))
+        if scalars:
+            raise ValueError(f'unknown BET disk entries {sorted(scalars)}, pass them in options')
+        for key in ['centerOfRotation', 'axisOfRotation']:
+            if getattr(self, key) is not None:
+                setattr(self, key, np.asarray(getattr(self, key)))
+        self.twistRadiuses = np.asarray(twistRadiuses, dtype=float)
+        self.twists = np.asarray(twists, dtype=float)
+        self.chordRadiuses = np.asarray(chordRadiuses, dtype=float)
+        self.chords = np.asarray(chords, dtype=float)
+        self.sectionalRadiuses = np.asarray(sectionalRadiuses, dtype=float)
+        self.polars = polars
+        self.options = dict(options or {})
+
+        if self.twistRadiuses.shape != self.twists.shape or self.chordRadiuses.shape != self.chords.shape:
+            raise ValueError('we need one radius per twist and one radius per chord')
+        if len(self.sectionalRadiuses) != len(polars.liftCoeffs):
+            raise ValueError(f'we have {len(self.sectionalRadiuses)} sectionalRadiuses for {len(polars.liftCoeffs)} '
+                             f'sectional polars')
+
+    ####################################################################################################################
+    @classmethod
+    def fromDict(cls, betDisk, polars=None):
+        """
+        Build a BETDisk from a BET disk dictionary as returned by the generate*BETJSON functions.
+
+        Attributes
+        ----------
+        betDisk: BET disk dictionary. It is not modified.
+        polars: optional PolarTable, then the dictionary does not need the MachNumbers, alphas, ReynoldsNumbers and
+                sectionalPolars entries. Used to build the disk straight from the polar arrays.
+        return: BETDisk
+        """
+        if polars is None:
+            polars = PolarTable.fromSectionalPolars(betDisk['alphas'], betDisk['MachNumbers'],
+                                                    betDisk['ReynoldsNumbers'], betDisk['sectionalPolars'])
+        scalars = {key: betDisk[key] for key in cls.SCALAR_KEYS if key in betDisk}
+        options = {key: value for key, value in betDisk.items() if key not in cls.SCALAR_KEYS + cls.ARRAY_KEYS}
+        return cls([twist['radius'] for twist in betDisk['twists']], [twist['twist'] for twist in betDisk['twists']],
+                   [chord['radius'] for chord in betDisk['chords']], [chord['chord'] for chord in betDisk['chords']],
+                   betDisk['sectionalRadiuses'], polars, options, **scalars)
+
+    ####################################################################################################################
+    @property
+    def sections(self):
+        return [Section(radius, cl, cd) for radius, cl, cd in
+                zip(self.sectionalRadiuses.tolist(), self.polars.liftCoeffs, self.polars.dragCoeffs)]
+
+    ####################################################################################################################
+    def editablePolars(self):
+        """
+        PolarTable of the disk that can be edited in place. A table shared with other disks is read only, the disk then
+        gets its own copy of it first so the other disks are left unchanged.
+        """
+        if self.polars.shared:
+            self.polars = self.polars.copy()
+        return self.polars
+
+    ####################################################################################################################
+    @property
+    def nbytes(self):
+        """
+        Memory used by the arrays of the disk.
+        """
+        return self.polars.nbytes + sum(getattr(self, name).nbytes for name in
+                                        ['twistRadiuses', 'twists', 'chordRadiuses', 'chords', 'sectionalRadiuses'])
+
+    ####################################################################################################################
+    def toDict(self, asLists=True):
+        """
+        Render the BET disk dictionary of the Flow360 input.
+
+        Attributes
+        ----------
+        asLists: bool, convert the arrays to lists as json.dump needs. With False the arrays are left as they are, for
+                 flow360JSONWriter which writes them directly.
+        return: dictionary
+        """
+        def render(values):
+            return values.tolist() if asLists else values
+
+        betDisk = {}
+        for key in self.SCALAR_KEYS:
+            value = getattr(self, key)
+            if value is not None:
+                betDisk[key] = render(value) if isinstance(value, np.ndarray) else value
+        betDisk.update(self.options)
+        betDisk['twists'] = [{'radius': radius, 'twist': twist}
+                             for radius, twist in zip(self.twistRadiuses.tolist(), self.twists.tolist())]
+        betDisk['chords'] = [{'radius': radius, 'chord': chord}
+                             for radius, chord in zip(self.chordRadiuses.tolist(), self.chords.tolist())]
+        betDisk['MachNumbers'] = render(self.polars.machs)
+        betDisk['alphas'] = render(self.polars.alphas)
+        betDisk['ReynoldsNumbers'] = render(self.polars.reynolds)
+        betDisk['sectionalRadiuses'] = render(self.sectionalRadiuses)
+        betDisk['sectionalPolars'] = self.polars.sectionalPolars(asLists)
+        return betDisk
+
+    ####################################################################################################################
+    def toJSON(self, outputFile, indent=4, significantDigits=None):
+        """
+        Write the BET disk dictionary to outputFile, straight from the arrays, see flow360JSONWriter.writeFlow360JSON.
+        """
+        writeFlow360JSON(outputFile, self.toDict(asLists=False), indent, significantDigits)
@@ -0,0 +1,207 @@
+"""
+Validation of the BET disks of a Flow360 input before it is written.
+
+The generate*BETJSON functions only check a few of their inputs and the readers only check the consistency of the
+polar files between themselves. validateBETDisk checks a whole BET disk at once: the disk placement, the alpha, Mach
+and Reynolds grids, the sectional radii, the coverage of the sections by the twists and chords and the shape and
+values of all the polar tables. The polars are stacked in a single array so the whole check is a few array operations
+even for large disks. Every problem found is reported, not only the first one, so a bad table is caught locally in
+one go rather than by a failed solver run.
+
+EXAMPLE useage:
+
+    problems = validateFlow360JSON(flow360Dict)
+    for problem in problems:
+        print(problem)
+
+    checkBETDisk(betDisk)  # raises a ValueError listing all the problems
+"""
+
+import numpy as np
+
+# entries of a BET disk the Flow360 solver needs
+REQUIRED_KEYS = ['centerOfRotation', 'axisOfRotation', 'rotationDirectionRule', 'omega', 'thickness', 'chordRef',
+                 'nLoadingNodes', 'numberOfBlades', 'radius', 'twists', 'chords', 'MachNumbers', 'alphas',
+                 'ReynoldsNumbers', 'sectionalRadiuses', 'sectionalPolars']
+
+
+########################################################################################################################
+def checkVector(problems, betDisk, key, positive=False, increasing=False):
+    """
+    Check that betDisk[key] is a 1D list of finite values, optionally positive and strictly increasing.
+    Return it as an array, or None if it is not even a list of numbers.
+    """
+    try:
+        values = np.asarray(betDisk[key], dtype=float)
+    except (TypeError, ValueError):
+        problems.append(f'{key} must be a list of numbers')
+        return None
+    if values.ndim != 1 or len(values) == 0:
+        problems.append(f'{key} must be a non empty list of numbers')
+        return None
+    notFinite = np.flatnonzero(~np.isfinite(values))
+    if len(notFinite):
+        problems.append(f'{key} has NaN or infinite values at indices {notFinite.tolist()}')
+    if positive and np.any(values <= 0):
+        problems.append(f'{key} must be positive, found {values[values <= 0].tolist()}')
+    if increasing:
+        notIncreasing = np.flatnonzero(np.diff(values) <= 0)
+        if len(notIncreasing):
+            problems.append(f'{key} must be strictly increasing, it is not after indices {notIncreasing.tolist()}')
+    return values
+
+
+########################################################################################################################
+def checkScalars(problems, betDisk):
+    if betDisk['rotationDirectionRule'] not in ['rightHand', 'leftHand']:
+        problems.append(f'invalid rotationDirectionRule {betDisk["rotationDirectionRule"]}, it must be rightHand or '
+                        f'leftHand')
+    for key in ['centerOfRotation', 'axisOfRotation']:
+        vector = checkVector(problems, betDisk, key)
+        if vector is not None and len(vector) != 3:
+            problems.append(f'{key} must be a list of size 3')
+        elif key == 'axisOfRotation' and vector is not None and not np.any(vector):
+            problems.append('axisOfRotation must not be zero')
+
+    for key, minimum in [('omega', None), ('thickness', 0), ('chordRef', 0), ('radius', 0)]:
+        value = betDisk[key]
+        if isinstance(value, bool) or not isinstance(value, (int, float, np.number)) or not np.isfinite(value):
+            problems.append(f'{key} must be a finite number, we have {value!r}')
+        elif minimum is not None and value <= minimum:
+            problems.append(f'{key} must be positive, we have {value}')
+    for key in ['nLoadingNodes', 'numberOfBlades']:
+        value = betDisk[key]
+        if isinstance(value, bool) or not isinstance(value, (int, np.integer)) or value <= 0:
+            problems.append(f'{key} must be a positive integer, we have {value!r}')
+
+
+########################################################################################################################
+def checkDistribution(problems, betDisk, key, valueKey, sectionalRadiuses):
+    """
+    Check the twists or chords list of {'radius':..., valueKey:...} and that it covers all the sectional radii.
+    """
+    try:
+        radii = np.array([item['radius'] for item in betDisk[key]], dtype=float)
+        values = np.array([item[valueKey] for item in betDisk[key]], dtype=float)
+    except (TypeError, KeyError, ValueError):
+        problems.append(f'{key} must be a list of {{"radius": value, "{valueKey}": value}}')
+        return
+    distribution = {f'{key} radius': radii, f'{key} {valueKey}': values}
+    radii = checkVector(problems, distribution, f'{key} radius', increasing=True)
+    values = checkVector(problems, distribution, f'{key} {valueKey}')
+    if radii is None or values is None:
+        return
+    if valueKey == 'chord' and np.any(values < 0):
+        problems.append(f'chords must not be negative, found {values[values < 0].tolist()}')
+    if sectionalRadiuses is not None and (radii[0] > sectionalRadiuses[0] or radii[-1] < sectionalRadiuses[-1]):
+        problems.append(f'{key} cover the radii {radii[0]} to {radii[-1]}, they do not cover all the '
+                        f'sectionalRadiuses from {sectionalRadiuses[0]} to {sectionalRadiuses[-1]}')
+
+
+########################################################################################################################
+def checkPolars(problems, betDisk, shape):
+    """
+    Check that every sectional polar has liftCoeffs and dragCoeffs of the given (nMachs, nReynolds, nAlphas) shape with
+    finite values, and that the drag coefficients are not negative.
+    """
+    sectionalPolars = betDisk['sectionalPolars']
+    if not isinstance(sectionalPolars, list) or not sectionalPolars:
+        problems.append('sectionalPolars must be a non empty list of {"liftCoeffs": table, "dragCoeffs": table}')
+        return
+    if shape is not None and len(sectionalPolars) != shape[0]:
+        problems.append(f'we have {len(sectionalPolars)} sectionalPolars for {shape[0]} sectionalRadiuses')
+
+    tables = {}
+    for key in ['liftCoeffs', 'dragCoeffs']:
+        try:
+            tables[key] = np.asarray([polar[key] for polar in sectionalPolars], dtype=float)
+        except (TypeError, KeyError, ValueError):
+            # ragged tables, find the sections with the wrong shape one by one
+            for sectionIdx, polar in enumerate(sectionalPolars):
+                try:
+                    sectionShape = np.shape(polar[key])
+                except (TypeError, KeyError, ValueError):
+                    sectionShape = None
+                if shape is None or sectionShape != shape[1:]:
+                    problems.append(f'{key} of section {sectionIdx} must be a (Mach, Reynolds, alpha) table of shape '
+                                    f'{shape[1:] if shape else "(nMachs, nReynolds, nAlphas)"}')
+            continue
+        if shape is not None and tables[key].shape[1:] != shape[1:]:
+            problems.append(f'{key} must be (Mach, Reynolds, alpha) tables of shape {shape[1:]}, they are '
+                            f'{tables[key].shape[1:]}')
+        tableAxes = tuple(range(1, tables[key].ndim))  # all but the section axis, works for empty tables too
+        badSections = np.flatnonzero(~np.isfinite(tables[key]).all(axis=tableAxes))
+        if len(badSections):
+            problems.append(f'{key} of sections {badSections.tolist()} have NaN or infinite values')
+
+    if 'dragCoeffs' in tables:
+        tableAxes = tuple(range(1, tables['dragCoeffs'].ndim))
+        negativeSections = np.flatnonzero((tables['dragCoeffs'] < 0).any(axis=tableAxes))
+        if len(negativeSections):
+            problems.append(f'dragCoeffs of sections {negativeSections.tolist()} have negative values')
+
+
+########################################################################################################################
+def validateBETDisk(betDisk):
+    """
+    Check a BET disk and report all the problems found.
+
+    Attributes
+    ----------
+    betDisk: BET disk dictionary as returned by the generate*BETJSON functions or a betDiskModel.BETDisk
+    return: list of strings describing the problems, empty if the disk is valid
+    """
+    if hasattr(betDisk, 'toDict'):
+        betDisk = betDisk.toDict(asLists=False)
+
+    missing = [key for key in REQUIRED_KEYS if key not in betDisk]
+    if missing:
+        return [f'missing BET disk entries {missing}']
+
+    problems = []
+    checkScalars(problems, betDisk)
+    alphas = checkVector(problems, betDisk, 'alphas', increasing=True)
+    machs = checkVector(problems, betDisk, 'MachNumbers', increasing=True)
+    reynolds = checkVector(problems, betDisk, 'ReynoldsNumbers', positive=True, increasing=True)
+    sectionalRadiuses = checkVector(problems, betDisk, 'sectionalRadiuses', positive=True, increasing=True)
+    if machs is not None and np.any(machs < 0):
+        problems.append('MachNumbers must not be negative')
+    if alphas is not None and (alphas[0] < -180 or alphas[-1] > 180):
+        problems.append(f'alphas must be within [-180, 180] deg, they go from {alphas[0]} to {alphas[-1]}')
+    radius = betDisk['radius']
+    if sectionalRadiuses is not None and isinstance(radius, (int, float, np.number)) and sectionalRadiuses[-1] > radius:
+        problems.append(f'sectionalRadiuses go up to {sectionalRadiuses[-1]}, beyond the disk radius {radius}')
+
+    checkDistribution(problems, betDisk, 'twists', 'twist', sectionalRadiuses)
+    checkDistribution(problems, betDisk, 'chords', 'chord', sectionalRadiuses)
+
+    grids = [sectionalRadiuses, machs, reynolds, alphas]
+    shape = None if any(grid is None for grid in grids) else tuple(len(grid) for grid in grids)
+    checkPolars(problems, betDisk, shape)
+    return problems
+
+
+########################################################################################################################
+def validateFlow360JSON(flow360Dict):
+    """
+    Check all the BET disks of a Flow360 input dictionary.
+
+    Returns
+    -------
+    list of strings describing the problems, each one prefixed with the index of its disk. Empty if all is valid.
+    """
+    betDisks = flow360Dict.get('BETDisks')
+    if not isinstance(betDisks, list):
+        return ['the Flow360 input has no BETDisks list']
+    return [f'BETDisks[{diskIdx}]: {problem}' for diskIdx, betDisk in enumerate(betDisks)
+            for problem in validateBETDisk(betDisk)]
+
+
+########################################################################################################################
+def checkBETDisk(betDisk):
+    """
+    Raise a ValueError listing all the problems of betDisk, if it has any.
+    """
+    problems = validateBETDisk(betDisk)
+    if problems:
+        raise ValueError('invalid BET disk:\n    ' + '\n    '.join(problems))
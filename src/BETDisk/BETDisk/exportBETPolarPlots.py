@@ -5,170 +5,241 @@
 
     The goal is to make sure that the polars and geometry information being given to the Flow360 solver is as expected.
 
+    Each station of each disk gets its own figures. When the plots are only saved, not shown, they are rendered with
+    the non-interactive Agg backend and can be spread over a pool of processes with --jobs.
+
+Example
+-------
+    $ python -m BETDisk.exportBETPolarPlots -i flow360_BET.json --jobs 8 --output-dir plots/
+
     Returns
     -------
     None: saves plots of the 2D polars
 """
 
 
-import json
+import matplotlib
 import matplotlib.pyplot as plt
 import argparse
+import concurrent.futures
 import os
 
+from .betDiskModel import BETDisk
+from .flow360JSONReader import readBETDisks
+
 figSize = [16, 8]
 ticks = ['x-', '+--', 'p:', '^-', '>--', '<-', '*:', '-', '1-', '2--','3--','4:']
 
 ################################################################################################################
-def plotClCd(jsonDict, save=False, show=True):
+def betDiskModels(jsonDict):
     """
-    Take a valid Flow360 BET disk JSON dictionary and plot the 2D polar values for the various stations.
-
-    Returns
-    -------
-    saves plots of the 2D polars in png
-    """
-    nDisks = len(jsonDict['BETDisks'])
-    for diskNum in range((nDisks)):
-        nStations = len(jsonDict['BETDisks'][diskNum]['sectionalRadiuses'])
-        alphas = jsonDict['BETDisks'][diskNum]['alphas']
-        nMachs = len(jsonDict['BETDisks'][diskNum]['MachNumbers'])
-        #plt.figure(figsize=(32, 16))
-          # needed to differentiate the various sections in the final plot.
-        for stationIdx in range(nStations):
-            plt.figure(figsize=(figSize[0], figSize[1]))
-            for machIdx in range(nMachs):
-                plt.subplot(1, 2, 1)
-                plt.plot(jsonDict['BETDisks'][diskNum]['sectionalPolars'][stationIdx]['dragCoeffs'][machIdx][0],
-                         jsonDict['BETDisks'][diskNum]['sectionalPolars'][stationIdx]['liftCoeffs'][machIdx][0], ticks[stationIdx],
-                         label='Mach#:%.2f' % (jsonDict['BETDisks'][diskNum]['MachNumbers'][machIdx]))
-                plt.subplot(1, 2, 2)
-                plt.plot(alphas, jsonDict['BETDisks'][diskNum]['sectionalPolars'][stationIdx]['liftCoeffs'][machIdx][0],
-                         ticks[stationIdx], label=' Mach#:%.2f' % (jsonDict['BETDisks'][diskNum]['MachNumbers'][machIdx]))
-
-            plt.subplot(1, 2, 1)
-            plt.xlim(0, 0.07)
-            plt.ylim(-1, 3)
-            plt.xlabel('Cd')
-            plt.ylabel('Cl')
-            plt.grid('on')
-            plt.legend()
-            plt.title('CL vs Cd')
-            plt.subplot(1, 2, 2)
-            plt.xlim(-10, 20)
-            plt.ylim(-1, 3)
-            plt.xlabel('Alpha')
-            plt.ylabel('Cl')
-            plt.grid('on')
-            plt.legend()
-            plt.title('Cl vs Alpha')
-            if save:
-                plt.savefig('disk%i_CL_CD_comparetoXrotor_station%i.png' % (diskNum, stationIdx))
-            if show:
-                plt.show()
-
-            plt.close()
-
-        # Now we plot the CL v alpha and CD vs alpha at larger alphas
-        for stationIdx in range(nStations):
-            plt.figure(figsize=(figSize[0], figSize[1]))
-            for machIdx in range(nMachs):
-                plt.subplot(1, 2, 1)
-                plt.plot(alphas, jsonDict['BETDisks'][diskNum]['sectionalPolars'][stationIdx]['liftCoeffs'][machIdx][0], ticks[stationIdx],
-                         label='CL Mach#:%.2f' % (jsonDict['BETDisks'][diskNum]['MachNumbers'][machIdx]))
-                plt.subplot(1, 2, 2)
-                plt.plot(alphas, jsonDict['BETDisks'][diskNum]['sectionalPolars'][stationIdx]['dragCoeffs'][machIdx][0], ticks[stationIdx],
-                         label='Cd Mach#:%.2f' % (jsonDict['BETDisks'][diskNum]['MachNumbers'][machIdx]))
-
-
-            plt.subplot(1, 2, 1)
-            plt.xlabel('alpha')
-            plt.ylabel('Cl')
-            plt.grid('on')
-            plt.legend()
-            plt.title('CL vs Alpha')
-            plt.subplot(1, 2, 2)
-            plt.xlabel('Alpha')
-            plt.ylabel('Cd')
-            plt.grid('on')
-            plt.legend()
-            plt.title('Cd vs Alpha')
-            if save:
-                plt.savefig('disk%i_CL_CDvAlpha_station%i.png' % (diskNum, stationIdx))
-            if show:
-                plt.show()
-            plt.subplot(1, 2, 1)
-            plt.xlim(-45, 45)
-            plt.subplot(1, 2, 2)
-            plt.xlim(-45, 45)
-            if save:
-                plt.savefig('disk%i_CL_CDvAlphaZoomed_station%i.png' % (diskNum, stationIdx))
-            if show:
-                plt.show()
-            plt.subplot(1, 2, 1)
-            plt.xlim(-20, 20)
-            plt.subplot(1, 2, 2)
-            plt.xlim(-20, 20)
-            if save:
-                plt.savefig('disk%i_CL_CDvAlphaZoomed2_station%i.png' % (diskNum, stationIdx))
-            if show:
-                plt.show()
-
-            plt.close()
+    Return the BET disks of a Flow360 dictionary as betDiskModel.BETDisk objects, the plots work on their arrays.
+    """
+    return [betDisk if isinstance(betDisk, BETDisk) else BETDisk.fromDict(betDisk) for betDisk in jsonDict['BETDisks']]
 
 
 ################################################################################################################
-def plotTwistChord(jsonDict, save=False, show=True):
+def useHeadlessBackend():
     """
-    Take a valid Flow360 BET disk JSON dictionary and plot the twist and chord of the propeller vs radius for the
-    various stations.
+    Render the figures with the non-interactive Agg backend, no display is needed.
+    """
+    matplotlib.use('Agg')
+    plt.switch_backend('Agg')
 
-    Returns
-    -------
-    saves png plots of the blade geometry (twist and chord)
 
+################################################################################################################
+def plotStationClCd(diskNum, stationIdx, alphas, machs, liftCoeffs, dragCoeffs, save=False, show=True, outputDir='.'):
     """
-    nDisks = len(jsonDict['BETDisks'])
-    plt.figure(figsize=(32, 16))
-    for diskNum in range((nDisks)):
-        twists=[]
-        radius=[]
-        twistList=jsonDict['BETDisks'][diskNum]['twists']
-        for i in range(len(twistList)):
-            twists.append(twistList[i]['twist'])
-            radius.append(twistList[i]['radius'])
-        plt.plot(radius,twists,label='Disk %i'%diskNum)
-    plt.xlabel('radius')
-    plt.ylabel('Twist')
+    Plot the 2D polars of one station of one disk.
+
+    Attributes
+    ----------
+    diskNum, stationIdx: int, indices of the disk and station, used in the file names
+    alphas: array of the alphas
+    machs: array of the Mach numbers
+    liftCoeffs, dragCoeffs: arrays of shape (nMachs, nAlphas) of the station
+    save: bool, save the plots in png
+    show: bool, show the plots
+    outputDir: string, directory of the png files
+    return: list of the files written
+    """
+    outputFiles = []
+    tick = ticks[stationIdx % len(ticks)]  # needed to differentiate the various sections in the final plot.
+    plt.figure(figsize=(figSize[0], figSize[1]))
+    for machIdx, mach in enumerate(machs):
+        plt.subplot(1, 2, 1)
+        plt.plot(dragCoeffs[machIdx], liftCoeffs[machIdx], tick, label='Mach#:%.2f' % mach)
+        plt.subplot(1, 2, 2)
+        plt.plot(alphas, liftCoeffs[machIdx], tick, label=' Mach#:%.2f' % mach)
+
+    plt.subplot(1, 2, 1)
+    plt.xlim(0, 0.07)
+    plt.ylim(-1, 3)
+    plt.xlabel('Cd')
+    plt.ylabel('Cl')
     plt.grid('on')
     plt.legend()
-    plt.title('Twist vs Propeller Radius')
+    plt.title('CL vs Cd')
+    plt.subplot(1, 2, 2)
+    plt.xlim(-10, 20)
+    plt.ylim(-1, 3)
+    plt.xlabel('Alpha')
+    plt.ylabel('Cl')
+    plt.grid('on')
+    plt.legend()
+    plt.title('Cl vs Alpha')
+    if save:
+        outputFiles.append(os.path.join(outputDir, 'disk%i_CL_CD_comparetoXrotor_station%i.png'
+                                        % (diskNum, stationIdx)))
+        plt.savefig(outputFiles[-1])
+    if show:
+        plt.show()
+
+    plt.close()
+
+    # Now we plot the CL v alpha and CD vs alpha at larger alphas
+    plt.figure(figsize=(figSize[0], figSize[1]))
+    for machIdx, mach in enumerate(machs):
+        plt.subplot(1, 2, 1)
+        plt.plot(alphas, liftCoeffs[machIdx], tick, label='CL Mach#:%.2f' % mach)
+        plt.subplot(1, 2, 2)
+        plt.plot(alphas, dragCoeffs[machIdx], tick, label='Cd Mach#:%.2f' % mach)
+
+
+    plt.subplot(1, 2, 1)
+    plt.xlabel('alpha')
+    plt.ylabel('Cl')
+    plt.grid('on')
+    plt.legend()
+    plt.title('CL vs Alpha')
+    plt.subplot(1, 2, 2)
+    plt.xlabel('Alpha')
+    plt.ylabel('Cd')
+    plt.grid('on')
+    plt.legend()
+    plt.title('Cd vs Alpha')
+    if save:
+        outputFiles.append(os.path.join(outputDir, 'disk%i_CL_CDvAlpha_station%i.png'
+                                        % (diskNum, stationIdx)))
+        plt.savefig(outputFiles[-1])
+    if show:
+        plt.show()
+    plt.subplot(1, 2, 1)
+    plt.xlim(-45, 45)
+    plt.subplot(1, 2, 2)
+    plt.xlim(-45, 45)
     if save:
-        plt.savefig('TwistVRadius.png')
+        outputFiles.append(os.path.join(outputDir, 'disk%i_CL_CDvAlphaZoomed_station%i.png'
+                                        % (diskNum, stationIdx)))
+        plt.savefig(outputFiles[-1])
     if show:
-        plt.show()        
+        plt.show()
+    plt.subplot(1, 2, 1)
+    plt.xlim(-20, 20)
+    plt.subplot(1, 2, 2)
+    plt.xlim(-20, 20)
+    if save:
+        outputFiles.append(os.path.join(outputDir, 'disk%i_CL_CDvAlphaZoomed2_station%i.png'
+                                        % (diskNum, stationIdx)))
+        plt.savefig(outputFiles[-1])
+    if show:
+        plt.show()
+
     plt.close()
 
-    # now we plot the chords vs radius
+    return outputFiles
+
+
+################################################################################################################
+def renderTasks(function, tasks, jobs=1):
+    """
+    Run function(*task) for all the tasks, on a pool of jobs processes rendering with the Agg backend if jobs > 1.
+
+    Returns
+    -------
+    list of the files written by all the tasks, in the order of the tasks
+    """
+    if jobs <= 1:
+        return [outputFile for task in tasks for outputFile in function(*task)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=useHeadlessBackend) as executor:
+        futures = [executor.submit(function, *task) for task in tasks]
+        return [outputFile for future in futures for outputFile in future.result()]
+
+
+################################################################################################################
+def plotClCd(jsonDict, save=False, show=True, jobs=1, outputDir='.'):
+    """
+    Take a valid Flow360 BET disk JSON dictionary and plot the 2D polar values for the various stations.
+    The BETDisks can be dictionaries or betDiskModel.BETDisk objects as returned by flow360JSONReader.readBETDisks.
+    With jobs > 1 the stations are rendered on a pool of processes, the plots can then only be saved, not shown.
+
+    Returns
+    -------
+    list of the png files written
+    """
+    if jobs > 1 and show:
+        raise ValueError('the plots can not be shown when they are rendered on several processes, use jobs=1')
+    tasks = []
+    for diskNum, betDisk in enumerate(betDiskModels(jsonDict)):
+        liftCoeffs = betDisk.polars.liftCoeffs[:, :, 0]  # (station, mach, alpha) at the first Reynolds number
+        dragCoeffs = betDisk.polars.dragCoeffs[:, :, 0]
+        for stationIdx in range(len(betDisk.sectionalRadiuses)):
+            tasks.append((diskNum, stationIdx, betDisk.polars.alphas, betDisk.polars.machs, liftCoeffs[stationIdx],
+                          dragCoeffs[stationIdx], save, show, outputDir))
+    return renderTasks(plotStationClCd, tasks, jobs)
+
+
+################################################################################################################
+def plotDistribution(curves, ylabel, title, fileName, save=False, show=True, outputDir='.'):
+    """
+    Plot one blade distribution (twist or chord) of all the disks on a single figure.
+
+    Attributes
+    ----------
+    curves: list of (radii, values) arrays, one per disk
+    ylabel, title: strings of the figure
+    fileName: name of the png file
+    return: list of the files written
+    """
+    outputFiles = []
     plt.figure(figsize=(32, 16))
-    for diskNum in range((nDisks)):
-        chords=[]
-        radius=[]
-        chordList=jsonDict['BETDisks'][diskNum]['chords']
-        for i in range(len(chordList)):
-            chords.append(chordList[i]['chord'])
-            radius.append(chordList[i]['radius'])
-        plt.plot(radius,chords,label='Disk %i'%diskNum)
+    for diskNum, (radii, values) in enumerate(curves):
+        plt.plot(radii, values, label='Disk %i' % diskNum)
     plt.xlabel('radius')
-    plt.ylabel('chords')
+    plt.ylabel(ylabel)
     plt.grid('on')
     plt.legend()
-    plt.title('Chord vs Propeller Radius')
+    plt.title(title)
     if save:
-        plt.savefig('ChordVRadius.png')
+        outputFiles.append(os.path.join(outputDir, fileName))
+        plt.savefig(outputFiles[-1])
     if show:
-        plt.show()      
+        plt.show()
     plt.close()
+    return outputFiles
+
+
+################################################################################################################
+def plotTwistChord(jsonDict, save=False, show=True, jobs=1, outputDir='.'):
+    """
+    Take a valid Flow360 BET disk JSON dictionary and plot the twist and chord of the propeller vs radius for the
+    various stations. With jobs > 1 the twist and chord figures are rendered on separate processes.
+
+    Returns
+    -------
+    list of the png files written with the blade geometry (twist and chord)
+
+    """
+    if jobs > 1 and show:
+        raise ValueError('the plots can not be shown when they are rendered on several processes, use jobs=1')
+    betDisks = betDiskModels(jsonDict)
+    tasks = [([(betDisk.twistRadiuses, betDisk.twists) for betDisk in betDisks], 'Twist', 'Twist vs Propeller Radius',
+              'TwistVRadius.png', save, show, outputDir),
+             ([(betDisk.chordRadiuses, betDisk.chords) for betDisk in betDisks], 'chords', 'Chord vs Propeller Radius',
+              'ChordVRadius.png', save, show, outputDir)]
+    return renderTasks(plotDistribution, tasks, min(jobs, len(tasks)))
+
+
 ################################################################################################################
 def main():
     """
@@ -189,8 +260,18 @@ def main():
     parser.add_argument('--show',
                         required = False,
                         help='Boolean whether to show the plots of the 2D polars',
-                        action="store_true")                        
+                        action="store_true")
+    parser.add_argument('-j', '--jobs',
+                        type     = int,
+                        default  = 1,
+                        help     = 'number of processes rendering the plots, they can then only be saved')
+    parser.add_argument('--output-dir',
+                        type     = str,
+                        default  = '.',
+                        help     = 'directory where the PNG plots are saved')
     args = parser.parse_args()
+    if args.show and args.jobs > 1:
+        parser.error('--show can only be used with --jobs 1')
 
     # load in the files
     JsonFile = args.input
@@ -200,12 +281,18 @@ def main():
         print('EXITING')
         raise NameError('flow360 json input file %s does not exist.' % JsonFile)
 
-    with open(JsonFile) as fh:
-        jsonDict = json.load(fh)
+    # only the BET disks are read, straight into arrays
+    jsonDict = {'BETDisks': readBETDisks(JsonFile)}
 
+    if not args.show:
+        useHeadlessBackend()  # nothing is shown, no display is needed
     savePNG = not args.no_save
-    plotClCd(jsonDict, savePNG, args.show)
-    plotTwistChord(jsonDict, savePNG, args.show)
+    if savePNG:
+        os.makedirs(args.output_dir, exist_ok=True)
+    outputFiles = plotClCd(jsonDict, savePNG, args.show, args.jobs, args.output_dir)
+    outputFiles += plotTwistChord(jsonDict, savePNG, args.show, args.jobs, args.output_dir)
+    print(f'{len(outputFiles)} plots saved in {args.output_dir}')
+    return outputFiles
 
 
 ################################################################################################################
@@ -0,0 +1,219 @@
+"""
+Streaming loader of the BET disks of a Flow360 input JSON file into arrays.
+
+json.load builds the whole Flow360 input as nested Python lists before we can use any of it, and the tools working on
+the BET disks then walk those lists polar by polar. This loader reads the file in chunks and only goes through the
+BETDisks list: every other entry of the Flow360 input is skipped and each sectional polar is decoded on its own and
+converted to arrays right away. The disks are returned as betDiskModel.BETDisk objects, with the alphas, Mach and
+Reynolds numbers, radii, twists and chords as 1D arrays and all the CL and CD values of a disk as
+(nSections, nMachs, nReynolds, nAlphas) arrays. Only the standard json module and NumPy are used.
+
+Memory stays at the arrays of the disks plus one sectional polar as Python lists, whatever the size of the file.
+
+EXAMPLE useage:
+
+    for betDisk in iterBETDisks('flow360_BET.json'):
+        print(betDisk.sectionalRadiuses, betDisk.polars.liftCoeffs.shape)
+
+    betDisks = readBETDisks('flow360_BET.json')
+"""
+
+import json
+
+import numpy as np
+
+from .betDiskModel import BETDisk, PolarTable
+
+WHITESPACE = ' \t\n\r'
+NUMBER_CHARS = '0123456789.eE+-'  # characters that can go on a number, no JSON value is followed by one of them
+
+
+########################################################################################################################
+class JSONStream:
+    """
+    Incremental reader of a JSON document from a text file. Whole values are decoded with json.JSONDecoder.raw_decode
+    once enough of the file is in the buffer, the containers we want to go through are walked token by token.
+
+    Attributes
+    ----------
+    fh: open text file
+    fileName: string, name of the file in the error messages
+    chunkSize: int, number of characters read from the file at a time
+    """
+
+    def __init__(self, fh, fileName, chunkSize=1024 ** 2):
+        self.fh = fh
+        self.fileName = fileName
+        self.chunkSize = chunkSize
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    ####################################################################################################################
+    def fill(self, minSize):
+        """
+        Read from the file until the buffer holds at least minSize characters past pos or we reach the end of the file.
+        The characters we went through are dropped from the buffer.
+        """
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        chunks = [self.buffer]
+        size = len(self.buffer)
+        while size < minSize and not self.eof:
+            chunk = self.fh.read(max(self.chunkSize, minSize - size))
+            if not chunk:
+                self.eof = True
+            chunks.append(chunk)
+            size += len(chunk)
+        self.buffer = ''.join(chunks)
+
+    ####################################################################################################################
+    def error(self, message):
+        return ValueError(f'{message} in {self.fileName}')
+
+    ####################################################################################################################
+    def peek(self):
+        """
+        Skip the whitespace and return the next character, '' at the end of the file.
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self.fill(1)
+
+    ####################################################################################################################
+    def expect(self, chars):
+        char = self.peek()
+        if char == '' or char not in chars:
+            raise self.error(f'expected one of {chars!r} but found {char!r}')
+        self.pos += 1
+        return char
+
+    ####################################################################################################################
+    def value(self):
+        """
+        Decode the next value. The buffer is grown until the value is complete: a number cut by the end of the buffer
+        decodes to its first part (1.2345e-05 cut after 1. or 1.2345e decodes to 1), so we only take a value once we
+        have seen the character after it and that character can not go on a number.
+        """
+        self.peek()
+        minSize = self.chunkSize
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                if self.eof or end < len(self.buffer) and self.buffer[end] not in NUMBER_CHARS:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as error:
+                if self.eof:
+                    raise self.error(f'invalid JSON: {error}') from None
+            minSize = 2 * max(minSize, len(self.buffer) - self.pos)  # grow geometrically so large values stay linear
+            self.fill(minSize)
+
+    ####################################################################################################################
+    def items(self):
+        """
+        Iterate over the keys of the next JSON object. The caller must consume the value of each key, with value() or
+        by walking it, before asking for the next key.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise self.error(f'expected an object key but found {key!r}')
+            self.expect(':')
+            yield key
+            if self.expect(',}') == '}':
+                return
+
+    ####################################################################################################################
+    def elements(self):
+        """
+        Iterate over the elements of the next JSON list, each one must be consumed before asking for the next one.
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.expect(',]') == ']':
+                return
+
+
+########################################################################################################################
+def readBETDisk(stream):
+    """
+    Read the next BET disk of the stream, converting each sectional polar to arrays as soon as it is decoded.
+
+    Returns
+    -------
+    betDiskModel.BETDisk
+    """
+    betDisk = {}
+    liftCoeffs = []
+    dragCoeffs = []
+    for key in stream.items():
+        if key != 'sectionalPolars':
+            betDisk[key] = stream.value()
+            continue
+        for _ in stream.elements():
+            polar = stream.value()
+            try:
+                liftCoeffs.append(np.array(polar['liftCoeffs'], dtype=float))
+                dragCoeffs.append(np.array(polar['dragCoeffs'], dtype=float))
+            except (TypeError, KeyError, ValueError):
+                raise stream.error(f'sectional polar {len(liftCoeffs)} of BET disk is not a (Mach, Reynolds, alpha) '
+                                   f'table of liftCoeffs and dragCoeffs') from None
+
+    missing = [key for key in ['alphas', 'MachNumbers', 'ReynoldsNumbers', 'twists', 'chords', 'sectionalRadiuses']
+               if key not in betDisk]
+    if missing:
+        raise stream.error(f'BET disk without {missing}')
+    shape = (len(betDisk['MachNumbers']), len(betDisk['ReynoldsNumbers']), len(betDisk['alphas']))
+    if any(cl.shape != shape or cd.shape != shape for cl, cd in zip(liftCoeffs, dragCoeffs)):
+        raise stream.error(f'the liftCoeffs and dragCoeffs of the BET disk must all have the (Mach, Reynolds, alpha) '
+                           f'shape {shape}')
+    polars = PolarTable(betDisk['alphas'], betDisk['MachNumbers'], betDisk['ReynoldsNumbers'],
+                        np.stack(liftCoeffs) if liftCoeffs else np.empty((0,) + shape),
+                        np.stack(dragCoeffs) if dragCoeffs else np.empty((0,) + shape))
+    return BETDisk.fromDict(betDisk, polars)
+
+
+########################################################################################################################
+def iterBETDisks(flow360File, chunkSize=1024 ** 2):
+    """
+    Stream the BET disks of a Flow360 input JSON file, one at a time.
+
+    Attributes
+    ----------
+    flow360File: string, path to the Flow360 input JSON file
+    chunkSize: int, number of characters read from the file at a time
+    return: generator of betDiskModel.BETDisk
+    """
+    with open(flow360File) as fh:
+        stream = JSONStream(fh, flow360File, chunkSize)
+        for key in stream.items():
+            if key != 'BETDisks':
+                stream.value()  # not a BET disk, decoded and dropped
+                continue
+            for _ in stream.elements():
+                yield readBETDisk(stream)
+
+
+########################################################################################################################
+def readBETDisks(flow360File, chunkSize=1024 ** 2):
+    """
+    Read all the BET disks of a Flow360 input JSON file, see iterBETDisks.
+
+    Returns
+    -------
+    list of betDiskModel.BETDisk
+    """
+    return list(iterBETDisks(flow360File, chunkSize))
@@ -0,0 +1,168 @@
+"""
+Streaming JSON writer for Flow360 input files with large BET disks.
+
+json.dump encodes the whole Flow360 input one token at a time with the pure Python encoder and needs every polar as
+nested Python lists. This writer walks the dictionary and streams it to the file piece by piece instead: each row of
+numbers (e.g. the CLs of one section at one Mach and Reynolds number) is formatted in one go and written with a single
+call. The rows can be lists or NumPy arrays, so BET disks holding arrays are written without converting them to lists.
+
+Two layouts are available: the pretty one, identical to json.dump(flow360Dict, fh, indent=4), and the compact one
+without any whitespace. The floats can also be limited to a number of significant digits, which makes the files much
+smaller.
+
+EXAMPLE useage:
+
+    writeFlow360JSON('flow360_BET.json', flow360Dict)
+    writeFlow360JSON('flow360_BET.json', flow360Dict, indent=None, significantDigits=8)
+"""
+
+import json
+import math
+import numbers
+
+import numpy as np
+
+# same spelling of the special floats as the json module
+SPECIAL_FLOATS = {math.inf: 'Infinity', -math.inf: '-Infinity'}
+
+
+########################################################################################################################
+def formatFloat(value, significantDigits=None):
+    if value != value:
+        return 'NaN'
+    if value in SPECIAL_FLOATS:
+        return SPECIAL_FLOATS[value]
+    if significantDigits is None:
+        return float.__repr__(value)
+    return f'{value:.{significantDigits}g}'
+
+
+########################################################################################################################
+def formatNumbers(values, significantDigits=None):
+    """
+    Format a row of numbers as the list of their JSON strings.
+
+    Attributes
+    ----------
+    values: list of ints and floats or 1D NumPy array of numbers
+    significantDigits: int, number of significant digits of the floats, None for the shortest exact representation
+    return: list of strings
+    """
+    if isinstance(values, np.ndarray):
+        if values.dtype.kind in 'iub':
+            return [str(value) for value in values.astype(int).tolist()]
+        if significantDigits is not None and np.isfinite(values).all():
+            return np.char.mod(f'%.{significantDigits}g', values).tolist()  # vectorized formatting
+        values = values.tolist()
+    return [str(int(value)) if isinstance(value, numbers.Integral) else formatFloat(float(value), significantDigits)
+            for value in values]
+
+
+########################################################################################################################
+def isNumberRow(value):
+    """
+    True for the rows of numbers we format in one go: 1D numeric arrays and lists of ints and floats.
+    """
+    if isinstance(value, np.ndarray):
+        return value.ndim == 1 and value.dtype.kind in 'iuf'
+    return bool(value) and all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in value)
+
+
+########################################################################################################################
+class Flow360JSONWriter:
+    """
+    Write a JSON document to an open text file piece by piece.
+
+    Attributes
+    ----------
+    fh: open text file
+    indent: int, number of spaces per level for the pretty layout (same as json.dump), None for the compact layout
+    significantDigits: int, number of significant digits of the floats, None to write them exactly
+    """
+
+    def __init__(self, fh, indent=4, significantDigits=None):
+        self.fh = fh
+        self.indent = indent
+        self.significantDigits = significantDigits
+        self.keySeparator = ':' if indent is None else ': '
+
+    ####################################################################################################################
+    def newline(self, level):
+        """
+        Separator placed before the first item of a container, between items and before the closing bracket.
+        """
+        if self.indent is None:
+            return ''
+        return '\n' + ' ' * (self.indent * level)
+
+    ####################################################################################################################
+    def write(self, value, level=0):
+        if isinstance(value, dict):
+            self.writeDict(value, level)
+        elif isinstance(value, (list, tuple, np.ndarray)):
+            self.writeList(value, level)
+        elif isinstance(value, np.generic):
+            self.write(value.item(), level)
+        elif hasattr(value, 'toDict'):  # BETDisk objects, written from their arrays
+            self.writeDict(value.toDict(asLists=False), level)
+        elif isinstance(value, float):
+            self.fh.write(formatFloat(value, self.significantDigits))
+        else:
+            self.fh.write(json.dumps(value))  # strings, ints, bools and None
+
+    ####################################################################################################################
+    def writeDict(self, value, level):
+        if not value:
+            self.fh.write('{}')
+            return
+        self.fh.write('{')
+        for itemIdx, (key, item) in enumerate(value.items()):
+            if itemIdx:
+                self.fh.write(',')
+            if not isinstance(key, str):
+                key = json.dumps(key)  # json turns the int, float and bool keys into strings the same way
+            self.fh.write(self.newline(level + 1) + json.dumps(key) + self.keySeparator)
+            self.write(item, level + 1)
+        self.fh.write(self.newline(level) + '}')
+
+    ####################################################################################################################
+    def writeList(self, value, level):
+        if len(value) == 0:
+            self.fh.write('[]')
+            return
+        if isNumberRow(value):  # the whole row in a single write
+            separator = ',' + self.newline(level + 1) if self.indent is not None else ','
+            numbers = formatNumbers(value, self.significantDigits)
+            self.fh.write('[' + self.newline(level + 1) + separator.join(numbers) + self.newline(level) + ']')
+            return
+        self.fh.write('[')
+        for itemIdx, item in enumerate(value):
+            if itemIdx:
+                self.fh.write(',')
+            self.fh.write(self.newline(level + 1))
+            self.write(item, level + 1)
+        self.fh.write(self.newline(level) + ']')
+
+
+########################################################################################################################
+def writeJSON(fh, value, indent=4, significantDigits=None):
+    """
+    Stream value to the open text file fh as JSON, see Flow360JSONWriter.
+    """
+    Flow360JSONWriter(fh, indent, significantDigits).write(value)
+
+
+########################################################################################################################
+def writeFlow360JSON(outputFile, flow360Dict, indent=4, significantDigits=None):
+    """
+    Stream a Flow360 input dictionary, BET disks included, to outputFile.
+
+    Attributes
+    ----------
+    outputFile: string, path of the JSON file to write
+    flow360Dict: Flow360 input dictionary. The BET disk values can be lists or NumPy arrays.
+    indent: int, indentation of the pretty layout, None for the compact layout
+    significantDigits: int, number of significant digits of the floats, None to write them exactly
+    """
+    with open(outputFile, 'w') as fh:
+        writeJSON(fh, flow360Dict, indent, significantDigits)
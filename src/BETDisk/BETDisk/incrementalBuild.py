@@ -0,0 +1,146 @@
+"""
+Incremental rebuild of the C81 and Xfoil BET disks.
+
+A C81 or Xfoil BET disk is made from a geometry file and one polar file per section (and per Mach for Xfoil). When we
+iterate on a blade usually only one or two of those files change between two translations. An IncrementalBuild
+records the content hash of every file it reads along with the parsed result in a state file. The next build only
+rereads the files whose content changed and reuses the parsed results of all the other ones.
+
+The state file is a pickle written by this module, only point it at state files you wrote yourself.
+
+EXAMPLE useage:
+
+    betDisk = generateC81BETJSONIncremental('Xv15_geometry.csv', betDiskParams, 'Xv15_geometry.state')
+"""
+
+import os
+import pickle
+import tempfile
+
+from .BETTranslatorInterface import generateC81BETJSON, generateXfoilBETJSON, parseGeometryfile, readInC81Polar, \
+    readInXfoilPolars
+from .utils import fileHash
+
+
+########################################################################################################################
+class IncrementalBuild:
+    """
+    Content hashes and parsed results of the files read during a build.
+
+    Attributes
+    ----------
+    stateFile: string, file where the hashes and parsed results are kept between builds.
+    rereadFiles: list of the files that were parsed during this build because they are new or changed.
+    """
+
+    version = 1
+
+    def __init__(self, stateFile):
+        self.stateFile = stateFile
+        self.entries = self.loadState(stateFile)
+        self.usedEntries = {}
+        self.rereadFiles = []
+
+    ####################################################################################################################
+    @classmethod
+    def loadState(cls, stateFile):
+        """
+        Read the entries of the previous build. A missing, unreadable or out of date state file means a full build.
+        """
+        try:
+            with open(stateFile, 'rb') as fh:
+                state = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return {}
+        if not isinstance(state, dict) or state.get('version') != cls.version:
+            return {}
+        return state['entries']
+
+    ####################################################################################################################
+    @staticmethod
+    def fileHash(fileName):
+        return fileHash(fileName)
+
+    ####################################################################################################################
+    def read(self, reader, fileName):
+        """
+        Return reader(fileName), reusing the result of the previous build if the content of fileName did not change.
+        """
+        key = f'{reader.__name__}:{os.path.abspath(fileName)}'  # the same file could be read by different readers
+        digest = self.fileHash(fileName)
+        entry = self.entries.get(key)
+        if entry is None or entry['sha256'] != digest:
+            entry = {'sha256': digest, 'result': reader(fileName)}
+            self.rereadFiles.append(fileName)
+        self.usedEntries[key] = entry
+        return entry['result']
+
+    ####################################################################################################################
+    def parseGeometryfile(self, geometryFileName):
+        return self.read(parseGeometryfile, geometryFileName)
+
+    ####################################################################################################################
+    def polarReader(self, reader):
+        """
+        Wrap a polar file reader such as readInC81Polar or readInXfoilPolars so that it goes through this build.
+        """
+        return lambda polarFile: self.read(reader, polarFile)
+
+    ####################################################################################################################
+    def save(self):
+        """
+        Write the entries used by this build to the state file. Entries of files we did not use this time are dropped.
+        """
+        stateDir = os.path.dirname(os.path.abspath(self.stateFile))
+        fid, tmpPath = tempfile.mkstemp(dir=stateDir, suffix='.tmp')
+        try:
+            with os.fdopen(fid, 'wb') as fh:
+                pickle.dump({'version': self.version, 'entries': self.usedEntries}, fh)
+            os.replace(tmpPath, self.stateFile)
+        except BaseException:
+            os.remove(tmpPath)
+            raise
+
+
+########################################################################################################################
+def generateC81BETJSONIncremental(geometryFileName, betDisk, stateFile, asModel=False):
+    """
+    Same as generateC81BETJSON but only the geometry and polar files that changed since the last build using stateFile
+    are parsed again.
+
+    Attributes
+    ----------
+    geometryFileName: string, filepath to the geometry files we want to translate into a BET disk
+    betDisk: dictionary of the required betdisk data that we can't get form the geometry file.
+    stateFile: string, file keeping the hashes and parsed results between builds.
+    asModel: bool, return a betDiskModel.BETDisk instead of the dictionary.
+    return: dictionary that we should append to the Flow360.json file we want to run with.
+    """
+    build = IncrementalBuild(stateFile)
+    betDisk = generateC81BETJSON(geometryFileName, betDisk, readPolar=build.polarReader(readInC81Polar),
+                                 parseGeometry=build.parseGeometryfile, asModel=asModel)
+    build.save()
+    print(f'incremental build: {len(build.rereadFiles)} of {len(build.usedEntries)} files parsed again')
+    return betDisk
+
+
+########################################################################################################################
+def generateXfoilBETJSONIncremental(geometryFileName, betDisk, stateFile, asModel=False):
+    """
+    Same as generateXfoilBETJSON but only the geometry and polar files that changed since the last build using
+    stateFile are parsed again.
+
+    Attributes
+    ----------
+    geometryFileName: string, filepath to the geometry files we want to translate into a BET disk
+    betDisk: dictionary of the required betdisk data that we can't get form the geometry file.
+    stateFile: string, file keeping the hashes and parsed results between builds.
+    asModel: bool, return a betDiskModel.BETDisk instead of the dictionary.
+    return: dictionary that we should append to the Flow360.json file we want to run with.
+    """
+    build = IncrementalBuild(stateFile)
+    betDisk = generateXfoilBETJSON(geometryFileName, betDisk, readPolar=build.polarReader(readInXfoilPolars),
+                                   parseGeometry=build.parseGeometryfile, asModel=asModel)
+    build.save()
+    print(f'incremental build: {len(build.rereadFiles)} of {len(build.usedEntries)} files parsed again')
+    return betDisk
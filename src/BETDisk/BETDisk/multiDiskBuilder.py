@@ -0,0 +1,183 @@
+"""
+Translation of several BET disks sharing the polars they have in common.
+
+Multi-rotor configurations usually reuse the same blade, or the same aero sections, on several disks. Translated one
+by one, every disk computes its polars again and holds its own copy of them. A MultiDiskBuilder translates all the
+disks of a configuration with:
+    - an in memory polar cache shared by the Xrotor/DFDC disks, so each unique aero section is computed once,
+    - the C81 and Xfoil polar files parsed once per unique content, whatever their path,
+    - one PolarTable per unique set of polars: disks with identical polars share the same arrays in memory. These are
+      read only, call BETDisk.editablePolars before editing the polars of one of the disks.
+
+The disks are returned as betDiskModel.BETDisk objects. Writing them, e.g. with flow360JSONWriter.writeFlow360JSON,
+still writes the polars in full for each disk as Flow360 expects.
+
+EXAMPLE useage:
+
+    builder = MultiDiskBuilder()
+    betDisks = builder.buildDisks([{'type': 'dfdc', 'input': 'rotor.case', 'betDisk': leftRotorParams},
+                                   {'type': 'dfdc', 'input': 'rotor.case', 'betDisk': rightRotorParams}])
+    flow360Dict['BETDisks'] = betDisks
+    writeFlow360JSON('flow360_BET.json', flow360Dict)
+"""
+
+import hashlib
+import threading
+
+import numpy as np
+
+from .BETTranslatorInterface import generateXrotorBETJSON, generateC81BETJSON, generateXfoilBETJSON, \
+    readInC81Polar, readInXfoilPolars, XROTOR_OPTIONS
+from .polarCache import PolarCache
+from .utils import fileHash
+
+
+########################################################################################################################
+class MemoryPolarCache(PolarCache):
+    """
+    PolarCache keeping its entries in memory for the lifetime of the object, nothing is written to disk.
+
+    Attributes
+    ----------
+    hits: int, number of polars found in the cache
+    misses: int, number of polars we had to compute
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    ####################################################################################################################
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    ####################################################################################################################
+    def put(self, key, cl, cd, evict=True):
+        entry = (np.array(cl, dtype=float), np.array(cd, dtype=float))
+        for values in entry:
+            values.flags.writeable = False  # handed to every disk using this section
+        self.entries[key] = entry
+
+    ####################################################################################################################
+    def evict(self):
+        pass
+
+    ####################################################################################################################
+    def clear(self):
+        self.entries.clear()
+
+
+########################################################################################################################
+def polarTableKey(polars):
+    """
+    Hash of the content of a PolarTable, equal for the tables holding the same polars.
+    """
+    sha = hashlib.sha256()
+    for values in (polars.alphas, polars.machs, polars.reynolds, polars.liftCoeffs, polars.dragCoeffs):
+        sha.update(str(values.shape).encode())
+        sha.update(np.ascontiguousarray(values).tobytes())
+    return sha.hexdigest()
+
+
+########################################################################################################################
+class MultiDiskBuilder:
+    """
+    Translate BET disks sharing the work and the memory of the polars they have in common.
+
+    Attributes
+    ----------
+    polarCache: PolarCache used for the Xrotor/DFDC aero sections, a MemoryPolarCache by default. A PolarCache
+                directory also shares the sections across runs.
+    polarTables: dictionary of the unique PolarTables of the disks built so far, keyed by their content hash
+    """
+
+    def __init__(self, polarCache=None):
+        self.polarCache = MemoryPolarCache() if polarCache is None else polarCache
+        self.polarTables = {}
+        self.polarFiles = {}
+        self.numPolarFiles = 0
+        self.lock = threading.Lock()  # the polar files are read on the threads of readPolarFiles
+
+    ####################################################################################################################
+    def polarReader(self, reader):
+        """
+        Wrap a polar file reader such as readInC81Polar or readInXfoilPolars so that files with the same content are
+        only parsed once.
+        """
+        def readPolar(polarFile):
+            key = (reader.__name__, fileHash(polarFile))
+            with self.lock:
+                self.numPolarFiles += 1
+                result = self.polarFiles.get(key)
+            if result is None:
+                result = reader(polarFile)  # parsed outside of the lock so that the files are still read in parallel
+                with self.lock:
+                    result = self.polarFiles.setdefault(key, result)
+            return result
+        return readPolar
+
+    ####################################################################################################################
+    def sharePolars(self, betDisk):
+        """
+        Point betDisk to the PolarTable of a previous disk with identical polars, if there is one. The shared table is
+        made read only, see BETDisk.editablePolars.
+        """
+        key = polarTableKey(betDisk.polars)
+        polars = self.polarTables.setdefault(key, betDisk.polars)
+        if polars is not betDisk.polars:
+            betDisk.polars = polars.share()
+        return betDisk
+
+    ####################################################################################################################
+    def buildDisk(self, disk):
+        """
+        Translate one disk.
+
+        Attributes
+        ----------
+        disk: dictionary defining the disk as in the batchTranslate manifests: type (xrotor, dfdc, c81 or xfoil),
+              input file, betDisk dictionary and for xrotor and dfdc the optional rotorIdx, alphaTolerance and
+              machTolerance.
+        return: betDiskModel.BETDisk
+        """
+        diskType = disk['type'].lower()
+        betDisk = dict(disk['betDisk'])
+        if diskType in ['xrotor', 'dfdc']:
+            options = {key: disk[key] for key in XROTOR_OPTIONS if key in disk}
+            betDisk = generateXrotorBETJSON(disk['input'], betDisk, polarCache=self.polarCache, asModel=True,
+                                            **options)
+        elif diskType == 'c81':
+            betDisk = generateC81BETJSON(disk['input'], betDisk, readPolar=self.polarReader(readInC81Polar),
+                                         asModel=True)
+        elif diskType == 'xfoil':
+            betDisk = generateXfoilBETJSON(disk['input'], betDisk, readPolar=self.polarReader(readInXfoilPolars),
+                                           asModel=True)
+        else:
+            raise ValueError(f'unknown disk type {disk["type"]}, it must be one of xrotor, dfdc, c81 or xfoil')
+        return self.sharePolars(betDisk)
+
+    ####################################################################################################################
+    def buildDisks(self, disks):
+        """
+        Translate all the disks of a configuration.
+
+        Attributes
+        ----------
+        disks: list of disk dictionaries, see buildDisk
+        return: list of betDiskModel.BETDisk, in the same order
+        """
+        betDisks = [self.buildDisk(disk) for disk in disks]
+        message = f'{len(betDisks)} disks built with {len(self.polarTables)} unique polar tables'
+        if isinstance(self.polarCache, MemoryPolarCache):
+            message += f', {self.polarCache.misses} of {self.polarCache.hits + self.polarCache.misses} xrotor ' \
+                       f'sections computed'
+        if self.numPolarFiles:
+            message += f', {len(self.polarFiles)} of {self.numPolarFiles} polar files parsed'
+        print(message)
+        return betDisks
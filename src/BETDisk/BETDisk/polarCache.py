@@ -0,0 +1,154 @@
+"""
+On-disk cache for the 2D polars generated from XROTOR/DFDC aero section definitions.
+
+The polars computed by calcClCdArrays only depend on the aero parameters of one section, the list of alphas and the
+list of Mach numbers. They do not depend on omega, meshUnit or where the disk is placed. The cache is therefore keyed
+by a hash of those inputs so that BET disks sharing blade sections, even across separate jobs, only compute each
+polar once.
+
+Each entry is a single .npy file named after its key. Entries are written to a temporary file and atomically renamed
+into place so that concurrent readers never see a partial entry. The least recently used entries are removed once the
+cache grows above its size limit.
+
+EXAMPLE useage:
+
+    cache = PolarCache('~/.cache/flow360-betdisk')
+    betDisk = generateXrotorBETJSON(xrotorFileName, betDisk, polarCache=cache)
+"""
+
+import hashlib
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+# aero section parameters the Xrotor polar model depends on.
+XROTOR_POLAR_KEYS = ['a0deg', 'dclda', 'clmax', 'clmin', 'dcldastall', 'dclstall', 'mcrit', 'cdmin', 'clcdmin',
+                     'dcddcl2']
+
+# bump this whenever calcClCdArrays changes the numbers it produces so that stale entries are not reused.
+XROTOR_POLAR_MODEL_VERSION = 'xrotor-polar-v1'
+
+
+########################################################################################################################
+class PolarCache:
+    """
+    Size bounded, content addressed cache of (CL, CD) polar arrays stored in a directory.
+
+    Attributes
+    ----------
+    cacheDir: string, directory where the cache entries are stored. It is created if it does not exist.
+    maxSizeBytes: int, once the entries take more than this many bytes the least recently used ones are removed.
+    """
+
+    suffix = '.npy'
+
+    def __init__(self, cacheDir, maxSizeBytes=512 * 1024 ** 2):
+        self.cacheDir = os.path.abspath(os.path.expanduser(cacheDir))
+        self.maxSizeBytes = maxSizeBytes
+        os.makedirs(self.cacheDir, exist_ok=True)
+
+    ####################################################################################################################
+    def xrotorSectionKey(self, xrotorDict, sectionIdx, alphas, machs):
+        """
+        Hash of everything the Xrotor polar of one aero section depends on.
+
+        Attributes
+        ----------
+        xrotorDict: dictionary of Xrotor data as read in by readXROTORFile
+        sectionIdx: int, index of the aero section
+        alphas: list of floats
+        machs: list of floats
+        return: string, hex digest used as the cache key
+        """
+        params = np.array([xrotorDict[key][sectionIdx] for key in XROTOR_POLAR_KEYS], dtype=np.float64)
+        sha = hashlib.sha256(XROTOR_POLAR_MODEL_VERSION.encode())
+        for values in (params, np.asarray(alphas, dtype=np.float64), np.asarray(machs, dtype=np.float64)):
+            sha.update(len(values).to_bytes(8, 'little'))
+            sha.update(values.tobytes())
+        return sha.hexdigest()
+
+    ####################################################################################################################
+    def path(self, key):
+        return os.path.join(self.cacheDir, key + self.suffix)
+
+    ####################################################################################################################
+    def get(self, key):
+        """
+        Return the (CL, CD) arrays stored under key or None if we do not have them.
+        A hit marks the entry as the most recently used one.
+        """
+        entryPath = self.path(key)
+        try:
+            values = np.load(entryPath, allow_pickle=False)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+            # unreadable entry, e.g. empty or truncated after a crash, drop it and recompute.
+            self._remove(entryPath)
+            return None
+
+        try:
+            os.utime(entryPath)  # mtime is used as the last access time for the LRU eviction
+        except OSError:
+            pass  # evicted by another process in the meantime, we still have the values
+        return values[0], values[1]
+
+    ####################################################################################################################
+    def put(self, key, cl, cd, evict=True):
+        """
+        Store the (CL, CD) arrays under key, then evict the least recently used entries if we are above the size limit.
+        Use evict=False when storing a batch of entries and call evict() once after the batch, each eviction scans the
+        whole cache directory.
+        """
+        fid, tmpPath = tempfile.mkstemp(dir=self.cacheDir, suffix='.tmp')
+        try:
+            with os.fdopen(fid, 'wb') as fh:
+                np.save(fh, np.stack([np.asarray(cl, dtype=float), np.asarray(cd, dtype=float)]))
+            os.replace(tmpPath, self.path(key))  # atomic so readers never see a partially written entry
+        except BaseException:
+            self._remove(tmpPath)
+            raise
+        if evict:
+            self.evict()
+
+    ####################################################################################################################
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is below maxSizeBytes.
+        """
+        entries = []
+        totalSize = 0
+        for entry in os.scandir(self.cacheDir):
+            if not entry.name.endswith(self.suffix):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            totalSize += stat.st_size
+
+        for mtime, size, entryPath in sorted(entries):
+            if totalSize <= self.maxSizeBytes:
+                break
+            self._remove(entryPath)
+            totalSize -= size
+
+    ####################################################################################################################
+    def clear(self):
+        """
+        Remove every entry of the cache.
+        """
+        for entry in os.scandir(self.cacheDir):
+            if entry.name.endswith(self.suffix):
+                self._remove(entry.path)
+
+    ####################################################################################################################
+    @staticmethod
+    def _remove(entryPath):
+        try:
+            os.remove(entryPath)
+        except FileNotFoundError:
+            pass  # another process got there first
@@ -0,0 +1,189 @@
+"""
+Local SQLite database of airfoil polars.
+
+Instead of a path to a polar file per section, the geometry files can name the airfoil of each section and the polars
+are looked up in a PolarDatabase with a single indexed query. The polars are imported in bulk from C81 and Xfoil files
+through the same readers used by generateC81BETJSON and generateXfoilBETJSON, so the database holds them as the
+translators use them: completed with the flat plate values to +-180 deg.
+
+Each row of the database is the polar of one airfoil at one Mach and Reynolds number, indexed by (name, mach, reynolds).
+The C81 polars have no Reynolds number, it is stored as NULL.
+
+EXAMPLE useage:
+
+    database = PolarDatabase('airfoils.sqlite')
+    database.importFiles(glob.glob('polars/c81/*.csv'), 'c81')  # airfoils named after the files
+    database.importXfoil('NACA0012', ['naca0012M0.dat', 'naca0012M3.dat'])
+    betDisk = generateC81BETJSON('geometry.csv', betDiskParams, polarDatabase=database)
+
+with the geometry file naming the airfoils:
+
+    #Radial station Sectional Radius (grid Units), airfoil name
+    13.5, Xv15_c81_section1Polars
+    ...
+"""
+
+import os
+import sqlite3
+
+import numpy as np
+
+from .BETTranslatorInterface import readInC81Polar, readPolarFiles, readXfoilPolarRuns, xfoilRunPolar
+
+
+########################################################################################################################
+class PolarDatabase:
+    """
+    SQLite backed store of airfoil polars.
+
+    Attributes
+    ----------
+    databaseFile: string, path to the SQLite file. It is created if it does not exist.
+    """
+
+    def __init__(self, databaseFile):
+        self.databaseFile = databaseFile
+        self.connection = sqlite3.connect(databaseFile, check_same_thread=False)
+        with self.connection:
+            self.connection.execute('CREATE TABLE IF NOT EXISTS polars (name TEXT NOT NULL, mach REAL NOT NULL, '
+                                    'reynolds REAL, format TEXT NOT NULL, source TEXT, alphas BLOB NOT NULL, '
+                                    'cl BLOB NOT NULL, cd BLOB NOT NULL)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS polarsIndex ON polars (name, mach, reynolds)')
+
+    ####################################################################################################################
+    def close(self):
+        self.connection.close()
+
+    ####################################################################################################################
+    def insertRows(self, name, polarFormat, source, runs):
+        """
+        Replace the polars of airfoil name by runs, a list of (alphas, mach, reynolds, cl, cd).
+        Must be called inside a transaction.
+        """
+        self.connection.execute('DELETE FROM polars WHERE name = ?', (name,))
+        self.connection.executemany(
+            'INSERT INTO polars (name, mach, reynolds, format, source, alphas, cl, cd) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [(name, float(mach), reynolds, polarFormat, source, np.asarray(alphas, dtype=float).tobytes(),
+              np.asarray(cl, dtype=float).tobytes(), np.asarray(cd, dtype=float).tobytes())
+             for alphas, mach, reynolds, cl, cd in runs])
+
+    ####################################################################################################################
+    @staticmethod
+    def readC81Runs(polarFile):
+        alphas, machs, clValues, cdValues = readInC81Polar(polarFile)
+        return [(alphas, mach, None, clValues[mach], cdValues[mach]) for mach in machs]
+
+    ####################################################################################################################
+    @staticmethod
+    def readXfoilRuns(polarFile):
+        runs = []
+        for table in readXfoilPolarRuns(polarFile):
+            alphas, mach, cl, cd = xfoilRunPolar(polarFile, table)
+            runs.append((alphas, mach, table['reynolds'], cl, cd))
+        return runs
+
+    ####################################################################################################################
+    def importC81(self, name, polarFile):
+        """
+        Import the polars of a C81 file (csv or c81 format) under the airfoil name.
+        """
+        with self.connection:
+            self.insertRows(name, 'c81', os.path.abspath(polarFile), self.readC81Runs(polarFile))
+
+    ####################################################################################################################
+    def importXfoil(self, name, polarFiles):
+        """
+        Import the polars of a list of Xfoil files (one per Mach or accumulation files) under the airfoil name.
+        """
+        runs = [run for polarFile in polarFiles for run in self.readXfoilRuns(polarFile)]
+        with self.connection:
+            self.insertRows(name, 'xfoil', ';'.join(os.path.abspath(polarFile) for polarFile in polarFiles), runs)
+
+    ####################################################################################################################
+    def importFiles(self, polarFiles, polarFormat, names=None, maxWorkers=None):
+        """
+        Bulk import of polar files, one airfoil per file. The files are read concurrently with readPolarFiles and
+        written in a single transaction.
+
+        Attributes
+        ----------
+        polarFiles: list of polar files
+        polarFormat: c81 or xfoil
+        names: list of the airfoil names, by default the file names without their extension
+        maxWorkers: maximum number of files read at the same time
+        return: list of the imported airfoil names
+        """
+        readers = {'c81': self.readC81Runs, 'xfoil': self.readXfoilRuns}
+        if polarFormat not in readers:
+            raise ValueError(f'unknown polar format {polarFormat}, it must be c81 or xfoil')
+        if names is None:
+            names = [os.path.splitext(os.path.basename(polarFile))[0] for polarFile in polarFiles]
+        if len(names) != len(polarFiles):
+            raise ValueError(f'we have {len(names)} names for {len(polarFiles)} polar files')
+
+        allRuns = readPolarFiles(polarFiles, readers[polarFormat], polarFormat, maxWorkers)
+        with self.connection:
+            for name, polarFile, runs in zip(names, polarFiles, allRuns):
+                self.insertRows(name, polarFormat, os.path.abspath(polarFile), runs)
+        return names
+
+    ####################################################################################################################
+    def names(self):
+        return [row[0] for row in self.connection.execute('SELECT DISTINCT name FROM polars ORDER BY name')]
+
+    ####################################################################################################################
+    def lookup(self, names, reynolds=None):
+        """
+        Fetch the polars of all the given airfoils with a single indexed query.
+
+        Attributes
+        ----------
+        names: list of airfoil names
+        reynolds: float, only keep the polars at this Reynolds number. Needed if an airfoil has several Reynolds
+                  numbers for the same Mach.
+        return: dictionary with, for each name, the list of its (alphas, mach, cl, cd) sorted by Mach
+        """
+        uniqueNames = sorted(set(names))
+        query = f'SELECT name, mach, reynolds, alphas, cl, cd FROM polars WHERE name IN ' \
+                f'({", ".join("?" * len(uniqueNames))})'
+        parameters = list(uniqueNames)
+        if reynolds is not None:
+            query += ' AND reynolds = ?'
+            parameters.append(float(reynolds))
+        query += ' ORDER BY name, mach'
+
+        polars = {name: [] for name in uniqueNames}
+        for name, mach, rowReynolds, alphas, cl, cd in self.connection.execute(query, parameters):
+            if polars[name] and polars[name][-1][1] == mach:
+                raise ValueError(f'airfoil {name} has several polars for mach {mach} in {self.databaseFile}, '
+                                 f'choose one Reynolds number')
+            polars[name].append((np.frombuffer(alphas).tolist(), mach, np.frombuffer(cl).tolist(),
+                                 np.frombuffer(cd).tolist()))
+
+        missing = [name for name in uniqueNames if not polars[name]]
+        if missing:
+            raise ValueError(f'airfoils {missing} are not in the polar database {self.databaseFile}')
+        return polars
+
+    ####################################################################################################################
+    def c81Polars(self, names, reynolds=None):
+        """
+        Polars of the given airfoils in the form returned by readInC81Polar, see assignC81Polars.
+        """
+        polars = self.lookup(names, reynolds)
+        c81Polars = []
+        for name in names:
+            runs = polars[name]
+            if any(run[0] != runs[0][0] for run in runs):
+                raise ValueError(f'the polars of airfoil {name} do not use the same alphas for all the machs')
+            machs = [run[1] for run in runs]
+            c81Polars.append((runs[0][0], machs, {run[1]: run[2] for run in runs}, {run[1]: run[3] for run in runs}))
+        return c81Polars
+
+    ####################################################################################################################
+    def xfoilSectionRuns(self, sectionNames, reynolds=None):
+        """
+        Polars of the airfoils named in each section in the form used by assignXfoilPolars.
+        """
+        polars = self.lookup([name for names in sectionNames for name in names], reynolds)
+        return [[run for name in names for run in polars[name]] for names in sectionNames]
@@ -0,0 +1,93 @@
+"""
+Decimation of the polar tables of a BET disk.
+
+The sectionalPolars block is most of the size of a Flow360 JSON with BET disks. The translators sample the polars on
+fine alpha grids, much finer than needed where the polars are close to linear. decimateBETDisk drops the alphas where
+piecewise linear interpolation through the remaining ones reproduces all the CL and CD values within a tolerance. All
+the sections, Mach and Reynolds numbers of a disk keep sharing the same list of alphas, as Flow360 requires.
+
+EXAMPLE useage:
+
+    betDisk = generateC81BETJSON(geometryFileName, betDiskParams)
+    betDisk, report = decimateBETDisk(betDisk, tolerance=1e-3)
+    print(f'{report["numAlphas"]} -> {report["numDecimatedAlphas"]} alphas, max CL error {report["maxClError"]}')
+"""
+
+import json
+
+import numpy as np
+
+from .BETTranslatorInterface import selectGridPoints
+
+
+########################################################################################################################
+def polarArrays(betDisk):
+    """
+    Return the CL and CD tables of a BET disk as arrays of shape (nSections, nMachs, nReynolds, nAlphas).
+    Raises a ValueError if they have NaN or infinite values, e.g. the XXXXXXX placeholders of a c81 file.
+    """
+    cl = np.array([section['liftCoeffs'] for section in betDisk['sectionalPolars']], dtype=float)
+    cd = np.array([section['dragCoeffs'] for section in betDisk['sectionalPolars']], dtype=float)
+    if cl.ndim != 4 or cl.shape != cd.shape or cl.shape[-1] != len(betDisk['alphas']):
+        raise ValueError(f'the liftCoeffs and dragCoeffs of the BET disk must all have the shape '
+                         f'(Mach, Reynolds, alpha) with {len(betDisk["alphas"])} alphas')
+    badSections = np.flatnonzero(~(np.isfinite(cl) & np.isfinite(cd)).all(axis=(1, 2, 3)))
+    if len(badSections):
+        raise ValueError(f'the polars of sections {badSections.tolist()} of the BET disk have NaN or infinite values, '
+                         f'they can not be decimated')
+    return cl, cd
+
+
+########################################################################################################################
+def interpolationError(alphas, values, keptIdxs):
+    """
+    Maximum absolute error of the piecewise linear interpolation through the keptIdxs alphas of every curve of values.
+    """
+    alphas = np.asarray(alphas, dtype=float)
+    right = np.clip(np.searchsorted(keptIdxs, np.arange(len(alphas))), 1, len(keptIdxs) - 1)
+    idx0 = keptIdxs[right - 1]
+    idx1 = keptIdxs[right]
+    weight = (alphas - alphas[idx0]) / (alphas[idx1] - alphas[idx0])
+    interpolated = values[..., idx0] * (1 - weight) + values[..., idx1] * weight
+    return float(np.abs(interpolated - values).max()) if values.size else 0.0
+
+
+########################################################################################################################
+def decimateBETDisk(betDisk, tolerance, cdTolerance=None):
+    """
+    Drop the alphas of a BET disk that linear interpolation can do without.
+
+    Attributes
+    ----------
+    betDisk: BET disk dictionary as returned by the generate*BETJSON functions. It is not modified.
+    tolerance: float, maximum absolute CL error of the interpolation through the kept alphas
+    cdTolerance: float, maximum absolute CD error, the same as tolerance by default
+    return: decimated copy of the BET disk and a report dictionary with the number of alphas and the size of the
+            compact JSON of the disk before and after, and the worst CL and CD errors.
+    """
+    if cdTolerance is None:
+        cdTolerance = tolerance
+    if tolerance <= 0 or cdTolerance <= 0:
+        raise ValueError(f'the tolerances must be positive, we have {tolerance} and {cdTolerance}')
+
+    alphas = np.asarray(betDisk['alphas'], dtype=float)
+    if np.any(np.diff(alphas) <= 0):
+        raise ValueError('the alphas of the BET disk must be strictly increasing')
+    cl, cd = polarArrays(betDisk)
+
+    # scale the CDs so that both tolerances become the CL one and all the curves are checked at once
+    values = np.concatenate([cl.reshape(-1, len(alphas)), cd.reshape(-1, len(alphas)) * (tolerance / cdTolerance)])
+    keptIdxs = selectGridPoints(alphas, values, tolerance)
+
+    decimated = dict(betDisk)
+    decimated['alphas'] = alphas[keptIdxs].tolist()
+    decimated['sectionalPolars'] = [{'liftCoeffs': sectionCl.tolist(), 'dragCoeffs': sectionCd.tolist()}
+                                    for sectionCl, sectionCd in zip(cl[..., keptIdxs], cd[..., keptIdxs])]
+
+    report = {'numAlphas': len(alphas),
+              'numDecimatedAlphas': len(keptIdxs),
+              'size': len(json.dumps(betDisk, separators=(',', ':'))),
+              'decimatedSize': len(json.dumps(decimated, separators=(',', ':'))),
+              'maxClError': interpolationError(alphas, cl, keptIdxs),
+              'maxCdError': interpolationError(alphas, cd, keptIdxs)}
+    return decimated, report
@@ -0,0 +1,149 @@
+"""
+Binary sidecar cache for the C81 and Xfoil polar files.
+
+Every BET generation parses the same text polar files again, flat plate blending and interpolation included. The
+readers of this module keep the parsed and blended alpha/Mach/CL/CD arrays in an uncompressed .npz file next to each
+source file (e.g. Xv15_c81_section1Polars.csv.npz) and load it instead of parsing the text on the next runs.
+
+A sidecar is used as long as the source file keeps the modification time and size it had when the sidecar was written.
+If they changed, the source is hashed: the sidecar is still used if the content did not change (e.g. a fresh checkout),
+otherwise the source is parsed again and the sidecar rewritten. Sidecars that cannot be written, e.g. in a read only
+directory, are simply skipped.
+
+EXAMPLE useage:
+
+    betDisk = generateC81BETJSON(geometryFileName, betDiskParams, readPolar=readInC81PolarSidecar)
+    betDisk = generateXfoilBETJSON(geometryFileName, betDiskParams, readPolar=readInXfoilPolarsSidecar)
+"""
+
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from .BETTranslatorInterface import readInC81Polar, readInXfoilPolars
+from .utils import fileHash
+
+# bump this whenever the readers change the numbers they produce so that stale sidecars are not reused.
+SIDECAR_VERSION = 'polar-sidecar-v1'
+SIDECAR_SUFFIX = '.npz'
+
+
+########################################################################################################################
+def loadSidecar(polarFile, readerName):
+    """
+    Load the arrays of the sidecar of polarFile if it is still valid.
+
+    Returns
+    -------
+    dictionary of arrays or None if there is no valid sidecar, and the sha256 of polarFile if we had to compute it
+    """
+    stat = os.stat(polarFile)
+    try:
+        # opened here so the file is closed even when np.load fails on a corrupt sidecar
+        with open(polarFile + SIDECAR_SUFFIX, 'rb') as fh, np.load(fh, allow_pickle=False) as sidecar:
+            arrays = {key: sidecar[key] for key in sidecar.files}
+        version, reader = str(arrays['version']), str(arrays['reader'])
+        mtime, size, sha256 = int(arrays['mtime']), int(arrays['size']), str(arrays['sha256'])
+    except (OSError, ValueError, EOFError, zipfile.BadZipFile, KeyError):
+        return None, None  # missing or corrupt (empty, truncated, ...), it is written again
+
+    if version != SIDECAR_VERSION or reader != readerName:
+        return None, None
+    if mtime == stat.st_mtime_ns and size == stat.st_size:
+        return arrays, None
+    digest = fileHash(polarFile)  # touched or copied, check if the content changed
+    return (arrays if sha256 == digest else None), digest
+
+
+########################################################################################################################
+def saveSidecar(polarFile, readerName, arrays, digest=None):
+    """
+    Write the arrays parsed from polarFile to its sidecar along with what we need to check it is still valid.
+    """
+    stat = os.stat(polarFile)
+    metadata = {'version': np.array(SIDECAR_VERSION), 'reader': np.array(readerName),
+                'mtime': np.array(stat.st_mtime_ns), 'size': np.array(stat.st_size),
+                'sha256': np.array(digest or fileHash(polarFile))}
+    sidecarDir = os.path.dirname(os.path.abspath(polarFile))
+    try:
+        fid, tmpPath = tempfile.mkstemp(dir=sidecarDir, suffix=SIDECAR_SUFFIX + '.tmp')
+    except OSError:
+        return  # we can not write next to the source file, run without sidecar
+    try:
+        with os.fdopen(fid, 'wb') as fh:
+            np.savez(fh, **metadata, **arrays)
+        os.replace(tmpPath, polarFile + SIDECAR_SUFFIX)  # atomic so readers never see a partially written sidecar
+    except BaseException:
+        os.remove(tmpPath)
+        raise
+
+
+########################################################################################################################
+def readWithSidecar(polarFile, reader, toArrays, fromArrays):
+    """
+    Return reader(polarFile), loading it from the sidecar of polarFile when it is valid.
+
+    Attributes
+    ----------
+    polarFile: string, path to the polar file
+    reader: function parsing polarFile
+    toArrays: function converting what reader returns into a dictionary of arrays
+    fromArrays: function converting that dictionary of arrays back into what reader returns
+    """
+    readerName = reader.__name__
+    arrays, digest = loadSidecar(polarFile, readerName)
+    if arrays is not None:
+        if digest is not None:  # same content with a new modification time, refresh the sidecar
+            saveSidecar(polarFile, readerName, {key: arrays[key] for key in ['alphas', 'machs', 'cl', 'cd']}, digest)
+        return fromArrays(arrays)
+
+    result = reader(polarFile)
+    saveSidecar(polarFile, readerName, toArrays(result), digest)
+    return result
+
+
+########################################################################################################################
+def readInC81PolarSidecar(polarFile):
+    """
+    Same as readInC81Polar, going through the sidecar of polarFile.
+
+    Returns
+    -------
+    4 lists of floats: clAlphas, clMachNums, clValues, cdValues
+    """
+    def toArrays(result):
+        alphas, machs, clValues, cdValues = result
+        return {'alphas': np.array(alphas, dtype=float), 'machs': np.array(machs, dtype=float),
+                'cl': np.array([clValues[mach] for mach in machs], dtype=float),
+                'cd': np.array([cdValues[mach] for mach in machs], dtype=float)}
+
+    def fromArrays(arrays):
+        machs = arrays['machs'].tolist()
+        return arrays['alphas'].tolist(), machs, dict(zip(machs, arrays['cl'].tolist())), \
+            dict(zip(machs, arrays['cd'].tolist()))
+
+    return readWithSidecar(polarFile, readInC81Polar, toArrays, fromArrays)
+
+
+########################################################################################################################
+def readInXfoilPolarsSidecar(polarFile):
+    """
+    Same as readInXfoilPolars, going through the sidecar of polarFile.
+
+    Returns
+    -------
+    list of (alphaList, machNum, clList, cdList), one per run
+    """
+    def toArrays(runs):
+        return {'alphas': np.array([run[0] for run in runs], dtype=float),
+                'machs': np.array([run[1] for run in runs], dtype=float),
+                'cl': np.array([run[2] for run in runs], dtype=float),
+                'cd': np.array([run[3] for run in runs], dtype=float)}
+
+    def fromArrays(arrays):
+        return list(zip(arrays['alphas'].tolist(), arrays['machs'].tolist(), arrays['cl'].tolist(),
+                        arrays['cd'].tolist()))
+
+    return readWithSidecar(polarFile, readInXfoilPolars, toArrays, fromArrays)
@@ -0,0 +1,264 @@
+"""
+Streaming reader for the XROTOR and DFDC rotor definition files.
+
+Both file formats are described by a declarative layout: a list of steps telling the reader what each line holds.
+The file is read in a single buffered pass, line numbers are tracked for the error messages and the repeated blocks
+(aero sections, geometry stations) are written directly into preallocated arrays.
+
+Layout steps
+------------
+('skip', n): skip n lines.
+('seek', keyword): skip lines until the line containing only keyword (e.g. AERO, ROTOR).
+('comment', numelts): a line that is either empty, a comment starting with '!' or has numelts items.
+('values', numelts, fields): a line of numelts values (None to not check the count). fields is a list of
+    (key, index, type) telling which value goes where in the output dictionary. index can be a slice, type then
+    converts the list of values, e.g. floats.
+('repeat', countKey, steps): repeat steps output[countKey] times. The values read inside the repeat are stored in
+    arrays of that length.
+"""
+
+import numpy as np
+
+
+########################################################################################################################
+def floats(values):
+    return [float(value) for value in values]
+
+
+########################################################################################################################
+# Layout of an XROTOR file after the top line with the XROTOR keyword.
+XROTOR_LAYOUT = [
+    ('skip', 1),
+    ('comment', 5),  # Rho Vso Rmu Alt
+    ('values', 4, []),
+    ('comment', 5),  # Rad Vel Adv Rake
+    ('values', 4, [('rad', 0, float), ('vel', 1, float), ('adv', 2, float)]),
+    ('skip', 2),  # XI0 XIW
+    ('comment', 2),  # Naero
+    ('values', 1, [('nAeroSections', 0, int)]),
+    ('repeat', 'nAeroSections', [
+        ('comment', 2),  # Xisection
+        ('values', 1, [('rRstations', 0, float)]),
+        ('comment', 5),  # A0deg dCLdA CLmax CLmin
+        ('values', 4, [('a0deg', 0, float), ('dclda', 1, float), ('clmax', 2, float), ('clmin', 3, float)]),
+        ('comment', 5),  # dCLdAstall dCLstall Cmconst Mcrit
+        ('values', 4, [('dcldastall', 0, float), ('dclstall', 1, float), ('mcrit', 3, float)]),
+        ('comment', 4),  # CDmin CLCDmin dCDdCL^2
+        ('values', 3, [('cdmin', 0, float), ('clcdmin', 1, float), ('dcddcl2', 2, float)]),
+        ('comment', 3),  # REref REexp
+        ('values', None, []),
+    ]),
+    ('skip', 2),  # duct information
+    ('comment', 3),  # II Nblds
+    ('values', 2, [('nGeomStations', 0, int), ('nBlades', 1, int)]),
+    ('comment', 5),  # r/R C/R Beta0deg Ubody
+    ('repeat', 'nGeomStations', [
+        ('values', 4, [('rRGeom', 0, float), ('cRGeom', 1, float), ('beta0Deg', 2, float)]),
+    ]),
+]
+
+# Layout of the OPER block at the top of a DFDC file, after the top line with the DFDC keyword.
+DFDC_OPER_LAYOUT = [
+    ('skip', 3),  # case name, blank line and OPER
+    ('comment', 4),  # Vinf Vref RPM1 RPM2 ...
+    ('values', None, [('vel', 1, float), ('RPMs', slice(2, None), floats)]),  # one RPM per disk
+    ('comment', 5),  # Rho Vso Rmu Alt
+    ('values', 4, [('rho', 0, float)]),
+]
+
+# Layout of one AERO and ROTOR block pair of a DFDC file, there is one pair per disk.
+DFDC_ROTOR_LAYOUT = [
+    ('seek', 'AERO'),
+    ('comment', 2),  # #sections
+    ('values', 1, [('nAeroSections', 0, int)]),
+    ('comment', 2),  # Xisection, only given for the first section
+    ('repeat', 'nAeroSections', [
+        ('values', 1, [('rRstations', 0, float)]),
+        ('comment', 5),  # A0deg dCLdA CLmax CLmin
+        ('values', 4, [('a0deg', 0, float), ('dclda', 1, float), ('clmax', 2, float), ('clmin', 3, float)]),
+        ('comment', 5),  # dCLdAstall dCLstall Cmconst Mcrit
+        ('values', 4, [('dcldastall', 0, float), ('dclstall', 1, float), ('mcrit', 3, float)]),
+        ('comment', 4),  # CDmin CLCDmin dCDdCL^2
+        ('values', 3, [('cdmin', 0, float), ('clcdmin', 1, float), ('dcddcl2', 2, float)]),
+        ('skip', 2),  # REref REexp
+    ]),
+    ('seek', 'ROTOR'),
+    ('comment', 3),  # Xdisk Nblds NRsta
+    ('values', 3, [('nBlades', 1, int)]),
+    ('comment', 2),  # #stations
+    ('values', 1, [('nGeomStations', 0, int)]),
+    ('comment', 4),  # r C Beta0deg
+    ('repeat', 'nGeomStations', [
+        ('values', 3, [('rRGeom', 0, float), ('cRGeom', 1, float), ('beta0Deg', 2, float)]),
+    ]),
+]
+
+
+########################################################################################################################
+class RotorFileStream:
+    """
+    Line by line reader of an open rotor definition file keeping track of the line number for the error messages.
+
+    Attributes
+    ----------
+    fid: open text file
+    fileName: string, only used in the error messages
+    """
+
+    def __init__(self, fid, fileName):
+        self.fid = fid
+        self.fileName = fileName
+        self.linenum = 0
+
+    ####################################################################################################################
+    def error(self, message):
+        raise ValueError(f'{self.fileName}: {message}')
+
+    ####################################################################################################################
+    def readline(self):
+        self.linenum += 1
+        return self.fid.readline()
+
+    ####################################################################################################################
+    def skip(self, numLines):
+        for i in range(numLines):
+            self.readline()
+
+    ####################################################################################################################
+    def seek(self, keyword, required=True):
+        """
+        Skip lines until the line containing only keyword. Returns False if we reach the end of the file first and
+        keyword is not required.
+        """
+        while True:
+            line = self.readline()
+            if not line:
+                if required:
+                    self.error(f'reached the end of the file while looking for the {keyword} block')
+                return False
+            if line.strip().upper() == keyword:
+                return True
+
+    ####################################################################################################################
+    def comment(self, numelts):
+        """
+        Read a line that should be a comment, i.e. an empty line, a line starting with ! or a line with numelts items.
+        """
+        comment_line = self.readline().upper().split()
+        if comment_line and comment_line[0] != '!' and len(comment_line) != numelts:
+            self.error(f'wrong format for line #{self.linenum}: {comment_line}')
+
+    ####################################################################################################################
+    def values(self, numelts):
+        """
+        Read a line of values and check we have numelts of them, None means any number of values.
+        """
+        values_list = self.readline().split()
+        if numelts is not None and len(values_list) != numelts:
+            self.error(f'wrong number of items for line #{self.linenum}: {values_list}. '
+                       f'We were expecting {numelts} numbers and got {len(values_list)}')
+        return values_list
+
+
+########################################################################################################################
+def parseLayout(stream, layout, output, rowIdx=None):
+    """
+    Read the lines described by layout from stream and store the values in the output dictionary.
+
+    Attributes
+    ----------
+    stream: RotorFileStream
+    layout: list of layout steps as described in this module's docstring
+    output: dictionary the values are stored in
+    rowIdx: int, row of the preallocated arrays we fill when we are inside a repeat step
+    return: output
+    """
+    for step in layout:
+        kind = step[0]
+        if kind == 'skip':
+            stream.skip(step[1])
+        elif kind == 'seek':
+            stream.seek(step[1])
+        elif kind == 'comment':
+            stream.comment(step[1])
+        elif kind == 'values':
+            values = stream.values(step[1])
+            for key, index, valueType in step[2]:
+                try:
+                    value = valueType(values[index])
+                except (IndexError, ValueError):
+                    stream.error(f'could not read {key} from line #{stream.linenum}: {values}')
+                if rowIdx is None:
+                    output[key] = value
+                else:
+                    output[key][rowIdx] = value
+        elif kind == 'repeat':
+            count = output[step[1]]
+            if count < 0:
+                stream.error(f'invalid number of {step[1]}: {count}')
+            for key in layoutKeys(step[2]):
+                output[key] = np.empty(count)  # preallocate the arrays filled by the repeated lines
+            for i in range(count):
+                parseLayout(stream, step[2], output, i)
+        else:
+            raise ValueError(f'unknown layout step: {step}')
+    return output
+
+
+########################################################################################################################
+def layoutKeys(layout):
+    """
+    Return the list of output keys written by the values steps of a layout.
+    """
+    keys = []
+    for step in layout:
+        if step[0] == 'values':
+            keys += [key for key, index, valueType in step[2]]
+        elif step[0] == 'repeat':
+            keys += layoutKeys(step[2])
+    return keys
+
+
+########################################################################################################################
+def arraysToLists(output):
+    """
+    Convert the arrays filled by the repeat steps into lists of floats, which is what the BET translator expects.
+    """
+    for key, value in output.items():
+        if isinstance(value, np.ndarray):
+            output[key] = value.tolist()
+    return output
+
+
+########################################################################################################################
+def readXROTORLayout(fid, fileName):
+    """
+    Read an XROTOR file whose top line has already been read.
+    return: dictionary with the values described in XROTOR_LAYOUT
+    """
+    stream = RotorFileStream(fid, fileName)
+    stream.linenum = 1
+    return arraysToLists(parseLayout(stream, XROTOR_LAYOUT, {}))
+
+
+########################################################################################################################
+def readDFDCLayout(fid, fileName):
+    """
+    Read a DFDC file whose top line has already been read. A DFDC case can define several disks, each with its own
+    AERO and ROTOR blocks.
+    return: list of dictionaries, one per disk, with the values described in DFDC_OPER_LAYOUT and DFDC_ROTOR_LAYOUT.
+            The RPM of disk i is the RPMi+1 of the OPER block.
+    """
+    stream = RotorFileStream(fid, fileName)
+    stream.linenum = 1
+    operDict = parseLayout(stream, DFDC_OPER_LAYOUT, {})
+    rpms = operDict.pop('RPMs')
+
+    rotors = [arraysToLists(parseLayout(stream, DFDC_ROTOR_LAYOUT, dict(operDict)))]
+    while stream.seek('AERO', required=False):  # AERO block of the next disk, if any.
+        rotors.append(arraysToLists(parseLayout(stream, DFDC_ROTOR_LAYOUT[1:], dict(operDict))))
+    if len(rpms) < len(rotors):
+        stream.error(f'the OPER block gives {len(rpms)} RPM(s) for {len(rotors)} disk(s), we need one RPM per disk')
+    for rotor, rpm in zip(rotors, rpms):
+        rotor['RPM'] = rpm
+    return rotors
@@ -0,0 +1,110 @@
+"""
+Parametric sweeps of a BET disk over operating points.
+
+For design studies many Flow360 BET JSON files are made from the same blade where only the operating point or the
+disk placement changes (omega, centerOfRotation, axisOfRotation, thickness, a global twist offset...). The sectional
+polars are the expensive and large part of a BET disk and they do not depend on any of those, so we translate the blade
+once and stamp out every variant from it. All the variants share the same polar lists and each one is streamed to its
+own file, so memory stays at one set of polars however many variants we write.
+
+EXAMPLE useage:
+
+    betDisk = generateXrotorBETJSON(xrotorFileName, betDiskParams)
+    variants = [{'omega': omega, 'twistOffset': offset} for omega in [0.004, 0.0046] for offset in [-2, 0, 2]]
+    outputFiles = writeBETDiskSweep(betDisk, variants, 'sweep_{idx}.json', template=flow360Dict)
+"""
+
+import os
+
+from .flow360JSONWriter import writeFlow360JSON
+
+# keys that define the polars of the disk, a sweep can not change them without translating the blade again.
+POLAR_KEYS = ['alphas', 'MachNumbers', 'ReynoldsNumbers', 'sectionalPolars', 'sectionalRadiuses']
+
+
+########################################################################################################################
+def betDiskVariant(baseBetDisk, variant):
+    """
+    Make a variant of a BET disk dictionary. The variant is a shallow copy of baseBetDisk so it shares its polars.
+
+    Attributes
+    ----------
+    baseBetDisk: BET disk dictionary as returned by the generate*BETJSON functions
+    variant: dictionary of the BET disk values to change, e.g. omega, centerOfRotation, axisOfRotation, thickness.
+             The special twistOffset key adds that many degrees to all the twists of the blade. idx is reserved for
+             the index of the variant in the file names of writeBETDiskSweep.
+    return: BET disk dictionary
+    """
+    polarKeys = [key for key in POLAR_KEYS if key in variant]
+    if polarKeys:
+        raise ValueError(f'a sweep variant can not change the polars of the disk, found {polarKeys} in {variant}')
+    if 'idx' in variant:
+        raise ValueError(f'idx is the index of the variant in the sweep file names, it can not be a key of {variant}')
+
+    betDisk = dict(baseBetDisk)
+    for key, value in variant.items():
+        if key == 'twistOffset':
+            betDisk['twists'] = [{'radius': twist['radius'], 'twist': twist['twist'] + value}
+                                 for twist in baseBetDisk['twists']]
+        else:
+            betDisk[key] = value
+
+    if betDisk.get('rotationDirectionRule', 'rightHand') not in ['rightHand', 'leftHand']:
+        raise ValueError(f'Invalid rotationDirectionRule: {betDisk["rotationDirectionRule"]}')
+    for key in ['axisOfRotation', 'centerOfRotation']:
+        if key in betDisk and len(betDisk[key]) != 3:
+            raise ValueError(f'{key} must be a list of size 3, it is {betDisk[key]} in variant {variant}')
+
+    return betDisk
+
+
+########################################################################################################################
+def betDiskVariants(baseBetDisk, variants):
+    """
+    Generator of the variants of a BET disk, see betDiskVariant.
+
+    Attributes
+    ----------
+    baseBetDisk: BET disk dictionary as returned by the generate*BETJSON functions
+    variants: iterable of dictionaries of the BET disk values to change
+    return: generator of BET disk dictionaries
+    """
+    for variant in variants:
+        yield betDiskVariant(baseBetDisk, variant)
+
+
+########################################################################################################################
+def writeBETDiskSweep(baseBetDisk, variants, outputPattern, template=None, indent=4, significantDigits=None):
+    """
+    Write one Flow360 JSON file per variant of a BET disk. Each file is streamed to disk before the next variant is
+    made.
+
+    Attributes
+    ----------
+    baseBetDisk: BET disk dictionary as returned by the generate*BETJSON functions
+    variants: iterable of dictionaries of the BET disk values to change, see betDiskVariant
+    outputPattern: string, file name of each variant. It is formatted with the variant index as idx and the scalar
+                   values of the variant, e.g. 'sweep_{idx}.json' or 'omega_{omega}.json'. List values such as
+                   centerOfRotation can not be used in the file names.
+    template: optional Flow360 input dictionary the BET disk is added to, otherwise the file only holds the BETDisks
+    indent: int, indentation of the JSON files, None for the most compact files.
+    significantDigits: int, number of significant digits of the floats written, all of them by default.
+    return: list of the files written
+    """
+    outputFiles = []
+    for idx, variant in enumerate(variants):
+        flow360Dict = dict(template) if template is not None else {}
+        flow360Dict['BETDisks'] = [betDiskVariant(baseBetDisk, variant)]
+
+        scalars = {key: value for key, value in variant.items() if isinstance(value, (int, float, str))}
+        try:
+            outputFile = outputPattern.format(idx=idx, **scalars)
+        except KeyError as error:
+            raise ValueError(f'the output pattern {outputPattern} uses {error}, only idx and the scalar values of the '
+                             f'variant {variant} can be used in the file names') from None
+        outputDir = os.path.dirname(os.path.abspath(outputFile))
+        os.makedirs(outputDir, exist_ok=True)
+        writeFlow360JSON(outputFile, flow360Dict, indent, significantDigits)
+        outputFiles.append(outputFile)
+
+    return outputFiles
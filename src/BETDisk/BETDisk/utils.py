@@ -1,4 +1,5 @@
 from math import *
+import hashlib
 import operator
 
 class array(list):
@@ -62,4 +63,14 @@ def logList(a):
     return opList(a, log)
 
 def absList(a):
-    return opList(a, abs)
\ No newline at end of file
+    return opList(a, abs)
+
+def fileHash(fileName):
+    '''
+    sha256 of the content of fileName, read in chunks so large files are not loaded at once.
+    '''
+    sha = hashlib.sha256()
+    with open(fileName, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1024 ** 2), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
@@ -0,0 +1,77 @@
+import os, sys
+import copy
+import json
+import tempfile
+
+import numpy as np
+import unittest
+import utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.BETDisk.BETDisk.BETTranslatorInterface as interface
+from src.BETDisk.BETDisk.betDiskModel import BETDisk
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    def test_betdisk_model(self):
+
+        betDiskAdditionalInfo = {"meshUnit": 1,
+                                 "centerOfRotation": [0, 0, 0],
+                                 "rotationDirectionRule": "leftHand",
+                                 "axisOfRotation": [0, 0, 1],
+                                 "omega": 0.0046,
+                                 "thickness": 15,
+                                 "chordRef": 14,
+                                 "nLoadingNodes": 20}
+
+        inputFile = os.path.join(here, 'data/xv15_like_twist0.xrotor')
+        betDisk = interface.generateXrotorBETJSON(inputFile, dict(betDiskAdditionalInfo), asModel=True)
+        self.assertIsInstance(betDisk, BETDisk)
+        self.assertFalse(hasattr(betDisk, '__dict__'))
+
+        with open(os.path.join(here, 'ref/xrotorTest.json')) as fh:
+            refbetFlow360 = json.load(fh)
+        utils.assertDeepAlmostEqual(self, betDisk.toDict(), refbetFlow360, places=14)
+        self.assertEqual(list(betDisk.toDict()), list(refbetFlow360))
+
+        # same disk whether it is built from the arrays or from the dictionary
+        betDiskDict = interface.generateXrotorBETJSON(inputFile, dict(betDiskAdditionalInfo))
+        utils.assertDeepAlmostEqual(self, BETDisk.fromDict(betDiskDict).toDict(), betDisk.toDict(), places=14)
+
+        # the sections are views into the polar table
+        section = betDisk.sections[2]
+        self.assertEqual(section.radius, refbetFlow360['sectionalRadiuses'][2])
+        section.liftCoeffs[0, 0, 0] = 0.5
+        self.assertEqual(betDisk.polars.liftCoeffs[2, 0, 0, 0], 0.5)
+
+        # vectorized geometry changes
+        twistedDisk = copy.deepcopy(betDisk)
+        twistedDisk.twists += 2
+        for twist, refTwist in zip(twistedDisk.toDict()['twists'], refbetFlow360['twists']):
+            self.assertAlmostEqual(twist['twist'], refTwist['twist'] + 2, places=12)
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            outputFile = os.path.join(tmpDir, 'betDisk.json')
+            betDisk.toJSON(outputFile)
+            with open(outputFile) as fh:
+                utils.assertDeepAlmostEqual(self, json.load(fh), betDisk.toDict(), places=14)
+
+        c81Info = {key: value for key, value in betDiskAdditionalInfo.items() if key != 'meshUnit'}
+        c81Disk = interface.generateC81BETJSON(os.path.join(here, 'data/c81/Xv15_geometry.csv'), c81Info,
+                                               asModel=True)
+        self.assertEqual(c81Disk.polars.liftCoeffs.shape,
+                         (5, len(c81Disk.polars.machs), 1, len(c81Disk.polars.alphas)))
+
+        # entries without a slot are kept as they are
+        bladeLineDisk = dict(refbetFlow360, initialBladeDirection=[1, 0, 0])
+        self.assertEqual(BETDisk.fromDict(bladeLineDisk).toDict()['initialBladeDirection'], [1, 0, 0])
+
+        with self.assertRaises(ValueError):
+            BETDisk.fromDict(dict(refbetFlow360, sectionalRadiuses=refbetFlow360['sectionalRadiuses'][1:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
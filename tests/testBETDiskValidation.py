@@ -0,0 +1,55 @@
+import os, sys
+import copy
+import json
+
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.BETDisk.BETDisk.betDiskModel import BETDisk
+from src.BETDisk.BETDisk.betDiskValidation import validateBETDisk, validateFlow360JSON, checkBETDisk
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    def test_betdisk_validation(self):
+
+        betDisks = []
+        for refFile in ['xrotorTest.json', 'c81Test.json', 'xfoilTest.json']:
+            with open(os.path.join(here, 'ref', refFile)) as fh:
+                betDisks.append(json.load(fh))
+        self.assertEqual(validateFlow360JSON({'BETDisks': betDisks}), [])
+        self.assertEqual(validateBETDisk(BETDisk.fromDict(betDisks[0])), [])
+
+        # every problem is reported at once
+        badDisk = copy.deepcopy(betDisks[0])
+        badDisk['rotationDirectionRule'] = 'clockwise'
+        badDisk['alphas'][10], badDisk['alphas'][11] = badDisk['alphas'][11], badDisk['alphas'][10]
+        badDisk['sectionalRadiuses'][1] = badDisk['sectionalRadiuses'][0]
+        badDisk['chords'] = badDisk['chords'][:-1]
+        badDisk['sectionalPolars'][3]['liftCoeffs'][1][0][5] = float('nan')
+        badDisk['sectionalPolars'][4]['dragCoeffs'] = badDisk['sectionalPolars'][4]['dragCoeffs'][1:]
+        problems = validateFlow360JSON({'BETDisks': [betDisks[1], badDisk]})
+        self.assertEqual(len(problems), 6)
+        self.assertTrue(all(problem.startswith('BETDisks[1]: ') for problem in problems))
+        for expected in ['rotationDirectionRule', 'alphas must be strictly increasing, it is not after indices [10]',
+                         'sectionalRadiuses must be strictly increasing, it is not after indices [0]',
+                         'chords cover the radii', 'liftCoeffs of sections [3] have NaN',
+                         'dragCoeffs of section 4 must be a (Mach, Reynolds, alpha) table of shape (4, 1, 387)']:
+            self.assertTrue(any(expected in problem for problem in problems), expected)
+
+        with self.assertRaises(ValueError):
+            checkBETDisk(badDisk)
+        self.assertEqual(validateBETDisk({'alphas': [0, 1]})[0][:24], 'missing BET disk entries')
+
+        # empty or missing polars are reported, not crashed on
+        for sectionalPolars in [[], None, {}, [{'liftCoeffs': [], 'dragCoeffs': []}]]:
+            badDisk = dict(betDisks[0], sectionalPolars=sectionalPolars)
+            problems = validateBETDisk(badDisk)
+            self.assertTrue(any('sectionalPolars' in problem or 'liftCoeffs' in problem for problem in problems),
+                            (sectionalPolars, problems))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os, sys
+import json
+import tempfile
+
+import unittest
+import utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.BETDisk.BETDisk import batchTranslate
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    def writeManifest(self, tmpDir):
+        xrotorBetDisk = {"meshUnit": 1,
+                         "centerOfRotation": [0, 0, 0],
+                         "rotationDirectionRule": "leftHand",
+                         "axisOfRotation": [0, 0, 1],
+                         "omega": 0.0046,
+                         "thickness": 15,
+                         "chordRef": 14,
+                         "nLoadingNodes": 20}
+        c81BetDisk = {"centerOfRotation": [0, 0, 0],
+                      "rotationDirectionRule": "leftHand",
+                      "axisOfRotation": [0, 0, 1],
+                      "thickness": 15,
+                      "chordRef": 14,
+                      "nLoadingNodes": 20,
+                      "omega": 0.0046,
+                      "numberOfBlades": 3}
+        manifest = {"disks": [
+            {"type": "xrotor", "input": os.path.join(here, 'data/xv15_like_twist0.xrotor'), "betDisk": xrotorBetDisk,
+             "output": "xrotor.json"},
+            {"type": "xrotor", "input": os.path.join(here, 'data/missing.xrotor'), "betDisk": xrotorBetDisk},
+            {"type": "dfdc", "input": os.path.join(here, 'data/dfdc_xv15_twist0.case'), "betDisk": xrotorBetDisk,
+             "output": "dfdc.json"},
+            {"type": "c81", "input": os.path.join(here, 'data/c81/Xv15_geometry.csv'), "betDisk": c81BetDisk,
+             "output": "c81.json"}]}
+        manifestFile = os.path.join(tmpDir, 'manifest.json')
+        with open(manifestFile, 'w') as fh:
+            json.dump(manifest, fh)
+        return manifestFile
+
+    def loadRefs(self):
+        refs = []
+        for refFile in ['xrotorTest.json', 'dfdcTest.json', 'c81Test.json']:
+            with open(os.path.join(here, 'ref', refFile)) as fh:
+                refs.append(json.load(fh))
+        return refs
+
+    def test_batch_translate_merged(self):
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            manifestFile = self.writeManifest(tmpDir)
+            outputFile = os.path.join(tmpDir, 'merged.json')
+            exitCode = batchTranslate.main(['translate', '-i', manifestFile, '--jobs', '2', '-o', outputFile])
+            self.assertEqual(exitCode, 1)  # the missing file is reported but the other disks are written
+
+            with open(outputFile) as fh:
+                flow360Dict = json.load(fh)
+            utils.assertDeepAlmostEqual(self, flow360Dict['BETDisks'], self.loadRefs(), places=14)
+
+    def test_batch_translate_one_file_per_disk(self):
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            manifestFile = self.writeManifest(tmpDir)
+            outputDir = os.path.join(tmpDir, 'translated')
+            batchTranslate.main(['translate', '-i', manifestFile, '--jobs', '1', '--output-dir', outputDir])
+
+            self.assertEqual(sorted(os.listdir(outputDir)), ['c81.json', 'dfdc.json', 'xrotor.json'])
+            for outputName, ref in zip(['xrotor.json', 'dfdc.json', 'c81.json'], self.loadRefs()):
+                with open(os.path.join(outputDir, outputName)) as fh:
+                    flow360Dict = json.load(fh)
+                utils.assertDeepAlmostEqual(self, flow360Dict['BETDisks'], [ref], places=14)
+
+    def test_batch_translate_all_failed(self):
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            manifestFile = self.writeManifest(tmpDir)
+            with open(manifestFile) as fh:
+                manifest = json.load(fh)
+            manifest['disks'] = manifest['disks'][1:2]  # only the missing file
+            with open(manifestFile, 'w') as fh:
+                json.dump(manifest, fh)
+            outputFile = os.path.join(tmpDir, 'merged.json')
+            exitCode = batchTranslate.main(['translate', '-i', manifestFile, '--jobs', '1', '-o', outputFile])
+            self.assertEqual(exitCode, 1)
+            self.assertFalse(os.path.exists(outputFile))
+
+    def test_batch_translate_output_names(self):
+
+        disks = [{'output': '/manifest/a/disk.json'}, {'output': '/manifest/b/disk.json'}, {}]
+        expected = ['/out/a/disk.json', '/out/b/disk.json', '/out/disk2.json']
+        self.assertEqual(batchTranslate.diskOutputFiles(disks, '/manifest', '/out'),
+                         [os.path.normpath(path) for path in expected])
+        with self.assertRaisesRegex(ValueError, 'several disks'):
+            batchTranslate.diskOutputFiles(disks + [{'output': '/manifest/a/../a/disk.json'}], '/manifest', '/out')
+
+    def test_batch_translate_failures(self):
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            manifest = batchTranslate.readManifest(self.writeManifest(tmpDir))
+            disks = manifest['disks'][:2]
+            # the failures are reported with their traceback whether the disks are translated in parallel or not
+            for jobs in [1, 2]:
+                (betDisk, error), (failedDisk, failure) = batchTranslate.translateDisks(disks, jobs)
+                self.assertIsNone(error)
+                self.assertIsNone(failedDisk)
+                self.assertTrue(failure.startswith('Traceback'), failure)
+                self.assertIn('missing.xrotor', failure)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
 import os, sys
 import json
+import tempfile
+
+import numpy as np
 
 import unittest
 import utils
@@ -31,5 +34,199 @@ class AdvancedTestSuite(unittest.TestCase):
 
         utils.assertDeepAlmostEqual(self, betFlow360, refbetFlow360, places=14)
 
+    def test_c81_polar_files_errors(self):
+
+        dataDir = os.path.join(here, 'data/c81')
+        polarFiles = [[os.path.join(dataDir, f'Xv15_c81_section{secIdx}Polars.csv')] for secIdx in [1, 9, 3, 8, 5]]
+        betDisk = {'sectionalRadiuses': [13.5, 25.5, 76.5, 120, 150]}
+        with self.assertRaises(ValueError) as context:
+            interface.readInC81Polars(betDisk, polarFiles, maxWorkers=4)
+        message = str(context.exception)
+        self.assertIn('could not read 2 of the 5 c81 polar files', message)
+        self.assertIn('Xv15_c81_section9Polars.csv does not exist', message)
+        self.assertIn('Xv15_c81_section8Polars.csv does not exist', message)
+
+        polarFiles[1][0] = polarFiles[3][0] = polarFiles[0][0]
+        betDisk = interface.readInC81Polars(betDisk, polarFiles, maxWorkers=4)
+        self.assertEqual(betDisk['sectionalPolars'][1], betDisk['sectionalPolars'][0])
+        self.assertNotEqual(betDisk['sectionalPolars'][2], betDisk['sectionalPolars'][0])
+
+        # the polars read as arrays by default give the same disk as the lists of readInC81Polar
+        listBetDisk = interface.readInC81Polars({'sectionalRadiuses': betDisk['sectionalRadiuses']}, polarFiles,
+                                                readPolar=interface.readInC81Polar)
+        self.assertEqual(betDisk, listBetDisk)
+
+    def test_c81_resample(self):
+
+        betDiskAdditionalInfo = {"centerOfRotation": [0, 0, 0],
+                                 "rotationDirectionRule": "leftHand",
+                                 "axisOfRotation": [0, 0, 1],
+                                 "thickness": 15,
+                                 "chordRef": 14,
+                                 "nLoadingNodes": 20,
+                                 "omega" : 0.0046,
+                                 "numberOfBlades" : 3}
+
+        with open(os.path.join(here, 'ref/c81Test.json')) as fh:
+            refbetFlow360 = json.load(fh)
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            for fileName in os.listdir(os.path.join(here, 'data/c81')):
+                with open(os.path.join(here, 'data/c81', fileName)) as fh:
+                    lines = fh.read().splitlines()
+                if fileName == 'Xv15_c81_section2Polars.csv':  # only the even alphas and without the last mach
+                    lines = [','.join(line.split(',')[:-1]) for i, line in enumerate(lines)
+                             if i < 2 or line.startswith(',') or float(line.split(',')[0]) % 2 == 0]
+                with open(os.path.join(tmpDir, fileName), 'w') as fh:
+                    fh.write('\n'.join(lines))
+
+            inputFile = os.path.join(tmpDir, 'Xv15_geometry.csv')
+            with self.assertRaisesRegex(ValueError, 'The mach Numbers do not match'):
+                interface.generateC81BETJSON(inputFile, dict(betDiskAdditionalInfo))
+            betFlow360 = interface.generateC81BETJSON(inputFile, dict(betDiskAdditionalInfo),
+                                                      resample={'kind': 'linear'})
+            with self.assertRaisesRegex(ValueError, 'unknown resampling scheme cubic'):
+                interface.generateC81BETJSON(inputFile, dict(betDiskAdditionalInfo), resample={'kind': 'cubic'})
+
+        alphas = np.array(refbetFlow360['alphas'])
+        kept = alphas % 2 == 0
+        section = betFlow360['sectionalPolars'][1]
+        refSection = refbetFlow360['sectionalPolars'][1]
+        utils.assertDeepAlmostEqual(self, section['liftCoeffs'][3], section['liftCoeffs'][2], places=14)
+        for machIdx in range(3):
+            refCl = np.array(refSection['liftCoeffs'][machIdx][0])
+            cl = np.array(section['liftCoeffs'][machIdx][0])
+            utils.assertDeepAlmostEqual(self, cl[kept].tolist(), refCl[kept].tolist(), places=14)
+            utils.assertDeepAlmostEqual(self, cl[~kept].tolist(),
+                                        np.interp(alphas[~kept], alphas[kept], refCl[kept]).tolist(), places=14)
+
+        del refbetFlow360['sectionalPolars'][1]
+        del betFlow360['sectionalPolars'][1]
+        utils.assertDeepAlmostEqual(self, betFlow360, refbetFlow360, places=14)
+
+    def test_c81_fixed_width(self):
+
+        alphas = np.arange(-20, 21, 1.0)
+        machs = np.linspace(0, 0.88, 12)  # more than 9 Machs so every row has a continuation line
+        cl = np.round(np.sin(alphas * np.pi / 180)[None, :] * (1 + machs[:, None]), 3)
+        cd = np.round(0.01 + 0.001 * alphas[None, :] ** 2 * (1 + machs[:, None]), 3)
+
+        def table(values):
+            lines = [' ' * 7 + ''.join(f'{mach:7.3f}' for mach in machs[:9]),
+                     ' ' * 7 + ''.join(f'{mach:7.3f}' for mach in machs[9:])]
+            for alpha, row in zip(alphas, values.T):
+                lines.append(f'{alpha:7.1f}' + ''.join(f'{value:7.3f}' for value in row[:9]))
+                lines.append(' ' * 7 + ''.join(f'{value:7.3f}' for value in row[9:]))
+            return lines
+
+        header = 'TEST AIRFOIL'.ljust(30) + f'{len(machs):2d}{len(alphas):2d}' * 3
+        with tempfile.TemporaryDirectory() as tmpDir:
+            polarFile = os.path.join(tmpDir, 'test.c81')
+            with open(polarFile, 'w') as fh:
+                fh.write('\n'.join([header] + table(cl) + table(cd) + table(cl)) + '\n')
+            tables = interface.readC81Tables(polarFile)
+            clAlphas, clMachNums, clValues, cdValues = interface.readInC81Polarc81Format(polarFile)
+
+            with open(polarFile, 'w') as fh:
+                fh.write('\n'.join([header] + table(cl) + table(cd)[:-2]) + '\n')
+            with self.assertRaisesRegex(ValueError, 'the header says the CD table has 12 Machs and 41 alphas but we '
+                                                    'read 12 Machs and 40 alphas'):
+                interface.readC81Tables(polarFile)
+
+        self.assertEqual(list(tables.keys()), ['CL', 'CD', 'CM'])
+        utils.assertDeepAlmostEqual(self, tables['CL']['machs'].tolist(), np.round(machs, 3).tolist(), places=14)
+        utils.assertDeepAlmostEqual(self, tables['CD']['values'].tolist(), cd.tolist(), places=14)
+        utils.assertDeepAlmostEqual(self, tables['CM']['values'].tolist(), cl.tolist(), places=14)
+        utils.assertDeepAlmostEqual(self, clAlphas, alphas.tolist(), places=14)
+        utils.assertDeepAlmostEqual(self, cdValues[clMachNums[10]], cd[10].tolist(), places=14)
+
+    def test_c81_csv_arrays(self):
+
+        inputFile = os.path.join(here, 'data/c81/Xv15_c81_section1Polars.csv')
+        alphas, machs, cl, cd = interface.readInC81PolarcsvArrays(inputFile)
+        clAlphas, clMachNums, clValues, cdValues = interface.readInC81Polarcsv(inputFile)
+        self.assertEqual(cl.shape, (len(clMachNums), len(clAlphas)))
+        utils.assertDeepAlmostEqual(self, cl.tolist(), [clValues[mach] for mach in clMachNums], places=14)
+        utils.assertDeepAlmostEqual(self, cd.tolist(), [cdValues[mach] for mach in clMachNums], places=14)
+
+        with open(inputFile) as fh:
+            lines = fh.read().splitlines()
+        cdIdx = [i for i, line in enumerate(lines) if line.startswith(',')][1]
+        keep = [i for i, line in enumerate(lines) if i < 2 or i == cdIdx or
+                (i > 1 and not line.startswith(',') and -30 <= float(line.split(',')[0]) <= 30)]
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            polarFile = os.path.join(tmpDir, 'partial.csv')
+            with open(polarFile, 'w') as fh:
+                fh.write('\n'.join(lines[i] for i in keep) + '\n')
+            alphas, machs, cl, cd = interface.readInC81PolarcsvArrays(polarFile)
+
+            with open(polarFile, 'w') as fh:
+                fh.write('\n'.join(lines[i] for i in keep[:-1]) + '\n')
+            with self.assertRaisesRegex(ValueError, 'The alphas in the Cl polar do not match'):
+                interface.readInC81PolarcsvArrays(polarFile)
+
+            # a row with more values than mach numbers is an error, not silently cut
+            extraLines = [lines[i] for i in keep]
+            extraLines[2] += ', 0.5'
+            with open(polarFile, 'w') as fh:
+                fh.write('\n'.join(extraLines) + '\n')
+            with self.assertRaisesRegex(ValueError, 'could not read the CL table'):
+                interface.readInC81PolarcsvArrays(polarFile)
+            extraLines = [lines[i] if i < 2 or lines[i].startswith(',') else lines[i] + ', 0.5' for i in keep]
+            with open(polarFile, 'w') as fh:
+                fh.write('\n'.join(extraLines) + '\n')
+            with self.assertRaisesRegex(ValueError, 'has 5 values per alpha for 4 mach numbers'):
+                interface.readInC81PolarcsvArrays(polarFile)
+            # trailing commas are fine
+            with open(polarFile, 'w') as fh:
+                fh.write('\n'.join(lines[i] + ',' for i in keep) + '\n')
+            utils.assertDeepAlmostEqual(self, interface.readInC81PolarcsvArrays(polarFile)[2].tolist(), cl.tolist(),
+                                        places=14)
+
+        partialAlphas, partialMachs, clValues, cdValues = interface.readInC81Polarcsv(inputFile)
+        self.assertEqual([alphas[0], alphas[-1]], [-180, 180])
+        refAlphas, refMachs, refCl, refCd = interface.blendPolarstoFlatplate(
+            [alpha for alpha in partialAlphas if -30 <= alpha <= 30], partialMachs,
+            {mach: [value for alpha, value in zip(partialAlphas, clValues[mach]) if -30 <= alpha <= 30]
+             for mach in partialMachs},
+            {mach: [value for alpha, value in zip(partialAlphas, cdValues[mach]) if -30 <= alpha <= 30]
+             for mach in partialMachs})
+        utils.assertDeepAlmostEqual(self, alphas.tolist(), refAlphas, places=14)
+        utils.assertDeepAlmostEqual(self, cl.tolist(), [refCl[mach] for mach in refMachs], places=14)
+        utils.assertDeepAlmostEqual(self, cd.tolist(), [refCd[mach] for mach in refMachs], places=14)
+
+        # the flat plate extension options go through the reader
+        with tempfile.TemporaryDirectory() as tmpDir:
+            polarFile = os.path.join(tmpDir, 'partial.csv')
+            with open(polarFile, 'w') as fh:
+                fh.write('\n'.join(lines[i] for i in keep) + '\n')
+            coarseAlphas, coarseMachs, coarseCl, coarseCd = interface.readInC81PolarcsvArrays(polarFile, alphaStep=30)
+        self.assertLess(len(coarseAlphas), len(alphas))
+        self.assertEqual([coarseAlphas[0], coarseAlphas[-1]], [-180, 180])
+
+    def test_extend_polars_to_flat_plate(self):
+
+        alphas = np.linspace(-20, 20, 41)
+        cl = np.array([0.1 * alphas, 0.11 * alphas])
+        cd = np.array([0.01 + 0.001 * alphas ** 2, 0.012 + 0.001 * alphas ** 2])
+
+        fineAlphas, fineCl, fineCd = interface.extendPolarsToFlatPlate(alphas, cl, cd)
+        coarseAlphas, coarseCl, coarseCd = interface.extendPolarsToFlatPlate(alphas, cl, cd, alphaStep=40)
+        self.assertLess(len(coarseAlphas), len(fineAlphas))
+        for newAlphas, newCl, newCd in ((fineAlphas, fineCl, fineCd), (coarseAlphas, coarseCl, coarseCd)):
+            self.assertEqual([newAlphas[0], newAlphas[-1]], [-180, 180])
+            self.assertTrue((np.diff(newAlphas) > 0).all())
+            self.assertEqual(newCl.shape, (2, len(newAlphas)))
+            # the given polars are kept as they are in the middle
+            begin = np.searchsorted(newAlphas, alphas[0])
+            utils.assertDeepAlmostEqual(self, newAlphas[begin:begin + len(alphas)].tolist(), alphas.tolist(), places=14)
+            utils.assertDeepAlmostEqual(self, newCl[:, begin:begin + len(alphas)].tolist(), cl.tolist(), places=14)
+            utils.assertDeepAlmostEqual(self, newCd[:, begin:begin + len(alphas)].tolist(), cd.tolist(), places=14)
+        # the endpoints are the same flat plate values whatever the step
+        utils.assertDeepAlmostEqual(self, coarseCl[:, [0, -1]].tolist(), fineCl[:, [0, -1]].tolist(), places=14)
+        utils.assertDeepAlmostEqual(self, coarseCd[:, [0, -1]].tolist(), fineCd[:, [0, -1]].tolist(), places=14)
+
+
 if __name__ == '__main__':
     unittest.main()
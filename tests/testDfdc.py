@@ -1,5 +1,7 @@
 import os, sys
+import math
 import json
+import tempfile
 
 import unittest
 import utils
@@ -31,6 +33,54 @@ class AdvancedTestSuite(unittest.TestCase):
         self.maxDiff = None
         utils.assertDeepAlmostEqual(self, betFlow360, refbetFlow360, places=14)
 
+    def test_dfdc_multiple_rotors(self):
+
+        with open(os.path.join(here, 'data/dfdc_xv15_twist0.case')) as fh:
+            caseLines = fh.read().splitlines()
+
+        # make a 2 disk case by repeating the AERO and ROTOR blocks with a 2 bladed rotor.
+        aeroBegin = caseLines.index('AERO')
+        rotorEnd = caseLines.index('ENDROTOR') + 1
+        secondDisk = caseLines[aeroBegin:rotorEnd]
+        nBladesIdx = secondDisk.index('ROTOR') + 2
+        secondDisk[nBladesIdx] = secondDisk[nBladesIdx].replace(' 3 ', ' 2 ')
+        caseLines = caseLines[:rotorEnd] + [''] + secondDisk + caseLines[rotorEnd:]
+        rpmIdx = caseLines.index('OPER') + 2
+        oneRpmLines = list(caseLines)
+        caseLines[rpmIdx] += '         20.0'  # RPM2 of the second disk
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            inputFile = os.path.join(tmpDir, 'twoDisks.case')
+            with open(inputFile, 'w') as fh:
+                fh.write('\n'.join(caseLines))
+
+            rotors = interface.readDFDCRotors(inputFile)
+            self.assertEqual([rotor['nBlades'] for rotor in rotors], [3, 2])
+            self.assertEqual(rotors[0]['rRGeom'], rotors[1]['rRGeom'])
+            self.assertEqual(interface.readXROTORFile(inputFile, rotorIdx=1)['nBlades'], 2)
+            self.assertEqual([rotor['RPM'] for rotor in rotors], [15.0, 20.0])
+            self.assertAlmostEqual(rotors[1]['omegaDim'], 20.0 * math.pi / 30, places=14)
+
+            # the OPER block must give one RPM per disk
+            with open(inputFile, 'w') as fh:
+                fh.write('\n'.join(oneRpmLines))
+            with self.assertRaisesRegex(ValueError, 'gives 1 RPM\\(s\\) for 2 disk\\(s\\)'):
+                interface.readDFDCRotors(inputFile)
+
+    def test_dfdc_format_error(self):
+
+        with open(os.path.join(here, 'data/dfdc_xv15_twist0.case')) as fh:
+            caseLines = fh.read().splitlines()
+        caseLines[20] = caseLines[20].split('-0.0000')[0]  # drop CLmin from the first aero section
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            inputFile = os.path.join(tmpDir, 'bad.case')
+            with open(inputFile, 'w') as fh:
+                fh.write('\n'.join(caseLines))
+
+            with self.assertRaisesRegex(ValueError, 'line #21'):
+                interface.readDFDCFile(inputFile)
+
 
 if __name__ == '__main__':
     unittest.main()
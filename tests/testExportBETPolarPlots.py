@@ -0,0 +1,41 @@
+import os, sys
+import json
+import tempfile
+
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.BETDisk.BETDisk.exportBETPolarPlots as exportBETPolarPlots
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    def test_export_bet_polar_plots(self):
+
+        with open(os.path.join(here, 'ref/xrotorTest.json')) as fh:
+            betDisk = json.load(fh)
+        # two stations are enough and keep the rendering short
+        betDisk['sectionalRadiuses'] = betDisk['sectionalRadiuses'][:2]
+        betDisk['sectionalPolars'] = betDisk['sectionalPolars'][:2]
+        jsonDict = {'BETDisks': [betDisk]}
+
+        exportBETPolarPlots.useHeadlessBackend()
+        with tempfile.TemporaryDirectory() as tmpDir:
+            outputFiles = exportBETPolarPlots.plotClCd(jsonDict, save=True, show=False, jobs=2, outputDir=tmpDir)
+            outputFiles += exportBETPolarPlots.plotTwistChord(jsonDict, save=True, show=False, jobs=2,
+                                                              outputDir=tmpDir)
+            self.assertEqual(len(outputFiles), 2 * 4 + 2)
+            self.assertEqual(outputFiles[:4], [os.path.join(tmpDir, 'disk0_CL_CD_comparetoXrotor_station0.png'),
+                                               os.path.join(tmpDir, 'disk0_CL_CDvAlpha_station0.png'),
+                                               os.path.join(tmpDir, 'disk0_CL_CDvAlphaZoomed_station0.png'),
+                                               os.path.join(tmpDir, 'disk0_CL_CDvAlphaZoomed2_station0.png')])
+            self.assertEqual(sorted(outputFiles), sorted(os.path.join(tmpDir, name) for name in os.listdir(tmpDir)))
+
+        with self.assertRaises(ValueError):
+            exportBETPolarPlots.plotClCd(jsonDict, save=False, show=True, jobs=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
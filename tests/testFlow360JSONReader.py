@@ -0,0 +1,69 @@
+import os, sys
+import json
+import tempfile
+
+import unittest
+import utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.BETDisk.BETDisk.flow360JSONReader import iterBETDisks, readBETDisks
+from src.BETDisk.BETDisk.flow360JSONWriter import writeFlow360JSON
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    def test_flow360_json_reader(self):
+
+        betDisks = []
+        for refFile in ['xrotorTest.json', 'xfoilTest.json']:
+            with open(os.path.join(here, 'ref', refFile)) as fh:
+                betDisks.append(json.load(fh))
+        flow360Dict = {'geometry': {'refArea': 1.5, 'comments': 'BETDisks: [{"alphas": 1}]'},
+                       'BETDisks': betDisks,
+                       'freestream': {'Mach': 0.1, 'Reynolds': 1e6}}
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            flow360File = os.path.join(tmpDir, 'flow360.json')
+            for indent in [4, None]:
+                writeFlow360JSON(flow360File, flow360Dict, indent)
+                # tiny chunks so that values and tokens are cut at every possible place
+                for chunkSize in [7, 1024 ** 2]:
+                    readDisks = readBETDisks(flow360File, chunkSize)
+                    self.assertEqual(len(readDisks), 2)
+                    for readDisk, betDisk in zip(readDisks, betDisks):
+                        utils.assertDeepAlmostEqual(self, readDisk.toDict(), betDisk, places=14)
+
+            readDisk = next(iterBETDisks(flow360File))
+            self.assertEqual(readDisk.polars.liftCoeffs.shape, (5, 4, 1, 387))
+            self.assertEqual(readDisk.polars.liftCoeffs[2, 1, 0, 100],
+                             betDisks[0]['sectionalPolars'][2]['liftCoeffs'][1][0][100])
+
+            with open(flow360File) as fh:
+                content = fh.read()
+            with open(flow360File, 'w') as fh:
+                fh.write(content[:len(content) // 2])
+            with self.assertRaises(ValueError):
+                readBETDisks(flow360File)
+
+    def test_flow360_json_reader_numbers_across_chunks(self):
+
+        # floats in exponent form, cut after their 1., 1.2345e or 1.2345e- by one of the chunk sizes
+        polar = {'liftCoeffs': [[[1.2345e-05, -2.5e-07, 0.125]], [[3.0e+20, 1.5, -1e-10]]],
+                 'dragCoeffs': [[[6.5e-03, 1.25e-05, 1e-08]], [[2.5e-01, 7.75e-09, 1.0]]]}
+        betDisk = {'omega': 1.2345e-05, 'thickness': 1.5e-02, 'numberOfBlades': 3,
+                   'alphas': [-1.8e+02, 0.0, 1.8e+02], 'MachNumbers': [0.0, 6.25e-01], 'ReynoldsNumbers': [1e+06],
+                   'twists': [{'radius': 1.0, 'twist': 1.2345e-05}], 'chords': [{'radius': 1.0, 'chord': 2.5e-01}],
+                   'sectionalRadiuses': [1.0, 2.0], 'sectionalPolars': [polar, polar]}
+        with tempfile.TemporaryDirectory() as tmpDir:
+            flow360File = os.path.join(tmpDir, 'flow360.json')
+            with open(flow360File, 'w') as fh:
+                json.dump({'freestream': {'Mach': 1e-01}, 'BETDisks': [betDisk]}, fh)
+            for chunkSize in range(1, 200):
+                readDisks = readBETDisks(flow360File, chunkSize)
+                utils.assertDeepAlmostEqual(self, readDisks[0].toDict(), betDisk, places=14)
+
+
+if __name__ == '__main__':
+    unittest.main()
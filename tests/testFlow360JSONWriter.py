@@ -0,0 +1,55 @@
+import os, sys
+import io
+import json
+
+import numpy as np
+import unittest
+import utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.BETDisk.BETDisk.flow360JSONWriter import writeJSON
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    def test_flow360_json_writer(self):
+
+        with open(os.path.join(here, 'ref/xrotorTest.json')) as fh:
+            betDisk = json.load(fh)
+        flow360Dict = {'geometry': {'refArea': 1.5, 'momentLength': [1, 1, 1]}, 'name': 'rotor "xv15"',
+                       'empty': {}, 'noValues': [], 'flags': [True, False, None], 'special': [float('nan'), -np.inf],
+                       'BETDisks': [betDisk, betDisk]}
+
+        # pretty and compact layouts are the same as json.dump
+        for indent, separators in [(4, None), (None, (',', ':'))]:
+            fh = io.StringIO()
+            writeJSON(fh, flow360Dict, indent)
+            self.assertEqual(fh.getvalue(), json.dumps(flow360Dict, indent=indent, separators=separators))
+
+        # arrays and numpy scalars are written as the lists they hold
+        arrayDisk = dict(betDisk)
+        arrayDisk['alphas'] = np.array(betDisk['alphas'])
+        arrayDisk['omega'] = np.float64(betDisk['omega'])
+        arrayDisk['nLoadingNodes'] = np.int64(betDisk['nLoadingNodes'])
+        arrayDisk['sectionalPolars'] = [{key: np.array(values) for key, values in polar.items()}
+                                        for polar in betDisk['sectionalPolars']]
+        fh = io.StringIO()
+        writeJSON(fh, arrayDisk)
+        utils.assertDeepAlmostEqual(self, json.loads(fh.getvalue()), betDisk, places=14)
+
+        # limited number of significant digits, from lists or arrays
+        for disk in [betDisk, arrayDisk]:
+            fh = io.StringIO()
+            writeJSON(fh, disk, None, significantDigits=6)
+            roundedDisk = json.loads(fh.getvalue())
+            self.assertLess(len(fh.getvalue()), len(json.dumps(betDisk, separators=(',', ':'))))
+            self.assertEqual(roundedDisk['nLoadingNodes'], betDisk['nLoadingNodes'])
+            for roundedPolar, polar in zip(roundedDisk['sectionalPolars'], betDisk['sectionalPolars']):
+                self.assertTrue(np.allclose(roundedPolar['liftCoeffs'], polar['liftCoeffs'], rtol=1e-5, atol=0))
+            utils.assertDeepAlmostEqual(self, roundedDisk['alphas'], betDisk['alphas'], places=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
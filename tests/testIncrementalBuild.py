@@ -0,0 +1,68 @@
+import os, sys
+import json
+import shutil
+import tempfile
+
+import unittest
+import utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.BETDisk.BETDisk.BETTranslatorInterface as interface
+from src.BETDisk.BETDisk.incrementalBuild import IncrementalBuild
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    def build(self, geometryFile, stateFile):
+        betDiskAdditionalInfo = {"centerOfRotation": [0, 0, 0],
+                                 "rotationDirectionRule": "leftHand",
+                                 "axisOfRotation": [0, 0, 1],
+                                 "thickness": 15,
+                                 "chordRef": 14,
+                                 "nLoadingNodes": 20,
+                                 "omega" : 0.0046,
+                                 "numberOfBlades" : 3}
+        build = IncrementalBuild(stateFile)
+        betDisk = interface.generateC81BETJSON(geometryFile, betDiskAdditionalInfo,
+                                               readPolar=build.polarReader(interface.readInC81Polar),
+                                               parseGeometry=build.parseGeometryfile)
+        build.save()
+        return betDisk, [os.path.basename(fileName) for fileName in build.rereadFiles]
+
+    def test_incremental_c81(self):
+
+        with open(os.path.join(here, 'ref/c81Test.json')) as fh:
+            refbetFlow360 = json.load(fh)
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            dataDir = os.path.join(tmpDir, 'c81')
+            shutil.copytree(os.path.join(here, 'data/c81'), dataDir)
+            geometryFile = os.path.join(dataDir, 'Xv15_geometry.csv')
+            stateFile = os.path.join(tmpDir, 'build.state')
+
+            betDisk, rereadFiles = self.build(geometryFile, stateFile)
+            self.assertEqual(len(rereadFiles), 6)
+            utils.assertDeepAlmostEqual(self, betDisk, refbetFlow360, places=14)
+
+            betDisk, rereadFiles = self.build(geometryFile, stateFile)
+            self.assertEqual(rereadFiles, [])
+            utils.assertDeepAlmostEqual(self, betDisk, refbetFlow360, places=14)
+
+            polarFile = os.path.join(dataDir, 'Xv15_c81_section3Polars.csv')
+            with open(polarFile) as fh:
+                lines = fh.readlines()
+            lines[2] = lines[2].replace('0.000000', '0.100000', 1)  # CL at -180 deg of the first Mach
+            with open(polarFile, 'w') as fh:
+                fh.writelines(lines)
+
+            betDisk, rereadFiles = self.build(geometryFile, stateFile)
+            self.assertEqual(rereadFiles, ['Xv15_c81_section3Polars.csv'])
+            self.assertEqual(betDisk['sectionalPolars'][2]['liftCoeffs'][0][0][0], 0.1)
+            refbetFlow360['sectionalPolars'][2]['liftCoeffs'][0][0][0] = 0.1
+            utils.assertDeepAlmostEqual(self, betDisk, refbetFlow360, places=14)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os, sys
+import json
+
+import unittest
+import utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.BETDisk.BETDisk.multiDiskBuilder import MultiDiskBuilder
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    def test_multi_disk_builder(self):
+
+        betDiskAdditionalInfo = {"meshUnit": 1,
+                                 "centerOfRotation": [0, 0, 0],
+                                 "rotationDirectionRule": "leftHand",
+                                 "axisOfRotation": [0, 0, 1],
+                                 "omega": 0.0046,
+                                 "thickness": 15,
+                                 "chordRef": 14,
+                                 "nLoadingNodes": 20}
+        c81Info = {key: value for key, value in betDiskAdditionalInfo.items() if key != 'meshUnit'}
+        c81Info['numberOfBlades'] = 3
+
+        xrotorFile = os.path.join(here, 'data/xv15_like_twist0.xrotor')
+        c81File = os.path.join(here, 'data/c81/Xv15_geometry.csv')
+        disks = [{'type': 'xrotor', 'input': xrotorFile, 'betDisk': betDiskAdditionalInfo},
+                 {'type': 'c81', 'input': c81File, 'betDisk': c81Info},
+                 {'type': 'xrotor', 'input': xrotorFile, 'betDisk': dict(betDiskAdditionalInfo, omega=0.004)},
+                 {'type': 'c81', 'input': c81File, 'betDisk': dict(c81Info, centerOfRotation=[10, 0, 0])}]
+
+        builder = MultiDiskBuilder()
+        betDisks = builder.buildDisks(disks)
+
+        # identical blades share their polars and were only computed once
+        self.assertIs(betDisks[0].polars, betDisks[2].polars)
+        self.assertIs(betDisks[1].polars, betDisks[3].polars)
+        self.assertEqual(len(builder.polarTables), 2)
+        self.assertEqual(builder.polarCache.misses, len(betDisks[0].sectionalRadiuses))
+        self.assertEqual(len(builder.polarFiles), 5)
+        self.assertEqual(builder.numPolarFiles, 10)
+
+        with open(os.path.join(here, 'ref/xrotorTest.json')) as fh:
+            refXrotor = json.load(fh)
+        with open(os.path.join(here, 'ref/c81Test.json')) as fh:
+            refC81 = json.load(fh)
+        utils.assertDeepAlmostEqual(self, betDisks[0].toDict(), refXrotor, places=14)
+        utils.assertDeepAlmostEqual(self, betDisks[2].toDict(), dict(refXrotor, omega=0.004), places=14)
+        utils.assertDeepAlmostEqual(self, betDisks[3].toDict(), dict(refC81, centerOfRotation=[10, 0, 0]), places=14)
+
+        # the shared polars are read only, editing one disk gives it its own copy and leaves the other one unchanged
+        with self.assertRaises(ValueError):
+            betDisks[0].polars.liftCoeffs[0, 0, 0, 100] += 1
+        betDisks[0].editablePolars().liftCoeffs[0, 0, 0, 100] += 1
+        self.assertIsNot(betDisks[0].polars, betDisks[2].polars)
+        self.assertEqual(betDisks[2].polars.liftCoeffs[0, 0, 0, 100],
+                         refXrotor['sectionalPolars'][0]['liftCoeffs'][0][0][100])
+        self.assertAlmostEqual(betDisks[0].polars.liftCoeffs[0, 0, 0, 100],
+                               refXrotor['sectionalPolars'][0]['liftCoeffs'][0][0][100] + 1, places=14)
+        betDisks[0].sections[1].dragCoeffs[:] = 0
+        self.assertTrue(betDisks[2].polars.dragCoeffs[1].all())
+
+
+if __name__ == '__main__':
+    unittest.main()
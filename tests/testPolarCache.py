@@ -0,0 +1,76 @@
+import os, sys
+import json
+import tempfile
+
+import unittest
+import utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.BETDisk.BETDisk.BETTranslatorInterface as interface
+from src.BETDisk.BETDisk.polarCache import PolarCache
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    def getBetDiskParams(self):
+        return {"meshUnit": 1,
+                "centerOfRotation": [0, 0, 0],
+                "rotationDirectionRule": "leftHand",
+                "axisOfRotation": [0, 0, 1],
+                "omega": 0.0046,
+                "thickness": 15,
+                "chordRef": 14,
+                "nLoadingNodes": 20}
+
+    def test_polar_cache(self):
+
+        inputFile = os.path.join(here, 'data/xv15_like_twist0.xrotor')
+        with open(os.path.join(here, 'ref/xrotorTest.json')) as fh:
+            refbetFlow360 = json.load(fh)
+
+        with tempfile.TemporaryDirectory() as cacheDir:
+            cache = PolarCache(cacheDir)
+            betFlow360 = interface.generateXrotorBETJSON(inputFile, self.getBetDiskParams(), polarCache=cache)
+            utils.assertDeepAlmostEqual(self, betFlow360, refbetFlow360, places=14)
+            nEntries = len(os.listdir(cacheDir))
+            self.assertEqual(nEntries, len(refbetFlow360['sectionalRadiuses']))
+
+            # second run is served from the cache: no entry is rewritten and the hits are marked as recently used
+            entryPaths = [os.path.join(cacheDir, name) for name in os.listdir(cacheDir)]
+            for entryPath in entryPaths:
+                os.utime(entryPath, (1, 1))
+            inodes = [os.stat(entryPath).st_ino for entryPath in entryPaths]
+            cachedBetFlow360 = interface.generateXrotorBETJSON(inputFile, self.getBetDiskParams(), polarCache=cache)
+            utils.assertDeepAlmostEqual(self, cachedBetFlow360, refbetFlow360, places=14)
+            self.assertEqual(len(os.listdir(cacheDir)), nEntries)
+            self.assertEqual([os.stat(entryPath).st_ino for entryPath in entryPaths], inodes)
+            self.assertTrue(all(os.stat(entryPath).st_mtime > 1 for entryPath in entryPaths))
+
+            # an empty entry, e.g. left by a crash, is dropped and recomputed
+            with open(entryPaths[0], 'w'):
+                pass
+            recomputedBetFlow360 = interface.generateXrotorBETJSON(inputFile, self.getBetDiskParams(),
+                                                                   polarCache=cache)
+            utils.assertDeepAlmostEqual(self, recomputedBetFlow360, refbetFlow360, places=14)
+            self.assertGreater(os.path.getsize(entryPaths[0]), 0)
+
+    def test_polar_cache_eviction(self):
+
+        xrotorDict = interface.readXROTORFile(os.path.join(here, 'data/xv15_like_twist0.xrotor'))
+        alphas = interface.generateAlphas()
+        machs = interface.generateMachs()
+
+        with tempfile.TemporaryDirectory() as cacheDir:
+            cache = PolarCache(cacheDir)
+            interface.getPolarArrays(xrotorDict, alphas, machs, polarCache=cache)
+            entrySize = max(os.path.getsize(os.path.join(cacheDir, name)) for name in os.listdir(cacheDir))
+
+            cache.maxSizeBytes = 2 * entrySize
+            cache.evict()
+            self.assertEqual(len(os.listdir(cacheDir)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os, sys
+import glob
+import json
+import tempfile
+
+import unittest
+import utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.BETDisk.BETDisk.BETTranslatorInterface as interface
+from src.BETDisk.BETDisk.polarDatabase import PolarDatabase
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    betDiskAdditionalInfo = {"centerOfRotation": [0, 0, 0],
+                             "rotationDirectionRule": "leftHand",
+                             "axisOfRotation": [0, 0, 1],
+                             "initialBladeDirection": [1,0,0],
+                             "thickness": 15,
+                             "chordRef": 14,
+                             "nLoadingNodes": 20,
+                             "omega" : 0.0046,
+                             "numberOfBlades" : 3}
+
+    def geometryWithNames(self, geometryFile, tmpDir, sectionNames):
+        with open(geometryFile) as fh:
+            lines = fh.read().splitlines()
+        for secIdx, names in enumerate(sectionNames):
+            lines[secIdx + 1] = ', '.join([lines[secIdx + 1].split(',')[0]] + names)
+        geometryFile = os.path.join(tmpDir, 'geometry.csv')
+        with open(geometryFile, 'w') as fh:
+            fh.write('\n'.join(lines))
+        return geometryFile
+
+    def test_polar_database(self):
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            database = PolarDatabase(os.path.join(tmpDir, 'polars.sqlite'))
+
+            c81Files = sorted(glob.glob(os.path.join(here, 'data/c81/Xv15_c81_section*Polars.csv')))
+            names = database.importFiles(c81Files, 'c81', maxWorkers=2)
+            database.importFiles(c81Files[:1], 'c81')  # importing again replaces the airfoil
+            geometryFile = self.geometryWithNames(os.path.join(here, 'data/c81/Xv15_geometry.csv'), tmpDir,
+                                                  [[name] for name in names])
+            c81BetDisk = interface.generateC81BETJSON(geometryFile, dict(self.betDiskAdditionalInfo),
+                                                      polarDatabase=database)
+
+            xfoilDir = os.path.join(here, 'data/xfoil')
+            for secIdx in range(5):
+                polarFiles = [os.path.join(xfoilDir, f'sec{secIdx}XfoilPolarM{machIdx}.dat') for machIdx in range(4)]
+                database.importXfoil(f'xv15Section{secIdx}', polarFiles)
+            geometryFile = self.geometryWithNames(os.path.join(xfoilDir, 'xv15_geometry_xfoil_translatorDisk0.csv'),
+                                                  tmpDir, [[f'xv15Section{secIdx}'] for secIdx in range(5)])
+            xfoilBetDisk = interface.generateXfoilBETJSON(geometryFile, dict(self.betDiskAdditionalInfo),
+                                                          polarDatabase=database)
+
+            self.assertEqual(len(database.names()), 10)
+            with self.assertRaisesRegex(ValueError, r"airfoils \['NACA0012'\] are not in the polar database"):
+                database.lookup(['xv15Section0', 'NACA0012'])
+            database.close()
+
+        with open(os.path.join(here, 'ref/c81Test.json')) as fh:
+            refbetFlow360 = json.load(fh)
+        refbetFlow360['initialBladeDirection'] = [1, 0, 0]
+        utils.assertDeepAlmostEqual(self, c81BetDisk, refbetFlow360, places=14)
+
+        with open(os.path.join(here, 'ref/xfoilTest.json')) as fh:
+            refbetFlow360 = json.load(fh)
+        utils.assertDeepAlmostEqual(self, xfoilBetDisk, refbetFlow360, places=14)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os, sys
+
+import numpy as np
+
+import unittest
+import utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.BETDisk.BETDisk.BETTranslatorInterface as interface
+from src.BETDisk.BETDisk.polarDecimation import decimateBETDisk
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    def test_decimate(self):
+
+        betDiskAdditionalInfo = {"meshUnit": 1,
+                                 "centerOfRotation": [0, 0, 0],
+                                 "rotationDirectionRule": "leftHand",
+                                 "axisOfRotation": [0, 0, 1],
+                                 "omega": 0.0046,
+                                 "thickness": 15,
+                                 "chordRef": 14,
+                                 "nLoadingNodes": 20}
+
+        inputFile = os.path.join(here, 'data/xv15_like_twist0.xrotor')
+        betDisk = interface.generateXrotorBETJSON(inputFile, betDiskAdditionalInfo)
+        decimated, report = decimateBETDisk(betDisk, 1e-3, cdTolerance=1e-4)
+
+        self.assertEqual(report['numAlphas'], len(betDisk['alphas']))
+        self.assertEqual(report['numDecimatedAlphas'], len(decimated['alphas']))
+        self.assertLess(report['numDecimatedAlphas'], report['numAlphas'])
+        self.assertLess(report['decimatedSize'], report['size'])
+        self.assertLessEqual(report['maxClError'], 1e-3)
+        self.assertLessEqual(report['maxCdError'], 1e-4)
+        self.assertEqual([decimated['alphas'][0], decimated['alphas'][-1]], [-180, 180])
+
+        # decimated values are the original values at the kept alphas, and the input disk is untouched
+        keptIdxs = [betDisk['alphas'].index(alpha) for alpha in decimated['alphas']]
+        cl = np.array(betDisk['sectionalPolars'][2]['liftCoeffs'])
+        utils.assertDeepAlmostEqual(self, decimated['sectionalPolars'][2]['liftCoeffs'], cl[..., keptIdxs].tolist(),
+                                    places=14)
+        self.assertEqual(len(betDisk['sectionalPolars'][2]['liftCoeffs'][0][0]), report['numAlphas'])
+
+        # interpolating the decimated polars back onto all the alphas stays within the tolerance
+        cd = np.array(betDisk['sectionalPolars'][4]['dragCoeffs'])[1, 0]
+        cdInterp = np.interp(betDisk['alphas'], decimated['alphas'],
+                             decimated['sectionalPolars'][4]['dragCoeffs'][1][0])
+        self.assertLessEqual(np.abs(cdInterp - cd).max(), 1e-4 * (1 + 1e-12))
+
+        # NaN values are rejected instead of never getting within the tolerance
+        betDisk['sectionalPolars'][3]['liftCoeffs'][1][0][5] = float('nan')
+        with self.assertRaisesRegex(ValueError, r'sections \[3\]'):
+            decimateBETDisk(betDisk, 1e-3)
+        curve = np.linspace(0, 1, 10) ** 2
+        curve[4] = np.nan
+        with self.assertRaises(ValueError):
+            interface.selectGridPoints(np.arange(10), curve, 1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os, sys
+import json
+import shutil
+import tempfile
+
+import numpy as np
+
+import unittest
+import utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.BETDisk.BETDisk.BETTranslatorInterface as interface
+from src.BETDisk.BETDisk.polarSidecar import readInC81PolarSidecar, readInXfoilPolarsSidecar
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    def test_sidecar_xfoil(self):
+
+        betDiskAdditionalInfo = {"centerOfRotation": [0, 0, 0],
+                 "rotationDirectionRule": "leftHand",
+                 "axisOfRotation": [0, 0, 1],
+                 "initialBladeDirection": [1,0,0],
+                 "thickness": 15,
+                 "chordRef": 14,
+                 "nLoadingNodes": 20,
+                 "omega" : 0.0046,
+                 "numberOfBlades" : 3}
+
+        with open(os.path.join(here, 'ref/xfoilTest.json')) as fh:
+            refbetFlow360 = json.load(fh)
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            dataDir = os.path.join(tmpDir, 'xfoil')
+            shutil.copytree(os.path.join(here, 'data/xfoil'), dataDir)
+            inputFile = os.path.join(dataDir, 'xv15_geometry_xfoil_translatorDisk0.csv')
+
+            for run in range(2):
+                betFlow360 = interface.generateXfoilBETJSON(inputFile, dict(betDiskAdditionalInfo),
+                                                            readPolar=readInXfoilPolarsSidecar)
+                utils.assertDeepAlmostEqual(self, betFlow360, refbetFlow360, places=14)
+            sidecarFile = os.path.join(dataDir, 'sec2XfoilPolarM1.dat.npz')
+            self.assertTrue(os.path.isfile(sidecarFile))
+
+            # sidecars are not rewritten when their source is untouched
+            polarFile = os.path.join(dataDir, 'sec2XfoilPolarM1.dat')
+            sidecarMtime = os.stat(sidecarFile).st_mtime_ns
+            readInXfoilPolarsSidecar(polarFile)
+            self.assertEqual(os.stat(sidecarFile).st_mtime_ns, sidecarMtime)
+
+            # touched but same content: the sidecar is still used
+            os.utime(polarFile, ns=(0, 0))
+            self.assertEqual(readInXfoilPolarsSidecar(polarFile), interface.readInXfoilPolars(polarFile))
+            with np.load(sidecarFile) as sidecar:
+                self.assertEqual(int(sidecar['mtime']), 0)
+
+            # new content: the source is parsed again
+            with open(polarFile) as fh:
+                content = fh.read()
+            with open(polarFile, 'w') as fh:
+                fh.write(content.replace('0.0000 0.1283', '0.0000 0.5000'))
+            runs = readInXfoilPolarsSidecar(polarFile)
+            self.assertEqual(runs, interface.readInXfoilPolars(polarFile))
+            self.assertNotEqual(runs[0][2], refbetFlow360['sectionalPolars'][2]['liftCoeffs'][1][0])
+
+    def test_sidecar_c81(self):
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            polarFile = os.path.join(tmpDir, 'Xv15_c81_section1Polars.csv')
+            shutil.copy(os.path.join(here, 'data/c81/Xv15_c81_section1Polars.csv'), polarFile)
+            refPolar = interface.readInC81Polar(polarFile)
+            self.assertEqual(readInC81PolarSidecar(polarFile), refPolar)
+            self.assertTrue(os.path.isfile(polarFile + '.npz'))
+            self.assertEqual(readInC81PolarSidecar(polarFile), refPolar)
+
+            # a corrupt sidecar is handled as a missing one and written again
+            with open(polarFile + '.npz', 'rb') as fh:
+                content = fh.read()
+            for corrupt in [b'', content[:len(content) // 2], content[:-10]]:
+                with open(polarFile + '.npz', 'wb') as fh:
+                    fh.write(corrupt)
+                self.assertEqual(readInC81PolarSidecar(polarFile), refPolar)
+                with open(polarFile + '.npz', 'rb') as fh:
+                    self.assertEqual(fh.read(), content)
+            np.savez(polarFile + '.npz', version=np.array('polar-sidecar-v1'))  # metadata missing
+            self.assertEqual(readInC81PolarSidecar(polarFile), refPolar)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os, sys
+import json
+import tempfile
+
+import unittest
+import utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.BETDisk.BETDisk.BETTranslatorInterface as interface
+from src.BETDisk.BETDisk.sweep import betDiskVariants, writeBETDiskSweep
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+
+class AdvancedTestSuite(unittest.TestCase):
+
+    def test_sweep(self):
+
+        betDiskAdditionalInfo = {"meshUnit": 1,
+                                 "centerOfRotation": [0, 0, 0],
+                                 "rotationDirectionRule": "leftHand",
+                                 "axisOfRotation": [0, 0, 1],
+                                 "omega": 0.0046,
+                                 "thickness": 15,
+                                 "chordRef": 14,
+                                 "nLoadingNodes": 20}
+
+        inputFile = os.path.join(here, 'data/xv15_like_twist0.xrotor')
+        betDisk = interface.generateXrotorBETJSON(inputFile, betDiskAdditionalInfo)
+
+        with open(os.path.join(here, 'ref/xrotorTest.json')) as fh:
+            refbetFlow360 = json.load(fh)
+
+        variants = [{'omega': omega, 'twistOffset': offset} for omega in [0.004, 0.0046] for offset in [-2, 0, 2]]
+        for variant, betDiskVariant in zip(variants, betDiskVariants(betDisk, variants)):
+            self.assertIs(betDiskVariant['sectionalPolars'], betDisk['sectionalPolars'])
+            self.assertEqual(betDiskVariant['omega'], variant['omega'])
+            for twist, refTwist in zip(betDiskVariant['twists'], refbetFlow360['twists']):
+                self.assertAlmostEqual(twist['twist'], refTwist['twist'] + variant['twistOffset'], places=14)
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            outputFiles = writeBETDiskSweep(betDisk, variants, os.path.join(tmpDir, 'sweep_{idx}_{omega}.json'))
+            self.assertEqual(len(outputFiles), len(variants))
+            with open(outputFiles[4]) as fh:
+                flow360Dict = json.load(fh)
+
+        # outputFiles[4] is the omega=0.0046 variant with no twist offset
+        refbetFlow360['omega'] = variants[4]['omega']
+        refbetFlow360['twists'] = [dict(twist, twist=twist['twist'] + variants[4]['twistOffset'])
+                                   for twist in refbetFlow360['twists']]
+        utils.assertDeepAlmostEqual(self, flow360Dict['BETDisks'], [refbetFlow360], places=14)
+
+        with self.assertRaises(ValueError):
+            next(betDiskVariants(betDisk, [{'alphas': [0, 1]}]))
+        with self.assertRaisesRegex(ValueError, 'idx'):
+            next(betDiskVariants(betDisk, [{'idx': 2}]))
+        with tempfile.TemporaryDirectory() as tmpDir:
+            with self.assertRaisesRegex(ValueError, 'scalar values'):
+                writeBETDiskSweep(betDisk, [{'centerOfRotation': [0, 0, 1]}],
+                                  os.path.join(tmpDir, 'sweep_{centerOfRotation}.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
 import os, sys
 import json
+import tempfile
+
+import numpy as np
 
 import unittest
 import utils
@@ -34,6 +37,82 @@ class AdvancedTestSuite(unittest.TestCase):
         self.maxDiff = None
         utils.assertDeepAlmostEqual(self, betFlow360, refbetFlow360, places=14)
 
+    def test_xfoil_polar_table(self):
+
+        table = interface.readXfoilPolarTable(os.path.join(here, 'data/xfoil/sec0XfoilPolarM1.dat'))
+        self.assertAlmostEqual(table['mach'], 0.5773502691896257, places=14)
+        self.assertEqual(table['reynolds'], 1)
+        self.assertEqual(table['columns'], ['alpha', 'CL', 'CD', 'CDp', 'CM', 'Top_Xtr', 'Bot_Xtr', 'Cpmin'])
+        self.assertEqual(table['data'][0, :3].tolist(), [-50, -0.6293, 0.81601])
+        self.assertTrue(np.isnan(table['data'][:, 3:]).all())  # XXXXXXX placeholders
+
+        xfoilOutput = '''
+       XFOIL         Version 6.94
+
+ Calculated polar for: NACA 0012
+
+ 1 1 Reynolds number fixed          Mach number fixed
+
+ xtrf =   1.000 (top)        1.000 (bottom)
+ Mach =   0.300     Re =     1.500 e 6     Ncrit =   9.000
+
+   alpha    CL        CD       CDp       CM     Top Xtr  Bot Xtr
+  ------ -------- --------- --------- -------- -------- --------
+  -2.000  -0.2205   0.00591   0.00102   0.0012   0.5978   0.3004
+   0.000   0.0000   0.00541   0.00065   0.0000   0.4459   0.4459
+   2.000   0.2205   0.00591   0.00102  -0.0012   0.3004   0.5978
+'''
+        with tempfile.TemporaryDirectory() as tmpDir:
+            polarFile = os.path.join(tmpDir, 'naca0012.pol')
+            with open(polarFile, 'w') as fh:
+                fh.write(xfoilOutput)
+            table = interface.readXfoilPolarTable(polarFile)
+
+            with open(polarFile, 'w') as fh:
+                fh.write(xfoilOutput.replace('0.4459   0.4459', '0.4459'))
+            with self.assertRaisesRegex(ValueError, 'line #14 should have 7 values'):
+                interface.readXfoilPolarTable(polarFile)
+
+        self.assertEqual([table['mach'], table['reynolds']], [0.3, 1.5e6])
+        self.assertEqual(table['columns'], ['alpha', 'CL', 'CD', 'CDp', 'CM', 'Top_Xtr', 'Bot_Xtr'])
+        self.assertEqual(table['data'][:, 4].tolist(), [0.0012, 0, -0.0012])
+
+    def test_xfoil_accumulation_files(self):
+
+        betDiskAdditionalInfo = {"centerOfRotation": [0, 0, 0],
+                 "rotationDirectionRule": "leftHand",
+                 "axisOfRotation": [0, 0, 1],
+                 "initialBladeDirection": [1,0,0],
+                 "thickness": 15,
+                 "chordRef": 14,
+                 "nLoadingNodes": 20,
+                 "omega" : 0.0046,
+                 "numberOfBlades" : 3}
+
+        dataDir = os.path.join(here, 'data/xfoil')
+        with open(os.path.join(dataDir, 'xv15_geometry_xfoil_translatorDisk0.csv')) as fh:
+            geometryLines = fh.read().splitlines()
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            for secIdx in range(5):  # one accumulation file per section holding the 4 Mach runs
+                with open(os.path.join(tmpDir, f'sec{secIdx}XfoilPolars.dat'), 'w') as fh:
+                    for machIdx in range(4):
+                        with open(os.path.join(dataDir, f'sec{secIdx}XfoilPolarM{machIdx}.dat')) as polarFh:
+                            fh.write(polarFh.read() + '\n')
+                geometryLines[secIdx + 1] = geometryLines[secIdx + 1].split(',')[0] + f', sec{secIdx}XfoilPolars.dat'
+            inputFile = os.path.join(tmpDir, 'geometry.csv')
+            with open(inputFile, 'w') as fh:
+                fh.write('\n'.join(geometryLines))
+
+            runs = interface.readXfoilPolarRuns(os.path.join(tmpDir, 'sec2XfoilPolars.dat'))
+            betFlow360 = interface.generateXfoilBETJSON(inputFile, betDiskAdditionalInfo)
+
+        with open(os.path.join(here, 'ref/xfoilTest.json')) as fh:
+            refbetFlow360 = json.load(fh)
+
+        self.assertEqual([run['mach'] for run in runs], refbetFlow360['MachNumbers'])
+        utils.assertDeepAlmostEqual(self, betFlow360, refbetFlow360, places=14)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,6 @@
 import os, sys
 import json
+import numpy
 
 import unittest
 import utils
@@ -36,5 +37,87 @@ class AdvancedTestSuite(unittest.TestCase):
         self.maxDiff = None
         utils.assertDeepAlmostEqual(self, betFlow360, refbetFlow360, places=14)
 
+    def test_xrotor_polar_arrays(self):
+
+        inputFile = os.path.join(here, 'data/xv15_like_twist0.xrotor')
+        xrotorDict = interface.readXROTORFile(inputFile)
+        polars = interface.getPolarArrays(xrotorDict, interface.generateAlphas(), interface.generateMachs())
+
+        with open(os.path.join(here, 'ref/xrotorTest.json')) as fh:
+            refbetFlow360 = json.load(fh)
+
+        shape = (len(refbetFlow360['sectionalRadiuses']), len(refbetFlow360['MachNumbers']),
+                 len(refbetFlow360['ReynoldsNumbers']), len(refbetFlow360['alphas']))
+        self.assertEqual(polars['liftCoeffs'].shape, shape)
+        self.assertTrue(polars['dragCoeffs'].flags['C_CONTIGUOUS'])
+
+        sectionalPolars = interface.sectionalPolarsFromArrays(polars['liftCoeffs'], polars['dragCoeffs'])
+        utils.assertDeepAlmostEqual(self, sectionalPolars, refbetFlow360['sectionalPolars'], places=14)
+
+    def test_xrotor_adaptive_alphas(self):
+
+        inputFile = os.path.join(here, 'data/xv15_like_twist0.xrotor')
+        xrotorDict = interface.readXROTORFile(inputFile)
+        machs = interface.generateMachs()
+        tolerance = 1e-3
+
+        alphas = interface.generateAdaptiveAlphas(xrotorDict, machs, tolerance)
+        self.assertEqual(alphas[0], -180)
+        self.assertEqual(alphas[-1], 180)
+        self.assertLess(len(alphas), len(interface.generateAlphas()))
+
+        # linear interpolation of the adapted polars reproduces the polars on a fine grid of alphas
+        fineAlphas = numpy.linspace(-180, 180, 1441)
+        fineCl, fineCd = interface.calcClCdArrays(xrotorDict, fineAlphas, machs)
+        cl, cd = interface.calcClCdArrays(xrotorDict, alphas, machs)
+        for coarse, fine in ((cl, fineCl), (cd, fineCd)):
+            for coarsePolar, finePolar in zip(coarse.reshape(-1, len(alphas)), fine.reshape(-1, len(fineAlphas))):
+                self.assertLessEqual(numpy.abs(numpy.interp(fineAlphas, alphas, coarsePolar) - finePolar).max(),
+                                     tolerance)
+
+    def test_xrotor_adaptive_machs(self):
+
+        inputFile = os.path.join(here, 'data/xv15_like_twist0.xrotor')
+        xrotorDict = interface.readXROTORFile(inputFile)
+        alphas = interface.generateAlphas()
+        tolerance = 1e-3
+
+        machs = interface.generateAdaptiveMachs(xrotorDict, alphas, tolerance)
+        self.assertEqual(machs[0], 0)
+        self.assertAlmostEqual(machs[-1], interface.generateMachs()[-1], places=14)
+
+        fineMachs = numpy.linspace(0, machs[-1], 200)
+        fineCl, fineCd, alphaMinIdx, alphaMaxIdx = interface.calcClCdArrays(xrotorDict, alphas, fineMachs,
+                                                                            returnBlendIdxs=True)
+        cl, cd = interface.calcClCdArrays(xrotorDict, alphas, machs)
+        for coarse, fine in ((cl, fineCl), (cd, fineCd)):
+            for secIdx in range(xrotorDict['nAeroSections']):
+                # the error is controlled outside of the flat plate blending
+                for alphaIdx in range(alphaMinIdx[secIdx].max(), alphaMaxIdx[secIdx].min()):
+                    interpolated = numpy.interp(fineMachs, machs, coarse[secIdx, :, alphaIdx])
+                    self.assertLessEqual(numpy.abs(interpolated - fine[secIdx, :, alphaIdx]).max(), tolerance)
+
+    def test_xrotor_adaptive_machs_and_alphas(self):
+
+        betDiskAdditionalInfo = {"meshUnit": 1,
+                                 "centerOfRotation": [0, 0, 0],
+                                 "rotationDirectionRule": "leftHand",
+                                 "axisOfRotation": [0, 0, 1],
+                                 "omega": 0.0046,
+                                 "thickness": 15,
+                                 "chordRef": 14,
+                                 "nLoadingNodes": 20}
+
+        inputFile = os.path.join(here, 'data/xv15_like_twist0.xrotor')
+        xrotorDict = interface.readXROTORFile(inputFile)
+        betFlow360 = interface.generateXrotorBETJSON(inputFile, betDiskAdditionalInfo, alphaTolerance=1e-3,
+                                                     machTolerance=1e-3)
+
+        # the Machs are adapted on the fine grid the adaptive alphas are picked from, not on the default alphas
+        machs = interface.generateAdaptiveMachs(xrotorDict, interface.generateFineAlphas(), 1e-3)
+        utils.assertDeepAlmostEqual(self, betFlow360['MachNumbers'], list(machs), places=14)
+        self.assertTrue(numpy.isin(betFlow360['alphas'], interface.generateFineAlphas()).all())
+
+
 if __name__ == '__main__':
     unittest.main()